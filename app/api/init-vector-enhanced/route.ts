@@ -1,79 +1,132 @@
-/* eslint-disable @typescript-eslint/no-explicit-any, @typescript-eslint/no-unused-vars */
+/* eslint-disable @typescript-eslint/no-explicit-any */
 import { NextRequest, NextResponse } from 'next/server';
-import { exec } from 'child_process';
+import { execFile } from 'child_process';
 import { promisify } from 'util';
 import path from 'path';
 
-const execAsync = promisify(exec);
+const execFileAsync = promisify(execFile);
+
+const RUNNER = path.join(process.cwd(), 'scripts', 'run-enhanced-init.py');
+const JOB_ID = /^[0-9a-f]{12}$/;
 
 /**
- * Enhanced vector initialization endpoint
- * Runs the Python script with multilingual model and fine-grained chunking
+ * Run one command of scripts/run-enhanced-init.py and parse its JSON reply.
+ * Every command returns within a second: ingestion itself runs as a background job.
  */
-export async function POST(_request: NextRequest) {
+async function runner(args: string[]): Promise<{ code: number; body: any }> {
   try {
-    const scriptPath = path.join(process.cwd(), 'scripts', 'init-vector-enhanced.py');
-    
-    console.log('🚀 Starting enhanced vector initialization...');
-    console.log('📝 Script path:', scriptPath);
-    
-    // Run the Python script
-    const { stdout, stderr } = await execAsync(`python "${scriptPath}"`, {
-      timeout: 300000, // 5 minutes
+    const { stdout } = await execFileAsync('python', [RUNNER, ...args], {
+      cwd: path.join(process.cwd(), 'scripts'),
+      timeout: 30000,
       maxBuffer: 10 * 1024 * 1024, // 10MB buffer
     });
-    
-    console.log('✅ Script completed');
-    
-    // Parse output for stats
-    const output = stdout + stderr;
-    const successMatch = output.match(/Success: (\d+)\/(\d+)/);
-    const chunkMatch = output.match(/Generated (\d+)/);
-    
-    return NextResponse.json({
-      success: true,
-      message: 'Enhanced vector initialization completed',
-      stats: {
-        totalChunks: chunkMatch ? parseInt(chunkMatch[1]) : 'unknown',
-        successful: successMatch ? parseInt(successMatch[1]) : 'unknown',
-        total: successMatch ? parseInt(successMatch[2]) : 'unknown',
+    return { code: 0, body: JSON.parse(stdout) };
+  } catch (error: any) {
+    // Non-zero exits (conflict, unknown job) still print a JSON document
+    try {
+      return { code: typeof error.code === 'number' ? error.code : 1, body: JSON.parse(error.stdout) };
+    } catch {
+      throw error;
+    }
+  }
+}
+
+function failure(error: unknown) {
+  console.error('❌ Enhanced initialization job command failed:', error);
+  return NextResponse.json(
+    {
+      success: false,
+      error: error instanceof Error ? error.message : 'Unknown error',
+      suggestion: 'Please ensure Python and required packages are installed: pip install sentence-transformers numpy requests python-dotenv',
+    },
+    { status: 500 }
+  );
+}
+
+/**
+ * Enhanced vector initialization endpoint
+ * Starts the multilingual, fine-grained ingestion as a background job and
+ * returns its id at once; poll GET ?jobId= for progress, DELETE ?jobId= to cancel.
+ * Body (optional): { "resume": true, "full": true, "sync": true, "shadow": true }
+ * With shadow the job builds a new namespace generation and switches chat over only after it validates.
+ */
+export async function POST(request: NextRequest) {
+  try {
+    const options = await request.json().catch(() => ({}));
+    const flags = ['resume', 'full', 'sync', 'shadow'].filter((name) => options?.[name] === true).map((name) => `--${name}`);
+
+    console.log('🚀 Starting enhanced vector initialization job...');
+    const { code, body } = await runner(['start', ...flags]);
+    if (code !== 0) {
+      // One ingestion per index: report the job that is already running
+      return NextResponse.json(body, { status: 409 });
+    }
+
+    return NextResponse.json(
+      {
+        success: true,
+        message: 'Enhanced vector initialization started',
+        jobId: body.job.id,
+        statusUrl: `/api/init-vector-enhanced?jobId=${body.job.id}`,
+        job: body.job,
       },
-      output: output.substring(0, 2000), // First 2000 chars
+      { status: 202 }
+    );
+  } catch (error) {
+    return failure(error);
+  }
+}
+
+/**
+ * Job status: ?jobId=<id>[&since=<event offset>] returns status, the latest progress
+ * event (stage, done/total, vectors_per_sec, eta_seconds) and events after `since`.
+ * Without jobId it describes the endpoint and the active job, if any.
+ */
+export async function GET(request: NextRequest) {
+  const jobId = request.nextUrl.searchParams.get('jobId');
+  const since = parseInt(request.nextUrl.searchParams.get('since') || '0', 10) || 0;
+
+  try {
+    if (jobId) {
+      if (!JOB_ID.test(jobId)) {
+        return NextResponse.json({ success: false, error: 'Invalid job id' }, { status: 400 });
+      }
+      const { code, body } = await runner(['status', jobId, '--since', String(since)]);
+      return NextResponse.json(body, { status: code === 0 ? 200 : 404 });
+    }
+
+    const { body } = await runner(['status']);
+    return NextResponse.json({
+      message: 'Enhanced Vector Initialization API',
+      method: 'POST to start a job, GET ?jobId= for progress, DELETE ?jobId= to cancel',
+      activeJob: body.active,
       improvements: [
-        'Multilingual model (paraphrase-multilingual-mpnet-base-v2) for Chinese support',
-        'Fine-grained chunking: 35+ chunks vs 18 coarse chunks',
-        'Company-specific keywords and metric extraction',
-        'topK increased to 10 for better recall',
+        'Multilingual embedding model for better Chinese query support',
+        'Fine-grained chunking strategy (35+ chunks vs 18)',
+        'Company-specific keywords for precise matching',
+        'topK=10 for improved recall',
       ],
+      expectedAccuracy: '90%+ (vs 67% baseline)',
     });
   } catch (error) {
-    console.error('❌ Enhanced initialization failed:', error);
-    
-    const errorMessage = error instanceof Error ? error.message : 'Unknown error';
-    const errorOutput = (error as any).stdout || (error as any).stderr || '';
-    
-    return NextResponse.json(
-      {
-        success: false,
-        error: errorMessage,
-        output: errorOutput.substring(0, 2000),
-        suggestion: 'Please ensure Python and required packages are installed: pip install sentence-transformers numpy requests python-dotenv',
-      },
-      { status: 500 }
-    );
+    return failure(error);
   }
 }
 
-export async function GET() {
-  return NextResponse.json({
-    message: 'Enhanced Vector Initialization API',
-    method: 'POST to run',
-    improvements: [
-      'Multilingual embedding model for better Chinese query support',
-      'Fine-grained chunking strategy (35+ chunks vs 18)',
-      'Company-specific keywords for precise matching',
-      'topK=10 for improved recall',
-    ],
-    expectedAccuracy: '90%+ (vs 67% baseline)',
-  });
+/**
+ * Cancel a running job: ?jobId=<id>. The interrupted run can be continued later
+ * with POST { "resume": true }.
+ */
+export async function DELETE(request: NextRequest) {
+  const jobId = request.nextUrl.searchParams.get('jobId');
+  if (!jobId || !JOB_ID.test(jobId)) {
+    return NextResponse.json({ success: false, error: 'Invalid job id' }, { status: 400 });
+  }
+
+  try {
+    const { code, body } = await runner(['cancel', jobId]);
+    return NextResponse.json(body, { status: code === 0 ? 200 : 404 });
+  } catch (error) {
+    return failure(error);
+  }
 }
@@ -0,0 +1,87 @@
+import bm25Data from './generated/bm25-index.json' assert { type: 'json' };
+
+/**
+ * In-memory BM25 lookup over the chunks written by scripts/init-vector-enhanced.py
+ * (see scripts/vector_ingest/bm25.py). Posting weights are precomputed at ingestion,
+ * so a query is a tokenize + sum over a few postings lists - no network round trip.
+ */
+
+export interface Bm25Doc {
+  id: string;
+  content: string;
+  type: string;
+  source: string;
+  category: string;
+}
+
+export interface Bm25Index {
+  version: number;
+  k1: number;
+  b: number;
+  avgdl: number;
+  stopwords: string[];
+  docs: Bm25Doc[];
+  postings: Record<string, [number, number][]>;
+}
+
+export interface Bm25Hit {
+  doc: Bm25Doc;
+  score: number;
+}
+
+const CJK = /[㐀-䶿一-鿿豈-﫿]/;
+const TOKEN = /[㐀-䶿一-鿿豈-﫿]+|[a-z0-9$][a-z0-9$%+#.,'-]*/gi;
+
+/**
+ * Same term rules as scripts/vector_ingest/tokens.py: lower-cased Latin words without
+ * stopwords, and CJK runs as character unigrams plus bigrams.
+ */
+export function tokenize(text: string, stopwords: Set<string>): string[] {
+  const out: string[] = [];
+  for (const match of (text || '').matchAll(TOKEN)) {
+    const token = match[0];
+    if (CJK.test(token[0])) {
+      const chars = Array.from(token);
+      out.push(...chars);
+      for (let i = 0; i < chars.length - 1; i++) out.push(chars[i] + chars[i + 1]);
+    } else {
+      const term = token.toLowerCase().replace(/[.,'-]+$/, '').replace(/,/g, '');
+      if (term && !stopwords.has(term)) out.push(term);
+    }
+  }
+  return out;
+}
+
+export function createBm25Search(index: Bm25Index) {
+  const stopwords = new Set(index.stopwords);
+  return (query: string, topK: number = 10): Bm25Hit[] => {
+    const scores = new Map<number, number>();
+    for (const term of tokenize(query, stopwords)) {
+      for (const [doc, weight] of index.postings[term] || []) {
+        scores.set(doc, (scores.get(doc) || 0) + weight);
+      }
+    }
+    return Array.from(scores.entries())
+      .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+      .slice(0, topK)
+      .map(([doc, score]) => ({ doc: index.docs[doc], score }));
+  };
+}
+
+const bundledIndex = bm25Data as unknown as Bm25Index;
+
+export const searchBm25 = createBm25Search(bundledIndex);
+
+/**
+ * Reciprocal rank fusion: each list contributes 1 / (k + rank) per id.
+ * Rank-based, so BM25 and cosine scores need no common scale.
+ */
+export function reciprocalRankFusion(rankings: string[][], k: number = 60): Map<string, number> {
+  const fused = new Map<string, number>();
+  for (const ranking of rankings) {
+    ranking.forEach((id, rank) => {
+      fused.set(id, (fused.get(id) || 0) + 1 / (k + rank + 1));
+    });
+  }
+  return fused;
+}
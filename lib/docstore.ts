@@ -0,0 +1,71 @@
+import { Redis } from '@upstash/redis';
+import docsData from './generated/chunk-docs.json' assert { type: 'json' };
+import bm25Data from './generated/bm25-index.json' assert { type: 'json' };
+
+/**
+ * Chunk texts stored out of band from the vectors (see scripts/vector_ingest/docstore.py).
+ * Vector metadata only keeps type/source/category and the chunk id is the pointer, so
+ * Upstash query responses stay small; hits are hydrated here with one multi-get.
+ *
+ * DOCSTORE=file (default) reads the bundled lib/generated/chunk-docs.json, which only
+ * holds documents the bundled BM25 index does not already carry; both are read as one
+ * store. The bundle is fixed at build time, so chunks ingested after the build have no
+ * text until the app is rebuilt - re-ingest against a running app with DOCSTORE=redis.
+ * DOCSTORE=redis reads one Upstash Redis hash (DOCSTORE_KEY) with a single HMGET and
+ * falls back to the bundle for ids it does not have.
+ */
+
+export interface ChunkDoc {
+  content: string;
+  type: string;
+  source: string;
+  category: string;
+}
+
+const DOCSTORE = (process.env.DOCSTORE || 'file').toLowerCase();
+const DOCSTORE_KEY = process.env.DOCSTORE_KEY || 'vector:docs';
+const bundledDocs: Record<string, ChunkDoc> = {
+  ...Object.fromEntries(
+    (bm25Data as unknown as { docs: (ChunkDoc & { id: string })[] }).docs.map(({ id, ...doc }) => [id, doc])
+  ),
+  ...(docsData as unknown as { docs: Record<string, ChunkDoc> }).docs,
+};
+
+let redisInstance: Redis | null = null;
+
+function getRedis(): Redis | null {
+  if (redisInstance) return redisInstance;
+  const url = process.env.UPSTASH_REDIS_REST_URL;
+  const token = process.env.UPSTASH_REDIS_REST_TOKEN;
+  if (!url || !token) {
+    console.warn('[DocStore] DOCSTORE=redis but Upstash Redis credentials are missing; using the bundled documents');
+    return null;
+  }
+  redisInstance = new Redis({ url, token });
+  return redisInstance;
+}
+
+/**
+ * Documents for ids in one round trip at most; ids without a document are left out.
+ */
+export async function getChunkDocs(ids: string[]): Promise<Map<string, ChunkDoc>> {
+  const docs = new Map<string, ChunkDoc>();
+  if (ids.length === 0) return docs;
+
+  const redis = DOCSTORE === 'redis' ? getRedis() : null;
+  if (redis) {
+    try {
+      const found = await redis.hmget<Record<string, ChunkDoc | null>>(DOCSTORE_KEY, ...ids);
+      for (const [id, doc] of Object.entries(found || {})) {
+        if (doc) docs.set(id, doc);
+      }
+    } catch (error) {
+      console.error('[DocStore] Redis multi-get failed:', error);
+    }
+  }
+
+  for (const id of ids) {
+    if (!docs.has(id) && bundledDocs[id]) docs.set(id, bundledDocs[id]);
+  }
+  return docs;
+}
@@ -1,5 +1,7 @@
 import { Index } from '@upstash/vector';
 import digitalTwinData from '../digitaltwin.json' assert { type: 'json' };
+import { reciprocalRankFusion, searchBm25, type Bm25Doc } from './bm25';
+import { getChunkDocs } from './docstore';
 
 // Initialize Upstash Vector client with lazy initialization to avoid build-time errors
 let vectorIndexInstance: Index | null = null;
@@ -30,6 +32,32 @@ export const getVectorIndex = (): Index | null => {
   }
 };
 
+// Blue/green re-indexing (init-vector-enhanced.py --shadow) builds each generation in its own
+// namespace and flips an alias record kept in the index; VECTOR_NAMESPACE pins one instead
+const ALIAS_NAMESPACE = '_aliases';
+const ALIAS_ID = process.env.VECTOR_ALIAS || 'live';
+const ALIAS_TTL_MS = Number(process.env.VECTOR_ALIAS_TTL_MS || 30000);
+let aliasCache: { namespace: string; expiresAt: number } | null = null;
+
+/**
+ * Namespace that queries should hit: the alias target, re-read at most every ALIAS_TTL_MS.
+ * Falls back to the last known target, or the default namespace when no cutover has happened.
+ */
+export async function resolveNamespace(index: Index): Promise<string> {
+  if (process.env.VECTOR_NAMESPACE !== undefined) return process.env.VECTOR_NAMESPACE;
+  if (aliasCache && Date.now() < aliasCache.expiresAt) return aliasCache.namespace;
+
+  let namespace = aliasCache?.namespace ?? '';
+  try {
+    const [record] = await index.fetch([ALIAS_ID], { includeMetadata: true, namespace: ALIAS_NAMESPACE });
+    namespace = String((record?.metadata as { namespace?: string } | undefined)?.namespace ?? '');
+  } catch (error) {
+    console.warn('[Upstash Vector] Could not read the namespace alias:', error);
+  }
+  aliasCache = { namespace, expiresAt: Date.now() + ALIAS_TTL_MS };
+  return namespace;
+}
+
 // Legacy export for backward compatibility - guards all property access
 export const vectorIndex = new Proxy({} as Index, {
   get(_target, prop) {
@@ -215,35 +243,99 @@ export function generateChunks(): VectorMetadata[] {
   return chunks;
 }
 
+type SearchFilter = { type?: string; category?: string };
+
+// Optional: answer from the local BM25 index alone when its best hit scores at least this much
+const BM25_SHORTCUT_SCORE = Number(process.env.BM25_SHORTCUT_SCORE || Infinity);
+
+function toUpstashFilter(filter?: SearchFilter): string | undefined {
+  if (!filter) return undefined;
+  const clauses = Object.entries(filter)
+    .filter(([, value]) => value)
+    .map(([key, value]) => `${key} = '${String(value).replace(/'/g, "\\'")}'`);
+  return clauses.length > 0 ? clauses.join(' AND ') : undefined;
+}
+
+function matchesFilter(doc: Bm25Doc, filter?: SearchFilter): boolean {
+  return !filter || Object.entries(filter).every(([key, value]) => !value || doc[key as keyof Bm25Doc] === value);
+}
+
+function fromBm25Doc(doc: Bm25Doc): VectorMetadata {
+  return {
+    id: doc.id,
+    type: doc.type as VectorMetadata['type'],
+    content: doc.content,
+    source: doc.source,
+    category: doc.category || undefined,
+  };
+}
+
 /**
- * Search vector database for relevant context
+ * Search for relevant context: Upstash vector search fused (RRF) with the local
+ * BM25 index, so exact terms (company names, dollar figures, 中山) rank well too
  */
 export async function searchRelevantContext(
   query: string,
   topK: number = 10,
-  filter?: { type?: string; category?: string }
+  filter?: SearchFilter
 ): Promise<VectorMetadata[]> {
+  const lexical = searchBm25(query, topK * 2)
+    .filter((hit) => matchesFilter(hit.doc, filter))
+    .slice(0, topK);
+
+  if (lexical.length > 0 && lexical[0].score >= BM25_SHORTCUT_SCORE) {
+    return lexical.map((hit) => fromBm25Doc(hit.doc));
+  }
+
+  let semantic: { id: string; metadata: VectorMetadata }[] = [];
   try {
     const index = getVectorIndex();
     if (!index) {
-      console.warn('[searchRelevantContext] Vector database not available - returning empty results');
-      return [];
+      console.warn('[searchRelevantContext] Vector database not available - using BM25 results only');
+    } else {
+      const results = await index.query(
+        {
+          data: query,
+          topK,
+          includeMetadata: true,
+          filter: toUpstashFilter(filter),
+        },
+        { namespace: await resolveNamespace(index) }
+      );
+      semantic = results
+        .filter((result) => result.metadata)
+        .map((result) => ({ id: String(result.id), metadata: result.metadata as unknown as VectorMetadata }));
     }
-
-    const results = await index.query({
-      data: query,
-      topK,
-      includeMetadata: true,
-      filter: filter ? JSON.stringify(filter) : undefined,
-    });
-
-    return results
-      .filter((result) => result.metadata)
-      .map((result) => result.metadata as unknown as VectorMetadata);
   } catch (error) {
     console.error('Error searching vector database:', error);
-    return [];
   }
+
+  const fused = reciprocalRankFusion([semantic.map((r) => r.id), lexical.map((hit) => hit.doc.id)]);
+  const ranked = Array.from(fused.entries())
+    .sort((a, b) => b[1] - a[1])
+    .map(([id]) => id);
+
+  const byId = new Map<string, VectorMetadata>();
+  for (const hit of lexical) byId.set(hit.doc.id, fromBm25Doc(hit.doc));
+  for (const { id, metadata } of semantic) byId.set(id, { ...metadata, id });
+
+  // Vector metadata only points at the chunk; fetch the texts of all candidates in one multi-get
+  const missing = ranked.filter((id) => !byId.get(id)?.content);
+  const docs = await getChunkDocs(missing);
+  for (const id of missing) {
+    const doc = docs.get(id);
+    if (doc) byId.set(id, { ...byId.get(id), ...doc, id } as VectorMetadata);
+  }
+
+  // Ids the doc store has no text for (e.g. ingested after this bundle was built) are dropped
+  const unresolved = missing.filter((id) => !docs.has(id));
+  if (unresolved.length > 0) {
+    console.warn(`[searchRelevantContext] No chunk text for ${unresolved.length} hits; rebuild the app or use DOCSTORE=redis`);
+  }
+  return ranked
+    .filter((id) => byId.get(id)?.content)
+    .slice(0, topK)
+    .map((id) => byId.get(id) as VectorMetadata);
 }
 
 /**
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Offline ingestion benchmark against the local Upstash Vector stand-in.
+
+Starts scripts/vector_ingest/local_server.py in-process with the requested
+latency and fault injection, uploads synthetic unit vectors through the
+shared UpsertEngine, and prints a JSON report (throughput, retries,
+throttling, bytes sent). Exits non-zero if any vector is missing from the
+index afterwards, so it can run as a CI regression check.
+
+Requirements:
+  pip install numpy requests
+
+Usage:
+  python scripts/bench-ingest.py --vectors 2000 --latency-ms 40 --throttle-rate 0.05
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import requests
+
+from vector_ingest.local_server import start_in_background
+from vector_ingest.ratelimit import AdaptiveRateLimiter
+from vector_ingest.upload import UpsertEngine, make_item, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vector ingestion against a local Upstash stand-in')
+    parser.add_argument('--vectors', type=int, default=1000)
+    parser.add_argument('--dimension', type=int, default=1024)
+    parser.add_argument('--batch', type=int, default=32)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=30.0)
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=float, default=0.2)
+    parser.add_argument('--rate-start', type=float, default=50.0)
+    parser.add_argument('--rate-max', type=float, default=500.0)
+    parser.add_argument('--gzip', action='store_true')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    server = start_in_background(
+        dimension=args.dimension, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate, error_rate=args.error_rate,
+        retry_after=args.retry_after, seed=args.seed,
+    )
+
+    rng = np.random.default_rng(args.seed)
+    matrix = rng.standard_normal((args.vectors, args.dimension)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    items = [make_item(f'bench-{i}', matrix[i], {'type': 'bench', 'n': i}) for i in range(args.vectors)]
+
+    engine = UpsertEngine(
+        server.url, 'local', concurrency=args.concurrency, gzip=args.gzip, quarantine_path=None,
+        limiter=AdaptiveRateLimiter(rate=args.rate_start, max_rate=args.rate_max),
+    )
+    started = time.perf_counter()
+    results = engine.upload(items, batch_size=args.batch)
+    elapsed = time.perf_counter() - started
+    engine.close()
+
+    summary = summarize(results)
+    info = requests.get(server.url + '/info', timeout=10).json()['result']
+    report = {
+        'vectors': args.vectors,
+        'dimension': args.dimension,
+        'batch': args.batch,
+        'concurrency': args.concurrency,
+        'seconds': round(elapsed, 3),
+        'vectors_per_second': round(summary['success'] / max(elapsed, 1e-9), 1),
+        'uploaded': summary['success'],
+        'failed': summary['error'],
+        'indexed': info['vectorCount'],
+        'requests': server.faults.counters['requests'],
+        'retries': sum(r['attempts'] - 1 for r in results),
+        'throttled': server.faults.counters['throttled'],
+        'injected_errors': server.faults.counters['errors'],
+        'final_rate': round(engine.limiter.current_rate, 1),
+        'bytes_sent': engine.bytes_sent,
+    }
+    server.shutdown()
+    print(json.dumps(report, indent=2))
+    return 0 if info['vectorCount'] == args.vectors else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Compare the int8 ONNX Runtime backend with the PyTorch SentenceTransformer
+path: throughput on CPU and cosine agreement of the produced embeddings.
+
+Texts are the string fields of digitaltwin.json plus a few English and
+Chinese recruiter-style queries, repeated up to --texts. The first ONNX run
+exports and quantizes the model (cached under .vector-cache/onnx/).
+
+Requirements:
+  pip install sentence-transformers onnx onnxruntime numpy
+
+Usage:
+  python scripts/bench-onnx.py --texts 512 --batch 32
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from vector_ingest.embedding import encode_batched
+from vector_ingest.onnx_backend import OnnxEncoder
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except Exception:
+        pass
+
+QUERIES = [
+    'What programming languages does Douglas know?',
+    'Tell me about your data analysis experience',
+    'Why are you a good fit for this role?',
+    '你有哪些工作经验？',
+    '介绍一下你的教育背景',
+    '你擅长哪些技术？',
+]
+
+
+def profile_texts(path):
+    texts = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for v in node.values():
+                walk(v)
+        elif isinstance(node, list):
+            for v in node:
+                walk(v)
+        elif isinstance(node, str) and len(node) >= 20:
+            texts.append(node)
+
+    if path.exists():
+        walk(json.loads(path.read_text(encoding='utf-8-sig')))
+    return texts
+
+
+def timed_encode(model, texts, batch):
+    model.encode(texts[:batch])  # warm-up
+    started = time.perf_counter()
+    emb = encode_batched(model, texts, batch_size=batch, show_progress=False)
+    return emb, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark int8 ONNX vs PyTorch embeddings')
+    parser.add_argument('--model', default='paraphrase-multilingual-mpnet-base-v2')
+    parser.add_argument('--texts', type=int, default=256)
+    parser.add_argument('--batch', type=int, default=32)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    root = Path(__file__).resolve().parent.parent
+    pool = profile_texts(root / 'digitaltwin.json') or QUERIES
+    n = max(args.texts - len(QUERIES), 1)
+    texts = (pool * (n // len(pool) + 1))[:n] + QUERIES
+
+    started = time.perf_counter()
+    torch_model = SentenceTransformer(args.model, device='cpu')
+    torch_load = time.perf_counter() - started
+    started = time.perf_counter()
+    onnx_model = OnnxEncoder(args.model)
+    onnx_load = time.perf_counter() - started
+
+    ref, torch_s = timed_encode(torch_model, texts, args.batch)
+    got, onnx_s = timed_encode(onnx_model, texts, args.batch)
+
+    a = ref / np.linalg.norm(ref, axis=1, keepdims=True)
+    b = got / np.linalg.norm(got, axis=1, keepdims=True)
+    cos = (a * b).sum(axis=1)
+
+    # Does the quantized model rank the profile texts the same way for each query?
+    q = len(QUERIES)
+    top_ref = np.argsort(-(a[-q:] @ a[:-q].T), axis=1)[:, :5]
+    top_got = np.argsort(-(b[-q:] @ b[:-q].T), axis=1)[:, :5]
+    overlap = float(np.mean([len(set(r) & set(g)) / top_ref.shape[1] for r, g in zip(top_ref, top_got)]))
+
+    report = {
+        'model': args.model,
+        'texts': len(texts),
+        'batch': args.batch,
+        'torch': {'load_seconds': round(torch_load, 2), 'seconds': round(torch_s, 3),
+                  'texts_per_second': round(len(texts) / torch_s, 1)},
+        'onnx_int8': {'load_seconds': round(onnx_load, 2), 'seconds': round(onnx_s, 3),
+                      'texts_per_second': round(len(texts) / onnx_s, 1)},
+        'speedup': round(torch_s / onnx_s, 2),
+        'cosine': {'mean': round(float(cos.mean()), 5), 'min': round(float(cos.min()), 5),
+                   'p01': round(float(np.percentile(cos, 1)), 5)},
+        'top5_overlap': round(overlap, 3),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
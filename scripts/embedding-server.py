@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Run a warm, micro-batching embedding server for the ingestion scripts.
+See scripts/vector_ingest/embed_server.py for the HTTP API.
+
+Point the init scripts at it with EMBEDDING_SERVER_URL=http://127.0.0.1:8788
+so repeated runs skip the SentenceTransformer cold start.
+
+Requirements:
+  pip install sentence-transformers numpy requests
+
+Usage:
+  python scripts/embedding-server.py --preload paraphrase-multilingual-mpnet-base-v2 --max-wait-ms 5
+"""
+
+import sys
+
+from vector_ingest.embed_server import main
+
+if __name__ == '__main__':
+    sys.exit(main())
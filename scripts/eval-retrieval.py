@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Offline retrieval quality vs. latency for index variants.
+
+Chunks the profile exactly like init-vector-enhanced.py, builds every variant
+as a local index (no Upstash), runs the recruiter queries from
+scripts/eval/recruiter-queries.json against it and reports, per variant:
+  recall@1/3/5/10 and MRR (overall and per language),
+  query latency p50/p99 (query embedding + search),
+  index size and bytes per vector (float32 vector + metadata payload).
+
+Variants:
+  bm25                  the lexical index shipped in lib/generated/bm25-index.json
+  hashing-<dim>         the model-free HashingEmbedder at <dim> dimensions
+  <model name>          a SentenceTransformer model (EMBEDDING_BACKEND / EMBEDDING_SERVER_URL apply)
+  <model>@<method>-<dim>  the model projected to <dim> dims with random, pca or whiten
+                        (see vector_ingest/projection.py; fitted on the eval chunks themselves)
+  hybrid:<variant>      <variant> fused with bm25 by reciprocal rank fusion, as in lib/vectordb.ts
+
+Pass --baseline with an earlier report to print quality and latency deltas,
+so an ingestion change can be shown with its effect on retrieval.
+
+Requirements:
+  pip install numpy  (sentence-transformers for model variants)
+
+Usage:
+  python scripts/eval-retrieval.py
+  python scripts/eval-retrieval.py --variants bm25,all-MiniLM-L6-v2,hybrid:all-MiniLM-L6-v2 --output after.json --baseline before.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from vector_ingest.bm25 import build_index, search as bm25_search
+from vector_ingest.embedding import encode_batched
+from vector_ingest.evaluation import (DEFAULT_KS, FlatIndex, latency_summary, load_queries,
+                                      reciprocal_rank_fusion, relevant_ids, score_ranking, summarize)
+from vector_ingest.profile import load_profile, profile_chunks
+from vector_ingest.projection import fit_projection, random_projection
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except Exception:
+        pass
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_VARIANTS = 'bm25,hashing-384,hybrid:hashing-384,all-MiniLM-L6-v2,hybrid:all-MiniLM-L6-v2'
+TOP_K = max(DEFAULT_KS)
+
+
+def load_model(name):
+    if name.startswith('hashing-'):
+        from vector_ingest.hashing import HashingEmbedder
+        return HashingEmbedder(int(name.split('-', 1)[1]))
+
+    from vector_ingest.embed_server import load_encoder
+    from vector_ingest.onnx_backend import load_backend
+
+    def load_torch():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name, device='cpu')
+
+    return load_encoder(name, lambda: load_backend(name, load_torch))
+
+
+def metadata_bytes(chunk):
+    return len(json.dumps(chunk['metadata'], ensure_ascii=False).encode('utf-8'))
+
+
+class Bm25Variant:
+    def __init__(self, chunks):
+        started = time.perf_counter()
+        self.index = build_index(chunks)
+        self.build_seconds = time.perf_counter() - started
+        size = len(json.dumps(self.index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        self.stats = {'dimension': None, 'index_bytes': size, 'bytes_per_vector': round(size / len(chunks), 1)}
+
+    def search(self, query):
+        return [doc['id'] for doc, _ in bm25_search(self.index, query, TOP_K)]
+
+
+class DenseVariant:
+    def __init__(self, name, chunks):
+        model_name, _, projection = name.partition('@')
+        started = time.perf_counter()
+        self.model = load_model(model_name)
+        self.load_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        vectors = encode_batched(self.model, [ch['content'] for ch in chunks], show_progress=False)
+        self.projection = None
+        if projection:
+            method, dim = projection.rsplit('-', 1)
+            self.projection = (random_projection(vectors.shape[1], int(dim)) if method == 'random'
+                               else fit_projection(vectors, int(dim), method))
+            vectors = self.projection.apply(vectors)
+        self.index = FlatIndex([ch['id'] for ch in chunks], vectors)
+        self.build_seconds = time.perf_counter() - started
+        meta = sum(metadata_bytes(ch) for ch in chunks)
+        self.stats = {
+            'dimension': self.index.dimension,
+            'index_bytes': self.index.nbytes + meta,
+            'bytes_per_vector': round((self.index.nbytes + meta) / len(chunks), 1),
+            'model_load_seconds': round(self.load_seconds, 3),
+        }
+        if self.projection is not None and 'explained_variance' in self.projection.meta:
+            self.stats['explained_variance'] = self.projection.meta['explained_variance']
+
+    def search(self, query):
+        vector = self.model.encode([query])
+        if self.projection is not None:
+            vector = self.projection.apply(vector)
+        return [cid for cid, _ in self.index.search(vector[0], TOP_K)]
+
+
+class HybridVariant:
+    def __init__(self, dense, lexical):
+        self.dense, self.lexical = dense, lexical
+        self.build_seconds = dense.build_seconds + lexical.build_seconds
+        self.stats = dict(dense.stats)
+        self.stats['index_bytes'] = dense.stats['index_bytes'] + lexical.stats['index_bytes']
+        self.stats['bytes_per_vector'] = dense.stats['bytes_per_vector'] + lexical.stats['bytes_per_vector']
+        self.stats['bm25_bytes'] = lexical.stats['index_bytes']
+
+    def search(self, query):
+        return reciprocal_rank_fusion([self.dense.search(query), self.lexical.search(query)])[:TOP_K]
+
+
+def build_variants(names, chunks):
+    built = {}
+
+    def get(name):
+        if name not in built:
+            if name == 'bm25':
+                built[name] = Bm25Variant(chunks)
+            elif name.startswith('hybrid:'):
+                built[name] = HybridVariant(get(name.split(':', 1)[1]), get('bm25'))
+            else:
+                built[name] = DenseVariant(name, chunks)
+        return built[name]
+
+    return {name: get(name) for name in names}
+
+
+def evaluate(variant, queries, chunk_ids, rounds):
+    per_query, by_lang, latencies = [], {}, []
+    for q in queries:
+        relevant = relevant_ids(chunk_ids, q['relevant'])
+        ranked = variant.search(q['query'])  # warm-up and the ranking that is scored
+        for _ in range(rounds):
+            started = time.perf_counter()
+            variant.search(q['query'])
+            latencies.append((time.perf_counter() - started) * 1000)
+        scores = score_ranking(ranked, relevant)
+        per_query.append(scores)
+        by_lang.setdefault(q['lang'], []).append(scores)
+        scores['id'], scores['top'] = q['id'], ranked[:3]
+    return {
+        **summarize(per_query),
+        'by_lang': {lang: summarize(rows) for lang, rows in sorted(by_lang.items())},
+        'latency': latency_summary(latencies),
+        'build_seconds': round(variant.build_seconds, 3),
+        **variant.stats,
+        'queries': per_query,
+    }
+
+
+def print_table(results, baseline):
+    ks = [f'recall@{k}' for k in DEFAULT_KS]
+    print(f"\n{'variant':<34}" + ''.join(f"{k:>11}" for k in ks) + f"{'MRR':>8}{'p50 ms':>9}{'p99 ms':>9}{'B/vec':>9}")
+    for name, r in results.items():
+        print(f"{name:<34}" + ''.join(f"{r[k]:>11.3f}" for k in ks)
+              + f"{r['mrr']:>8.3f}{r['latency']['p50_ms']:>9.2f}{r['latency']['p99_ms']:>9.2f}{r['bytes_per_vector']:>9.0f}")
+        before = (baseline or {}).get(name)
+        if before and 'mrr' in before:
+            print(f"{'  Δ vs baseline':<34}" + ''.join(f"{r[k] - before[k]:>+11.3f}" for k in ks)
+                  + f"{r['mrr'] - before['mrr']:>+8.3f}"
+                  + f"{r['latency']['p50_ms'] - before['latency']['p50_ms']:>+9.2f}"
+                  + f"{r['latency']['p99_ms'] - before['latency']['p99_ms']:>+9.2f}"
+                  + f"{r['bytes_per_vector'] - before['bytes_per_vector']:>+9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline recall/MRR vs latency for index variants')
+    parser.add_argument('--variants', default=DEFAULT_VARIANTS, help='comma-separated variant names')
+    parser.add_argument('--rounds', type=int, default=5, help='timed repetitions per query')
+    parser.add_argument('--output', default=None, help='write the full JSON report here')
+    parser.add_argument('--baseline', default=None, help='earlier report to diff against')
+    args = parser.parse_args()
+
+    chunks = profile_chunks(load_profile(ROOT / 'digitaltwin.json'))
+    chunk_ids = [ch['id'] for ch in chunks]
+    queries = load_queries()
+    unlabelled = [q['id'] for q in queries if not relevant_ids(chunk_ids, q['relevant'])]
+    if unlabelled:
+        print(f"⚠️ No chunk matches the relevance labels of {', '.join(unlabelled)}; skipping them")
+        queries = [q for q in queries if q['id'] not in unlabelled]
+    print(f"📚 {len(chunks)} chunks, {len(queries)} labelled queries")
+
+    names = [n.strip() for n in args.variants.split(',') if n.strip()]
+    variants = build_variants(names, chunks)
+    results = {}
+    for name in names:
+        print(f"⏱️  Evaluating {name} ...")
+        results[name] = evaluate(variants[name], queries, chunk_ids, args.rounds)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['variants']
+    print_table(results, baseline)
+
+    if args.output:
+        report = {'chunks': len(chunks), 'queries': len(queries), 'ks': list(DEFAULT_KS), 'variants': results}
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f"\n📝 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fan-out ingestion: one chunking and embedding pass feeding several indexes.
+
+Instead of running init-vector-huggingface.py, init-vector-hf-1024.py and
+init-vector-enhanced.py one after another (each re-reading, re-chunking and
+re-embedding the profile), this script:
+  1. chunks digitaltwin.json once (enhanced chunking, stable ids) and writes
+     the BM25 index and the chunk doc store once;
+  2. works out per target which chunks are new or changed (own manifest,
+     optional --sync against the target);
+  3. embeds the union of those chunks once per model, through the shared
+     embedding cache, and projects once per (model, projection, dimension);
+  4. uploads to every target concurrently, each with its own UpsertEngine and
+     rate limiter, starting as soon as that target's vectors are ready - so
+     uploads for one model overlap with embedding the next.
+
+Targets come from a JSON list (--targets, default scripts/ingest-targets.json;
+see ingest-targets.example.json):
+  {"name": "multilingual-1024",
+   "url_env": "UPSTASH_VECTOR_REST_URL", "token_env": "UPSTASH_VECTOR_REST_TOKEN",
+   "model": "paraphrase-multilingual-mpnet-base-v2",
+   "projection": "random" | "pca" | "whiten",     (default random)
+   "namespace": "",                              (default: the live alias target; unique per index)
+   "dimension": 1024}                            (default: read from /info)
+
+Requirements:
+  pip install sentence-transformers numpy requests python-dotenv
+
+Usage:
+  python scripts/ingest-fanout.py [--targets scripts/ingest-targets.json] [--only name,...] [--sync] [--full]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+        sys.stderr.reconfigure(encoding='utf-8')
+    except Exception:
+        pass
+
+from vector_ingest.alias import live_namespace
+from vector_ingest.bm25 import build_index as build_bm25_index
+from vector_ingest.bm25 import write_index as write_bm25_index
+from vector_ingest.docstore import open_docstore
+from vector_ingest.embed_cache import encode_cached
+from vector_ingest.embed_server import encoder_cache_key, load_encoder
+from vector_ingest.manifest import ChunkManifest, full_reindex_requested, manifest_path
+from vector_ingest.onnx_backend import load_backend
+from vector_ingest.process_pool import load_parallel
+from vector_ingest.profile import PROFILE_PREFIXES, load_profile, profile_chunks
+from vector_ingest.projection import (METHODS, manifest_model_key, normalize_rows, projection_path,
+                                      random_projection, refit_requested, resolve_projection)
+from vector_ingest.sync import delete_stale, plan_sync, sync_requested, vector_metadata
+from vector_ingest.upload import UpsertEngine, acknowledged_ids, make_item, summarize
+from vector_ingest.upstash import UpstashClient, UpstashError
+
+root = Path(__file__).resolve().parent.parent
+load_dotenv(root / '.env.local')
+
+DEFAULT_TARGETS = Path(os.getenv('INGEST_TARGETS', Path(__file__).resolve().parent / 'ingest-targets.json'))
+BATCH_SIZE = int(os.getenv('UPSTASH_UPLOAD_BATCH', '8'))
+
+
+def safe_metadata(metadata):
+    # Ensure metadata values are not too long (Upstash limit)
+    return {k: (v[:500] + '...' if isinstance(v, str) and len(v) > 500 else v) for k, v in metadata.items()}
+
+
+def load_targets(path, only=None):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        targets = json.load(f)
+    if only:
+        targets = [t for t in targets if t['name'] in only]
+    seen = {}
+    for t in targets:
+        t.setdefault('url_env', 'UPSTASH_VECTOR_REST_URL')
+        t.setdefault('token_env', 'UPSTASH_VECTOR_REST_TOKEN')
+        t.setdefault('projection', 'random')
+        t.setdefault('namespace', None)  # None: whatever the index's alias points at
+        if t['projection'] not in METHODS:
+            raise ValueError(f"{t['name']}: projection must be one of {', '.join(METHODS)}")
+        t['url'], t['token'] = os.getenv(t['url_env']), os.getenv(t['token_env'])
+        if not t['url'] or not t['token']:
+            raise ValueError(f"{t['name']}: missing {t['url_env']} / {t['token_env']} in .env.local")
+        # Same index and namespace means the same chunk ids and manifest file: the targets would overwrite each other
+        where = (t['url'].rstrip('/'), t['namespace'])
+        if where in seen:
+            raise ValueError(f"{t['name']}: same index and namespace as {seen[where]}; give it its own namespace")
+        seen[where] = t['name']
+    return targets
+
+
+class ModelPool:
+    """Loads each model once and embeds through the shared cache."""
+
+    def __init__(self):
+        self.models = {}
+        self.lock = threading.Lock()
+
+    def load(self, name):
+        with self.lock:
+            if name not in self.models:
+                def load_torch():
+                    from sentence_transformers import SentenceTransformer
+                    print(f"🌍 Loading model: {name}")
+                    return SentenceTransformer(name)
+                self.models[name] = load_encoder(name, lambda: load_parallel(name, lambda: load_backend(name, load_torch)))
+            return self.models[name]
+
+    def encode(self, name, texts):
+        return encode_cached(encoder_cache_key(name), texts, lambda: self.load(name))
+
+    def close(self):
+        for model in self.models.values():
+            if hasattr(model, 'close'):
+                model.close()
+
+
+def prepare_target(t, all_chunks, models, args):
+    """Resolve dimension, projection, manifest and pending chunks for one target."""
+    t['client'] = UpstashClient(t['url'], t['token'])
+    if t['namespace'] is None:
+        t['namespace'] = live_namespace(t['client'])
+    t['client'] = t['client'].scoped(t['namespace'])
+    t['dimension'] = int(t.get('dimension') or t['client'].dimension(default=1024))
+    t['fitted'] = resolve_projection(
+        t['projection'], t['dimension'],
+        projection_path(t['url'], t['model'], t['projection'], t['dimension'], namespace=t['namespace']),
+        fit_vectors=lambda: models.encode(t['model'], [ch['content'] for ch in all_chunks]),
+        refit=refit_requested(args.refit_projection),
+    )
+    t['manifest'] = ChunkManifest(manifest_path(t['url'], namespace=t['namespace']),
+                                  manifest_model_key(t['model'], t['fitted']), t['dimension'],
+                                  enabled=not full_reindex_requested(args.full))
+    t['stale'] = []
+    if sync_requested(args.sync):
+        plan = plan_sync(t['client'], all_chunks, t['manifest'], PROFILE_PREFIXES,
+                         remote_metadata=lambda ch: safe_metadata(ch['metadata']))
+        t['pending'], t['stale'] = plan['pending'], plan['stale']
+    else:
+        t['pending'] = t['manifest'].pending(all_chunks)
+    print(f"🎯 {t['name']}: {t['model']} -> {t['dimension']}d ({t['projection']}"
+          f"{', ns ' + t['namespace'] if t['namespace'] else ''}), "
+          f"{len(t['pending'])}/{len(all_chunks)} chunks to upload, {len(t['stale'])} stale")
+
+
+def upload_target(t, vectors, docstore):
+    """Upload one target's pending chunks; runs on the fan-out thread pool."""
+    started = time.perf_counter()
+    chunks_by_id = {ch['id']: ch for ch in t['pending']}
+    manifest = t['manifest']
+    items = [make_item(ch['id'], vectors[i], vector_metadata(safe_metadata(ch['metadata']), manifest))
+             for i, ch in enumerate(t['pending'])]
+    engine = UpsertEngine(t['url'], t['token'], namespace=t['namespace'])
+
+    def on_result(result):
+        if result['ok']:
+            manifest.mark(chunks_by_id[cid] for cid in result['ids'])
+            manifest.save()
+        else:
+            print(f"❌ {t['name']}: upsert failed: {result['status']} {result['error'][:200]}")
+
+    try:
+        results = engine.upload(items, batch_size=BATCH_SIZE, on_result=on_result)
+    finally:
+        engine.close()
+    for result in results:
+        if not result['ok']:
+            manifest.mark(chunks_by_id[cid] for cid in acknowledged_ids(result))
+    manifest.save()
+    summary = summarize(results)
+    if summary['error'] == 0:
+        delete_stale(t['client'], manifest, t['stale'], docstore)
+    elif t['stale']:
+        print(f"⚠️ {t['name']}: keeping {len(t['stale'])} stale vectors until all uploads succeed")
+    print(f"✅ {t['name']}: {summary['success']}/{len(items)} uploaded in {time.perf_counter() - started:.1f}s "
+          f"({engine.limiter.describe()}, {engine.describe_payload()})")
+    return summary
+
+
+def project(embeddings, t):
+    if t['fitted'] is not None:
+        return t['fitted'].apply(embeddings)
+    if embeddings.shape[1] != t['dimension']:
+        return random_projection(embeddings.shape[1], t['dimension']).apply(embeddings)
+    return normalize_rows(embeddings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Embed once, upload to several indexes')
+    parser.add_argument('--targets', default=str(DEFAULT_TARGETS), help='JSON list of target indexes')
+    parser.add_argument('--only', default=None, help='comma-separated target names to run')
+    parser.add_argument('--sync', action='store_true', help='diff against each index and delete stale ids')
+    parser.add_argument('--full', action='store_true', help='ignore the manifests and re-upload everything')
+    parser.add_argument('--refit-projection', action='store_true', help='refit pca/whiten projections')
+    args = parser.parse_args()
+
+    try:
+        targets = load_targets(args.targets, set(args.only.split(',')) if args.only else None)
+    except (OSError, ValueError) as e:
+        print(f'❌ {e}')
+        return 1
+    if not targets:
+        print('❌ No targets to ingest')
+        return 1
+
+    all_chunks = profile_chunks(load_profile(root / 'digitaltwin.json'))
+    print(f"✅ Generated {len(all_chunks)} chunks once for {len(targets)} targets")
+    if write_bm25_index(build_bm25_index(all_chunks)):
+        print('🔤 BM25 index updated')
+    try:
+        docstore = open_docstore()
+        written = docstore.put_many(all_chunks)
+    except (ValueError, RuntimeError) as e:
+        print(f'❌ Failed to write chunk documents: {e}')
+        return 1
+    if written:
+        print(f"📚 {written} chunk documents written to {docstore.describe()}")
+
+    models = ModelPool()
+    try:
+        for t in targets:
+            prepare_target(t, all_chunks, models, args)
+    except UpstashError as e:
+        print('❌ Failed to prepare target:', e)
+        return 1
+
+    by_model = {}
+    for t in targets:
+        if t['pending']:
+            by_model.setdefault(t['model'], []).append(t)
+
+    started = time.perf_counter()
+    futures = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(targets)), thread_name_prefix='fanout') as pool:
+        for model_name, group in by_model.items():
+            # One embedding pass per model over the union of what its targets need
+            needed = {ch['id']: ch for t in group for ch in t['pending']}
+            order = list(needed)
+            embeddings = models.encode(model_name, [needed[cid]['content'] for cid in order])
+            row = {cid: i for i, cid in enumerate(order)}
+            print(f"🧠 {model_name}: embedded {len(order)} chunks for {len(group)} target(s)")
+
+            projected = {}
+            for t in group:
+                key = (t['fitted'].tag if t['fitted'] is not None else 'random', t['dimension'])
+                if key not in projected:
+                    projected[key] = project(embeddings, t)
+                vectors = projected[key][[row[ch['id']] for ch in t['pending']]]
+                futures[t['name']] = pool.submit(upload_target, t, vectors, docstore)
+        summaries = {name: f.result() for name, f in futures.items()}
+    models.close()
+
+    for t in targets:
+        if not t['pending']:
+            delete_stale(t['client'], t['manifest'], t['stale'], docstore)
+            t['manifest'].save()
+
+    failed = sum(s['error'] for s in summaries.values())
+    total = sum(len(t['pending']) for t in targets)
+    print(f"\n📊 Fan-out complete in {time.perf_counter() - started:.1f}s:")
+    for t in targets:
+        s = summaries.get(t['name'], {'success': 0, 'error': 0})
+        print(f"   {'✅' if s['error'] == 0 else '❌'} {t['name']}: Success: {s['success']}/{len(t['pending'])}")
+    print(f"   ✅ Success: {total - failed}/{total}")
+    print(f"   ❌ Failed: {failed}/{total}")
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
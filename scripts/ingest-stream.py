@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming ingestion for large corpora (scraped jobs, transcripts, JSONL dumps).
+
+Unlike the init-vector scripts, nothing is loaded up front: records are read
+one at a time (see scripts/vector_ingest/sources.py), chunked lazily, and
+pushed through the embed -> project -> serialize -> upload pipeline in fixed
+windows. Bounded queues between stages keep peak memory flat regardless of
+corpus size; only the per-chunk hash manifest grows with the corpus.
+
+Sources:
+  job_data.json            list written by SeekJobScraper.save_to_json
+  *.jsonl / *.ndjson       one record per line ({id, text|content, metadata})
+
+PROJECTION=pca|whiten fits the projection on the first PROJECTION_FIT_SAMPLES
+chunks (default 2048) of the sources and saves it next to the manifest; see
+scripts/vector_ingest/projection.py.
+
+Chunk texts are written to the doc store (DOCSTORE, see
+scripts/vector_ingest/docstore.py) one window ahead of its upsert; use
+DOCSTORE=redis for large corpora, since the file store is rewritten per window.
+
+Requirements:
+  pip install sentence-transformers numpy requests python-dotenv
+
+Usage:
+  python scripts/ingest-stream.py job_data.json transcripts.jsonl [--window 64] [--full]
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+from dotenv import load_dotenv
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+        sys.stderr.reconfigure(encoding='utf-8')
+    except Exception:
+        pass
+
+from vector_ingest.alias import live_namespace
+from vector_ingest.docstore import open_docstore
+from vector_ingest.embed_cache import EmbeddingCache, encode_cached
+from vector_ingest.embed_server import encoder_cache_key, load_encoder
+from vector_ingest.manifest import ChunkManifest, full_reindex_requested, manifest_path
+from vector_ingest.onnx_backend import load_backend
+from vector_ingest.pipeline import StagedPipeline, windows
+from vector_ingest.process_pool import load_parallel
+from vector_ingest.projection import (manifest_model_key, normalize_rows, projection_method,
+                                      projection_path, random_projection, refit_requested,
+                                      resolve_projection)
+from vector_ingest.sources import iter_chunks
+from vector_ingest.upload import UpsertEngine, acknowledged_ids, make_item, summarize
+from vector_ingest.upstash import UpstashClient, UpstashError
+
+root = Path(__file__).resolve().parent.parent
+load_dotenv(root / '.env.local')
+
+UPSTASH_URL = os.getenv('UPSTASH_VECTOR_REST_URL')
+UPSTASH_TOKEN = os.getenv('UPSTASH_VECTOR_REST_TOKEN')
+MODEL_NAME = os.getenv('INGEST_MODEL', 'paraphrase-multilingual-mpnet-base-v2')
+BATCH_SIZE = int(os.getenv('UPSTASH_UPLOAD_BATCH', '32'))
+MANIFEST_SAVE_SECONDS = 5.0
+PROJECTION_FIT_SAMPLES = int(os.getenv('PROJECTION_FIT_SAMPLES', '2048'))
+
+
+def index_dimension(url, token):
+    resp = requests.get(url.rstrip('/') + '/info', headers={'Authorization': f'Bearer {token}'}, timeout=15)
+    if resp.status_code != 200:
+        print('❌ Failed to fetch Upstash index info:', resp.status_code, resp.text[:200])
+        raise SystemExit(1)
+    info = resp.json()
+    info = info.get('result', info)
+    dim = info.get('dimension')
+    if not dim:
+        print('⚠️ Could not determine expected vector dimension. Defaulting to 1024')
+        return 1024
+    return int(dim)
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+    except ImportError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream large JSON/JSONL corpora into Upstash Vector')
+    parser.add_argument('sources', nargs='+', help='job_data.json, *.jsonl or *.ndjson files')
+    parser.add_argument('--window', type=int, default=int(os.getenv('INGEST_WINDOW', '64')))
+    parser.add_argument('--full', action='store_true', help='ignore the manifest and re-upload everything')
+    parser.add_argument('--refit-projection', action='store_true', help='refit a pca/whiten projection')
+    args = parser.parse_args()
+
+    if not UPSTASH_URL or not UPSTASH_TOKEN:
+        print('❌ Missing Upstash credentials in .env.local')
+        return 1
+    missing = [p for p in args.sources if not Path(p).exists()]
+    if missing:
+        print(f"❌ Source not found: {', '.join(missing)}")
+        return 1
+
+    expected_dim = index_dimension(UPSTASH_URL, UPSTASH_TOKEN)
+    print(f"📏 Upstash expects dimension: {expected_dim}")
+    try:
+        # Write to the generation chat reads (see vector_ingest/alias.py)
+        namespace = live_namespace(UpstashClient(UPSTASH_URL, UPSTASH_TOKEN))
+    except UpstashError as e:
+        print('❌ Failed to read the namespace alias:', e)
+        return 1
+    model_lock = threading.Lock()
+    model_ref = {}
+
+    def load_torch_model():
+        from sentence_transformers import SentenceTransformer
+        print(f"🌍 Loading model: {MODEL_NAME}")
+        return SentenceTransformer(MODEL_NAME)
+
+    def load_model():
+        with model_lock:
+            if 'model' not in model_ref:
+                model_ref['model'] = load_encoder(MODEL_NAME, lambda: load_parallel(
+                    MODEL_NAME, lambda: load_backend(MODEL_NAME, load_torch_model)))
+            return model_ref['model']
+
+    # One cache for the whole stream: index.json is written per FLUSH_ROWS rows, not per window
+    embed_key = encoder_cache_key(MODEL_NAME)  # keyed by the backend that encodes (local or server)
+    cache = EmbeddingCache(embed_key)
+
+    def fit_sample():
+        sample = itertools.islice(iter_chunks(args.sources), PROJECTION_FIT_SAMPLES)
+        return encode_cached(embed_key, [ch['content'] for ch in sample], load_model, cache=cache)
+
+    method = projection_method()
+    fitted = resolve_projection(method, expected_dim, projection_path(UPSTASH_URL, MODEL_NAME, method, expected_dim),
+                                fit_vectors=fit_sample, refit=refit_requested(args.refit_projection))
+    manifest = ChunkManifest(manifest_path(UPSTASH_URL, namespace=namespace), manifest_model_key(MODEL_NAME, fitted), expected_dim,
+                             enabled=not full_reindex_requested(args.full))
+    projection = {}
+
+    def to_target_matrix(emb):
+        # Same projection as init-vector-enhanced.py, so vectors are comparable
+        model_dim = emb.shape[1]
+        if model_dim not in projection:
+            if fitted is not None:
+                projection[model_dim] = fitted
+            elif model_dim != expected_dim:
+                projection[model_dim] = random_projection(model_dim, expected_dim)
+            else:
+                projection[model_dim] = None
+        proj = projection[model_dim]
+        return normalize_rows(emb) if proj is None else proj.apply(emb)
+
+    try:
+        docstore = open_docstore()
+    except ValueError as e:
+        print(f'❌ {e}')
+        return 1
+    engine = UpsertEngine(UPSTASH_URL, UPSTASH_TOKEN, namespace=namespace)
+    totals = {'seen': 0, 'skipped': 0, 'success': 0, 'error': 0}
+    last_save = [time.monotonic()]
+
+    def pending_chunks():
+        # Manifest filtering happens while streaming, so unchanged chunks are never embedded
+        for chunk in iter_chunks(args.sources):
+            totals['seen'] += 1
+            if manifest.is_current(chunk):
+                totals['skipped'] += 1
+                continue
+            yield chunk
+
+    def embed_stage(window):
+        return window, encode_cached(embed_key, [ch['content'] for ch in window], load_model, cache=cache)
+
+    def project_stage(job):
+        window, embeddings = job
+        return window, to_target_matrix(embeddings)
+
+    def serialize_stage(job):
+        window, vectors = job
+        items = [make_item(ch['id'], vectors[i], {k: (v[:500] if isinstance(v, str) else v)
+                                                 for k, v in ch['metadata'].items()})
+                 for i, ch in enumerate(window)]
+        # Texts land in the doc store before any vector points at them
+        docstore.put_many(window)
+        return window, items
+
+    def upload_stage(job):
+        window, items = job
+        results = engine.upload(items, batch_size=BATCH_SIZE)
+        by_id = {ch['id']: ch for ch in window}
+        manifest.mark(by_id[cid] for r in results for cid in acknowledged_ids(r) if cid in by_id)
+        if time.monotonic() - last_save[0] >= MANIFEST_SAVE_SECONDS:
+            manifest.save()
+            last_save[0] = time.monotonic()
+        summary = summarize(results)
+        totals['success'] += summary['success']
+        totals['error'] += summary['error']
+        for err in summary['errors'][:3]:
+            print(f"❌ {err['chunk_id']}: {err['status']} {err['error']}")
+        return summary['success']
+
+    print(f"\n📤 Streaming {', '.join(args.sources)} in windows of {args.window} "
+          f"(batches of {BATCH_SIZE}, {engine.concurrency} in flight)...")
+    pipeline = StagedPipeline([
+        ('embed', embed_stage),
+        ('project', project_stage),
+        ('serialize', serialize_stage),
+        ('upload', upload_stage),
+    ])
+    try:
+        pipeline.run(windows(pending_chunks(), args.window))
+    finally:
+        manifest.save()
+        cache.flush()
+        engine.close()
+        if hasattr(model_ref.get('model'), 'close'):
+            model_ref['model'].close()
+    pipeline.print_stats()
+
+    uploaded = totals['seen'] - totals['skipped']
+    rss = peak_rss_mb()
+    print(f"\n📊 Upload complete:")
+    print(f"   🗂️ {totals['skipped']} unchanged chunks skipped, {uploaded} new or changed")
+    print(f"   ⏱️ Final upsert pace: {engine.limiter.describe()}, {engine.describe_payload()}")
+    if rss is not None:
+        print(f"   🧠 Peak RSS: {rss:.0f} MB")
+    print(f"   ✅ Success: {totals['success']}/{uploaded}")
+    print(f"   ❌ Failed: {totals['error']}/{uploaded}")
+    return 0 if totals['error'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
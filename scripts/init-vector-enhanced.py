@@ -14,15 +14,21 @@ Requirements:
   pip install sentence-transformers numpy requests python-dotenv
 
 Usage:
-  python scripts/init-vector-enhanced.py
+  python scripts/init-vector-enhanced.py           # upload new/changed chunks only
+  python scripts/init-vector-enhanced.py --sync    # also diff against the index and delete stale ids
+  python scripts/init-vector-enhanced.py --full    # re-upload everything
+  python scripts/init-vector-enhanced.py --resume  # continue an interrupted run from its journal
+  python scripts/init-vector-enhanced.py --shadow  # build a new generation, validate, then flip the alias
+  PROJECTION=pca python scripts/init-vector-enhanced.py   # fitted PCA into a narrower (e.g. 384-dim) index
 """
 
+import argparse
 import os
 import sys
-import json
+import threading
+import time
 from pathlib import Path
 from dotenv import load_dotenv
-import requests
 import numpy as np
 
 # Fix Windows console encoding for emoji/unicode
@@ -36,8 +42,32 @@ if sys.platform == 'win32':
 try:
     from sentence_transformers import SentenceTransformer
 except Exception as e:
-    print("Missing sentence-transformers. Install with: pip install sentence-transformers")
-    raise
+    # Not needed with a warm embedding server or a cached ONNX export
+    if not (os.getenv('EMBEDDING_SERVER_URL') or os.getenv('EMBEDDING_BACKEND') == 'onnx'):
+        print("Missing sentence-transformers. Install with: pip install sentence-transformers")
+        raise
+
+from vector_ingest.alias import (ALIAS_ID, VALIDATE_SAMPLES, begin_generation, cutover, live_namespace,
+                                 shadow_requested, validate_generation)
+from vector_ingest.bm25 import INDEX_PATH as BM25_INDEX_PATH
+from vector_ingest.bm25 import build_index as build_bm25_index
+from vector_ingest.bm25 import write_index as write_bm25_index
+from vector_ingest.docstore import open_docstore
+from vector_ingest.embed_cache import EmbeddingCache, encode_cached
+from vector_ingest.embed_server import encoder_cache_key, load_encoder
+from vector_ingest.journal import IngestJournal, journal_path, resume_filter, resume_requested
+from vector_ingest.manifest import ChunkManifest, full_reindex_requested, manifest_path
+from vector_ingest.onnx_backend import load_backend
+from vector_ingest.pipeline import StagedPipeline, windows
+from vector_ingest.process_pool import load_parallel
+from vector_ingest.profile import PROFILE_PREFIXES, load_profile, profile_chunks
+from vector_ingest.progress import ProgressReporter
+from vector_ingest.projection import (manifest_model_key, normalize_rows, projection_method,
+                                      projection_path, random_projection, refit_requested,
+                                      resolve_projection)
+from vector_ingest.sync import delete_stale, plan_sync, sync_requested, vector_metadata
+from vector_ingest.upload import UpsertEngine, acknowledged_ids, make_item, summarize
+from vector_ingest.upstash import UpstashClient, UpstashError
 
 # Load env
 root = Path(__file__).resolve().parent.parent
@@ -48,273 +78,289 @@ UPSTASH_TOKEN = os.getenv('UPSTASH_VECTOR_REST_TOKEN')
 # Use multilingual model for better Chinese support
 MODEL_NAME = 'paraphrase-multilingual-mpnet-base-v2'  # 768D, supports 50+ languages
 BATCH_SIZE = int(os.getenv('UPSTASH_UPLOAD_BATCH', '8'))
+WINDOW_SIZE = int(os.getenv('INGEST_WINDOW', '64'))  # chunks per pipeline window
+MANIFEST_SAVE_SECONDS = 5.0  # the journal is the per-batch durable record
 
-if not UPSTASH_URL or not UPSTASH_TOKEN:
-    print('❌ Missing Upstash credentials in .env.local')
-    raise SystemExit(1)
-
-# Load digitaltwin data
-with open(root / 'digitaltwin.json', 'r', encoding='utf-8') as f:
-    dt = json.load(f)
-
-chunks = []
-chunk_id = 0
-
-# Personal - more detailed
-personal = dt['personal']
-chunks.append({
-    'id': f'personal-basic-{chunk_id}',
-    'content': f"{personal['name']} is a {personal['title']} based in {personal.get('location', 'Australia')}. {personal.get('summary', '')}",
-    'metadata': {'type': 'personal', 'source': 'Personal Information', 'category': 'basic'}
-})
-chunk_id += 1
-
-chunks.append({
-    'id': f'personal-pitch-{chunk_id}',
-    'content': f"Elevator pitch: {personal.get('elevator_pitch', '')}",
-    'metadata': {'type': 'personal', 'source': 'Personal Information', 'category': 'pitch'}
-})
-chunk_id += 1
-
-# Experience - EACH company gets detailed separate chunks
-for exp in dt.get('experience', []):
-    company = exp.get('company', '')
-    title = exp.get('title', '')
-    
-    # Company overview chunk - with Chinese company name if available
-    company_keywords = company
-    if '中山' in company or 'Zhongshan' in company:
-        company_keywords = f"{company} (中山恒润会计师事务所, Zhongshan Hengrun Accounting Firm)"
-    elif 'BF Suma' in company:
-        company_keywords = f"{company} (BF Suma Australia, customer success)"
-    
-    chunks.append({
-        'id': f'exp-overview-{company.replace(" ", "_")}-{chunk_id}',
-        'content': f"{title} at {company_keywords} ({exp.get('duration', '')}). Context: {exp.get('company_context', '')}. Team structure: {exp.get('team_structure', '')}. Technologies used: {', '.join(exp.get('technical_skills_used', []))}.",
-        'metadata': {'type': 'experience', 'source': f"{company} - Overview", 'category': 'overview', 'company': company}
-    })
-    chunk_id += 1
-    
-    # Each STAR achievement gets its own chunk with keywords
-    for idx, star in enumerate(exp.get('achievements_star', [])):
-        # Extract key metrics/keywords from result
-        result = star.get('result', '')
-        keywords = []
-        if 'churn' in result.lower() or '22%' in result or '16%' in result:
-            keywords.append('customer churn reduction')
-        if '$600' in result or '600K' in result:
-            keywords.append('cost savings')
-        if '税' in result or 'tax' in result.lower():
-            keywords.append('tax compliance')
-        if '1000+' in result or '1,000' in result:
-            keywords.append('large scale operations')
-        
-        keyword_str = f" Keywords: {', '.join(keywords)}." if keywords else ""
-        
-        chunks.append({
-            'id': f'exp-star-{company.replace(" ", "_")}-{idx}-{chunk_id}',
-            'content': f"Achievement at {company}: Situation - {star.get('situation', '')}. Task - {star.get('task', '')}. Action - {star.get('action', '')}. Result - {star.get('result', '')}.{keyword_str}",
-            'metadata': {'type': 'experience', 'source': f"{company} - Achievement {idx+1}", 'category': 'achievement', 'company': company}
-        })
-        chunk_id += 1
-    
-    # Separate leadership chunk if exists
-    if exp.get('leadership_examples'):
-        chunks.append({
-            'id': f'exp-leadership-{company.replace(" ", "_")}-{chunk_id}',
-            'content': f"Leadership experience at {company}: {'. '.join(exp.get('leadership_examples', []))}",
-            'metadata': {'type': 'experience', 'source': f"{company} - Leadership", 'category': 'leadership', 'company': company}
-        })
-        chunk_id += 1
-    
-    # Add quantifiable impact chunk if there are metrics
-    metrics = []
-    for star in exp.get('achievements_star', []):
-        result = star.get('result', '')
-        if any(char.isdigit() for char in result):
-            metrics.append(result)
-    
-    if metrics:
-        chunks.append({
-            'id': f'exp-metrics-{company.replace(" ", "_")}-{chunk_id}',
-            'content': f"Quantifiable impact at {company}: {' | '.join(metrics)}",
-            'metadata': {'type': 'experience', 'source': f"{company} - Metrics", 'category': 'metrics', 'company': company}
-        })
-        chunk_id += 1
-
-# Skills - more granular
-tech = dt.get('skills', {}).get('technical', {})
-for lang in tech.get('programming_languages', []):
-    chunks.append({
-        'id': f'skill-lang-{lang.get("language", "").replace(" ", "_")}-{chunk_id}',
-        'content': f"Programming language expertise: {lang.get('language', '')} ({lang.get('proficiency', '')} level) with {lang.get('years_experience', '')} years of experience. Frameworks: {', '.join(lang.get('frameworks', []))}. Use cases: {', '.join(lang.get('use_cases', []))}.",
-        'metadata': {'type': 'skill', 'source': f"Technical Skills - {lang.get('language', '')}", 'category': 'programming'}
-    })
-    chunk_id += 1
-
-# AI/ML as separate chunk
-if tech.get('ai_ml'):
-    chunks.append({
-        'id': f'skill-ai-ml-{chunk_id}',
-        'content': f"AI and Machine Learning skills: {', '.join(tech.get('ai_ml', []))}",
-        'metadata': {'type': 'skill', 'source': 'Technical Skills - AI/ML', 'category': 'ai_ml'}
-    })
-    chunk_id += 1
-
-# Cloud platforms
-if tech.get('cloud_platforms'):
-    chunks.append({
-        'id': f'skill-cloud-{chunk_id}',
-        'content': f"Cloud platform experience: {', '.join(tech.get('cloud_platforms', []))}",
-        'metadata': {'type': 'skill', 'source': 'Technical Skills - Cloud', 'category': 'cloud'}
-    })
-    chunk_id += 1
-
-# Projects - each project separate with detailed context
-for proj in dt.get('projects_portfolio', []):
-    chunks.append({
-        'id': f'project-{proj.get("name", "").replace(" ", "_")}-{chunk_id}',
-        'content': f"Project: {proj.get('name', '')}. Description: {proj.get('description', '')}. Technologies used: {', '.join(proj.get('technologies', []))}. Business impact: {proj.get('impact', '')}. Key features: {'. '.join(proj.get('key_features', []))}.",
-        'metadata': {'type': 'project', 'source': f"Project - {proj.get('name', '')}", 'category': 'project'}
-    })
-    chunk_id += 1
-
-print(f"✅ Generated {len(chunks)} enhanced chunks (increased from 18)")
-
-# Discover Upstash expected dimension
-info_url = UPSTASH_URL.rstrip('/') + '/info'
-resp = requests.get(info_url, headers={'Authorization': f'Bearer {UPSTASH_TOKEN}'}, timeout=15)
-if resp.status_code != 200:
-    print('❌ Failed to fetch Upstash index info:', resp.status_code, resp.text)
-    raise SystemExit(1)
-
-info = resp.json()
-expected_dim = None
-for k in ('dimension', 'dims', 'dimension_size', 'vector_dimension', 'size'):
-    if k in info:
-        expected_dim = int(info[k])
-        break
-
-if expected_dim is None:
-    for v in info.values():
-        if isinstance(v, (int, float)) and 64 <= int(v) <= 8192:
-            expected_dim = int(v)
-            break
-
-if expected_dim is None:
-    print('⚠️ Could not determine expected vector dimension. Defaulting to 1024')
-    expected_dim = 1024
-
-print(f"📏 Upstash expects dimension: {expected_dim}")
-
-# Load multilingual model
-print(f"🌍 Loading multilingual model: {MODEL_NAME}")
-model = SentenceTransformer(MODEL_NAME)
-
-# Check model dimension
-sample = chunks[0]['content'] if chunks else 'test'
-emb0 = model.encode(sample)
-model_dim = len(emb0)
-print(f"📊 Model output dimension: {model_dim}")
-
-# Build projection matrix if needed
-rng_seed = 42
-if model_dim != expected_dim:
-    print(f"🔧 Dimension mismatch: {model_dim} -> {expected_dim}. Creating deterministic projection.")
-    rng = np.random.RandomState(rng_seed)
-    proj = rng.normal(size=(expected_dim, model_dim)).astype('float32')
-    row_norms = np.linalg.norm(proj, axis=1, keepdims=True)
-    row_norms[row_norms == 0] = 1.0
-    proj = proj / row_norms
-else:
-    proj = None
-
-def to_target_vec(vec: np.ndarray) -> np.ndarray:
-    if proj is None:
-        out = vec
-    else:
-        out = proj.dot(vec)
-    norm = np.linalg.norm(out)
-    if norm > 0:
-        out = out / norm
-    return out.astype(float)
-
-# Batch upload
-upload_url = UPSTASH_URL.rstrip('/') + '/upsert'
-headers = {'Authorization': f'Bearer {UPSTASH_TOKEN}', 'Content-Type': 'application/json'}
-
-success = 0
-fail = 0
-batch = []
-
-print(f"\n📤 Uploading {len(chunks)} vectors in batches of {BATCH_SIZE}...")
-
-for i, ch in enumerate(chunks):
-    text = ch['content']
-    emb = model.encode(text)
-    final = to_target_vec(np.array(emb))
-    vec_list = final.tolist()
-    
+def safe_metadata(metadata):
     # Ensure metadata values are not too long (Upstash limit)
-    safe_metadata = {}
-    for k, v in ch['metadata'].items():
-        if isinstance(v, str) and len(v) > 500:
-            safe_metadata[k] = v[:500] + '...'
-        else:
-            safe_metadata[k] = v
-    
-    item = {
-        'id': ch['id'],
-        'vector': vec_list,
-        'metadata': safe_metadata
-    }
-    batch.append(item)
-    
-    if len(batch) >= BATCH_SIZE or i == len(chunks) - 1:
-        # Upstash REST API format: send array of items directly (not wrapped in {vectors: []})
-        # Each item format: [id, vector, metadata]
-        upstash_batch = []
-        for item in batch:
-            upstash_batch.append([
-                item['id'],
-                item['vector'],
-                item['metadata']
-            ])
-        
-        try:
-            r = requests.post(upload_url, headers=headers, json=upstash_batch, timeout=30)
-            if r.status_code == 200:
-                success += len(batch)
-                print(f"✅ Uploaded batch of {len(batch)} vectors ({success}/{len(chunks)})")
+    return {k: (v[:500] + '...' if isinstance(v, str) and len(v) > 500 else v) for k, v in metadata.items()}
+
+model_lock = threading.Lock()
+model_ref = {}
+
+def load_torch_model():
+    print(f"🌍 Loading multilingual model: {MODEL_NAME}")
+    return SentenceTransformer(MODEL_NAME)
+
+def load_local_model():
+    # EMBEDDING_WORKERS>1 spawns workers that re-import this file; main() keeps them from re-running it
+    return load_parallel(MODEL_NAME, lambda: load_backend(MODEL_NAME, load_torch_model))
+
+def load_model():
+    # Called from the embed stage; load weights once, and only on a cache miss
+    with model_lock:
+        if 'model' not in model_ref:
+            model_ref['model'] = load_encoder(MODEL_NAME, load_local_model)
+        return model_ref['model']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Embed digitaltwin.json chunks into Upstash Vector')
+    parser.add_argument('--sync', action='store_true', help='diff against the index and delete stale ids')
+    parser.add_argument('--full', action='store_true', help='ignore the manifest and re-upload everything')
+    parser.add_argument('--resume', action='store_true', help='skip chunks an interrupted run already uploaded')
+    parser.add_argument('--shadow', action='store_true', help='build a new generation, validate, then flip the alias')
+    parser.add_argument('--refit-projection', action='store_true', help='refit a pca/whiten projection')
+    args = parser.parse_args()
+
+    if not UPSTASH_URL or not UPSTASH_TOKEN:
+        print('❌ Missing Upstash credentials in .env.local')
+        return 1
+
+    # Structured JSON events for the job runner (no-op unless INGEST_EVENTS is set)
+    progress = ProgressReporter()
+    progress.emit('chunking')
+
+    # Load digitaltwin data and build chunks with content-derived ids
+    dt = load_profile(root / 'digitaltwin.json')
+    chunks = profile_chunks(dt)
+
+    print(f"✅ Generated {len(chunks)} enhanced chunks (increased from 18)")
+    progress.emit('planning', chunks=len(chunks))
+
+    # Lexical side of hybrid retrieval: BM25 over the same chunks, loaded by lib/bm25.ts
+    if write_bm25_index(build_bm25_index(chunks)):
+        print(f"🔤 BM25 index updated: {BM25_INDEX_PATH.relative_to(root)}")
+
+    # Chunk texts go to the doc store before any vector points at them; metadata stays small
+    try:
+        docstore = open_docstore()
+        written = docstore.put_many(chunks)
+    except (ValueError, RuntimeError) as e:
+        print('❌ Failed to write chunk documents:', e)
+        return 1
+    if written:
+        print(f"📚 {written} chunk documents written to {docstore.describe()}")
+
+    # Discover Upstash expected dimension
+    client = UpstashClient(UPSTASH_URL, UPSTASH_TOKEN)
+    try:
+        expected_dim = client.dimension()
+    except UpstashError as e:
+        print('❌ Failed to fetch Upstash index info:', e)
+        return 1
+
+    if expected_dim is None:
+        print('⚠️ Could not determine expected vector dimension. Defaulting to 1024')
+        expected_dim = 1024
+
+    print(f"📏 Upstash expects dimension: {expected_dim}")
+
+    # --shadow: build a whole new generation in its own namespace; chat stays on the live one until cutover.
+    # Otherwise update the generation the alias points at, which is what chat reads
+    shadow = shadow_requested(args.shadow)
+    resume = resume_requested(args.resume)
+    try:
+        namespace = begin_generation(client, expected_dim, resume=resume) if shadow \
+            else live_namespace(client)
+    except UpstashError as e:
+        print('❌ Failed to read the namespace alias:', e)
+        return 1
+    client = client.scoped(namespace)
+    if shadow:
+        print(f"🌗 Shadow build into namespace {namespace}; live traffic stays on the current generation")
+    elif namespace:
+        print(f"🔀 Writing to live generation {namespace}")
+
+    all_chunks = chunks
+    # Cached vectors are keyed by the backend that encodes them (local or embedding server)
+    embed_key = encoder_cache_key(MODEL_NAME)
+
+    # PROJECTION=pca|whiten: fit on the whole corpus once (cached embeddings), reuse the saved artifact after
+    fitted_projection = resolve_projection(
+        projection_method(), expected_dim,
+        projection_path(UPSTASH_URL, MODEL_NAME, projection_method(), expected_dim),
+        fit_vectors=lambda: encode_cached(embed_key, [ch['content'] for ch in all_chunks], load_model),
+        refit=refit_requested(args.refit_projection),
+    )
+
+    # Skip chunks whose content hash is already recorded for this index/model/projection/dimension
+    manifest = ChunkManifest(manifest_path(UPSTASH_URL, namespace=namespace),
+                             manifest_model_key(MODEL_NAME, fitted_projection),
+                             expected_dim, enabled=not full_reindex_requested(args.full))
+    stale = []
+    if sync_requested(args.sync):
+        # Reconcile against the ids actually in the index, not just the local manifest
+        plan = plan_sync(client, all_chunks, manifest, PROFILE_PREFIXES,
+                         remote_metadata=lambda ch: safe_metadata(ch['metadata']))
+        chunks, stale = plan['pending'], plan['stale']
+        print(f"🔄 Sync: {plan['remote']} remote vectors, {len(plan['adopted'])} adopted, "
+              f"{len(chunks)} to upload, {len(stale)} stale")
+    else:
+        chunks = manifest.pending(all_chunks)
+
+    # Chunks acknowledged by an interrupted run (journal) are skipped with --resume, even under --full
+    journal = IngestJournal(journal_path(UPSTASH_URL, namespace=namespace), manifest.key)
+    chunks, resumed, resumes_run = resume_filter(journal, chunks, resume)
+    manifest.mark(resumed)
+    chunks_by_id = {ch['id']: ch for ch in chunks}
+
+    projection = {}
+
+    def get_projection(model_dim):
+        # Use the fitted projection if there is one, else the deterministic random matrix
+        if model_dim not in projection:
+            print(f"📊 Model output dimension: {model_dim}")
+            if fitted_projection is not None:
+                projection[model_dim] = fitted_projection
+            elif model_dim != expected_dim:
+                print(f"🔧 Dimension mismatch: {model_dim} -> {expected_dim}. Creating deterministic projection.")
+                projection[model_dim] = random_projection(model_dim, expected_dim)
             else:
-                print(f'❌ Upsert failed: {r.status_code} {r.text[:300]}')
-                # Try uploading one by one to find problematic chunk
-                for single_item in batch:
-                    single_upload = [[
-                        single_item['id'],
-                        single_item['vector'],
-                        single_item['metadata']
-                    ]]
-                    r2 = requests.post(upload_url, headers=headers, json=single_upload, timeout=30)
-                    if r2.status_code == 200:
-                        success += 1
-                        print(f"   ✅ Recovered: {single_item['id']}")
-                    else:
-                        fail += 1
-                        print(f"   ❌ Failed: {single_item['id']} - {r2.status_code}")
-        except Exception as e:
-            print(f'❌ Exception during upload: {str(e)[:200]}')
-            fail += len(batch)
-        batch = []
-
-print(f"\n📊 Upload complete:")
-print(f"   ✅ Success: {success}/{len(chunks)}")
-print(f"   ❌ Failed: {fail}/{len(chunks)}")
-
-if fail == 0:
-    print('\n🎉 All vectors uploaded successfully with enhanced chunking!')
-    print('   - Multilingual model for better Chinese query support')
-    print('   - More granular chunks for precise retrieval')
-    print('   - Company-specific keywords for better matching')
-else:
-    print(f'\n⚠️ {fail} uploads failed')
+                projection[model_dim] = None
+        return projection[model_dim]
+
+    def to_target_matrix(emb: np.ndarray) -> np.ndarray:
+        # emb: (n, model_dim) -> (n, expected_dim), rows normalized to unit length
+        proj = get_projection(emb.shape[1])
+        return normalize_rows(emb) if proj is None else proj.apply(emb)
+
+    def promote_generation():
+        # Cut over only once the new namespace is complete and finds its own sample chunks
+        progress.emit('validating', namespace=namespace, expected=len(all_chunks))
+        step = max(1, len(all_chunks) // VALIDATE_SAMPLES)
+        sample = all_chunks[::step][:VALIDATE_SAMPLES]
+        vectors = to_target_matrix(encode_cached(embed_key, [ch['content'] for ch in sample], load_model))
+        problems = validate_generation(client, namespace, len(all_chunks),
+                                       [(ch['id'], vectors[i]) for i, ch in enumerate(sample)])
+        if problems:
+            for problem in problems:
+                print(f"❌ Validation: {problem}")
+            print(f"⚠️ Alias not switched; rerun with --shadow --resume to finish {namespace}")
+            return False
+        record = cutover(client, namespace, expected_dim, vectors=len(all_chunks), model=manifest.key)
+        progress.emit('cutover', namespace=namespace, previous=record['previous'])
+        print(f"🔀 Alias '{ALIAS_ID}' now points at {namespace} "
+              f"(previous: {record['previous'] or 'default namespace'}, kept for rollback)")
+        return True
+
+    print(f"🗂️ {len(all_chunks) - len(chunks)} unchanged chunks skipped, {len(chunks)} new or changed")
+
+    if not chunks:
+        if resumes_run:
+            journal.start(0, resumes=resumes_run)
+            journal.finish(0, 0)
+        manifest.save()
+        delete_stale(client, manifest, stale, docstore)
+        promoted = promote_generation() if shadow else None
+        progress.emit('done', success=0, failed=0, total=0, skipped=len(all_chunks), promoted=promoted)
+        if promoted is False:
+            return 1
+        print('\n📊 Upload complete:')
+        print('   ✅ Success: 0/0')
+        print('   ❌ Failed: 0/0')
+        print('\n🎉 Index already up to date - nothing to embed or upload')
+        return 0
+
+    engine = UpsertEngine(UPSTASH_URL, UPSTASH_TOKEN, namespace=namespace)
+    uploaded = 0
+    last_save = time.monotonic()
+    journal.start(len(chunks), resumes=resumes_run)
+
+    def on_result(result):
+        nonlocal uploaded, last_save
+        if result['ok']:
+            uploaded += len(result['ids'])
+            journal.record(result, chunks_by_id)
+            manifest.mark(chunks_by_id[cid] for cid in result['ids'])
+            if time.monotonic() - last_save >= MANIFEST_SAVE_SECONDS:
+                manifest.save()
+                last_save = time.monotonic()
+            print(f"✅ Uploaded batch of {len(result['ids'])} vectors ({uploaded}/{len(chunks)})")
+            progress.advance('uploading', len(result['ids']), len(chunks))
+        else:
+            print(f"❌ Upsert failed: {result['status']} {result['error']}")
+
+    # Pipeline stages: embed -> project -> serialize -> upload, overlapped through bounded queues.
+    # The windows share one embedding cache, flushed once at the end of the run
+    cache = EmbeddingCache(embed_key)
+
+    def embed_stage(window):
+        embeddings = encode_cached(embed_key, [ch['content'] for ch in window], load_model, cache=cache)
+        progress.advance('embedding', len(window), len(chunks))
+        return window, embeddings
+
+    def project_stage(job):
+        window, embeddings = job
+        return window, to_target_matrix(embeddings)
+
+    def serialize_stage(job):
+        window, vectors = job
+        return [make_item(ch['id'], vectors[i], vector_metadata(safe_metadata(ch['metadata']), manifest))
+                for i, ch in enumerate(window)]
+
+    def upload_stage(items):
+        # Failed batches are bisected by the engine to isolate problematic chunks
+        return engine.upload(items, batch_size=BATCH_SIZE, on_result=on_result)
+
+    print(f"\n📤 Embedding and uploading {len(chunks)} chunks in windows of {WINDOW_SIZE} "
+          f"(batches of {BATCH_SIZE}, {engine.concurrency} in flight)...")
+
+    progress.start('embedding', len(chunks))
+    progress.start('uploading', len(chunks))
+    pipeline = StagedPipeline([
+        ('embed', embed_stage),
+        ('project', project_stage),
+        ('serialize', serialize_stage),
+        ('upload', upload_stage),
+    ])
+    try:
+        results = [r for window_results in pipeline.run(windows(chunks, WINDOW_SIZE)) for r in window_results]
+    finally:
+        # Keep what was acknowledged and release workers even if a stage raised or the run was interrupted
+        manifest.save()
+        cache.flush()
+        engine.close()
+        model = model_ref.pop('model', None)  # validation reloads it on a cache miss
+        if hasattr(model, 'close'):
+            model.close()
+    pipeline.print_stats()
+
+    for result in results:
+        if not result['ok']:
+            journal.record(result, chunks_by_id, acknowledged_ids(result))
+            manifest.mark(chunks_by_id[cid] for cid in acknowledged_ids(result))
+    manifest.save()
+
+    summary = summarize(results)
+    success, fail = summary['success'], summary['error']
+    journal.finish(success, fail)
+    promoted = promote_generation() if shadow and fail == 0 else None
+    progress.emit('done', success=success, failed=fail, total=len(chunks), skipped=len(all_chunks) - len(chunks),
+                  promoted=promoted)
+
+    # Only prune stale ids once their replacements are safely in the index
+    if fail == 0:
+        delete_stale(client, manifest, stale, docstore)
+    elif stale:
+        print(f"⚠️ Keeping {len(stale)} stale vectors until all uploads succeed")
+
+    print(f"\n📊 Upload complete:")
+    print(f"   ⏱️ Final upsert pace: {engine.limiter.describe()}, {engine.describe_payload()}")
+    print(f"   ✅ Success: {success}/{len(chunks)}")
+    print(f"   ❌ Failed: {fail}/{len(chunks)}")
+
+    if fail == 0:
+        print('\n🎉 All vectors uploaded successfully with enhanced chunking!')
+        print('   - Multilingual model for better Chinese query support')
+        print('   - More granular chunks for precise retrieval')
+        print('   - Company-specific keywords for better matching')
+    else:
+        print(f'\n⚠️ {fail} uploads failed')
+    if shadow and not promoted:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,7 @@
 """
 Generate embeddings using sentence-transformers (local, free) and ensure they match Upstash index dimension (e.g. 1024).
 If model output dimension != index dimension, apply a deterministic linear projection to expand or reduce to the required dimension.
+With PROJECTION=pca (or whiten) the projection is fitted on the corpus instead, for indexes narrower than the model (e.g. 384).
 Uploads vectors to Upstash Vector via REST API in batches.
 
 Requirements:
@@ -9,24 +10,46 @@ Requirements:
 
 Usage:
   python scripts/init-vector-hf-1024.py
+  python scripts/init-vector-hf-1024.py --sync    # also diff against the index and delete stale ids
 """
 
+import argparse
 import os
 import json
 from pathlib import Path
 from dotenv import load_dotenv
-import requests
-import math
 
 # Try to import sentence_transformers
 try:
     from sentence_transformers import SentenceTransformer
 except Exception as e:
-    print("Missing sentence-transformers. Install with: pip install sentence-transformers")
-    raise
+    # Not needed when a warm embedding server is configured (scripts/embedding-server.py)
+    if not os.getenv('EMBEDDING_SERVER_URL'):
+        print("Missing sentence-transformers. Install with: pip install sentence-transformers")
+        raise
 
 import numpy as np
 
+from vector_ingest.alias import live_namespace
+from vector_ingest.docstore import open_docstore
+from vector_ingest.embed_cache import encode_cached
+from vector_ingest.embed_server import encoder_cache_key, load_encoder
+from vector_ingest.ids import dedupe_ids, stable_id
+from vector_ingest.manifest import ChunkManifest, full_reindex_requested, manifest_path
+from vector_ingest.profile import PROFILE_PREFIXES
+from vector_ingest.projection import (manifest_model_key, normalize_rows, projection_method,
+                                      projection_path, random_projection, refit_requested,
+                                      resolve_projection)
+from vector_ingest.sync import delete_stale, plan_sync, sync_requested, vector_metadata
+from vector_ingest.upload import UpsertEngine, acknowledged_ids, make_item, summarize
+from vector_ingest.upstash import UpstashClient, UpstashError
+
+parser = argparse.ArgumentParser(description='Embed digitaltwin.json with sentence-transformers into Upstash Vector')
+parser.add_argument('--sync', action='store_true', help='diff against the index and delete stale ids')
+parser.add_argument('--full', action='store_true', help='ignore the manifest and re-upload everything')
+parser.add_argument('--refit-projection', action='store_true', help='refit a pca/whiten projection')
+args = parser.parse_args()
+
 # Load env
 root = Path(__file__).resolve().parent.parent
 load_dotenv(root / '.env.local')
@@ -41,86 +64,76 @@ if not UPSTASH_URL or not UPSTASH_TOKEN:
     raise SystemExit(1)
 
 # Load digitaltwin chunks (similar logic to lib/vectordb.ts)
-with open(root / 'digitaltwin.json', 'r', encoding='utf-8') as f:
+with open(root / 'digitaltwin.json', 'r', encoding='utf-8-sig') as f:
     dt = json.load(f)
 
 chunks = []
-chunk_id = 0
+
+
+def add(family, path, content, metadata):
+    # Ids hash the section path (company, language, project) and text, never the position,
+    # so inserting an achievement does not rename the ones after it (see vector_ingest/ids.py)
+    chunks.append({'id': stable_id(family, path, content), 'content': content, 'metadata': metadata})
+
 
 # Personal
-chunks.append({
-    'id': f'personal-{chunk_id}',
-    'content': f"Name: {dt['personal']['name']}. Title: {dt['personal']['title']}. Location: {dt['personal'].get('location','')}. Summary: {dt['personal'].get('summary','')}. Elevator Pitch: {dt['personal'].get('elevator_pitch','')}" ,
-    'metadata': {'type':'personal','source':'Personal Information'}
-})
-chunk_id += 1
+add('personal', '',
+    f"Name: {dt['personal']['name']}. Title: {dt['personal']['title']}. Location: {dt['personal'].get('location','')}. Summary: {dt['personal'].get('summary','')}. Elevator Pitch: {dt['personal'].get('elevator_pitch','')}",
+    {'type':'personal','source':'Personal Information'})
 
 # Experience
 for exp in dt.get('experience', []):
-    chunks.append({
-        'id': f'exp-overview-{chunk_id}',
-        'content': f"{exp.get('title','')} at {exp.get('company','')} ({exp.get('duration','')}). {exp.get('company_context','')}. Team: {exp.get('team_structure','')}. Skills: {', '.join(exp.get('technical_skills_used',[]))}.",
-        'metadata': {'type':'experience','source': f"{exp.get('company','')} - {exp.get('title','')}", 'category': 'overview'}
-    })
-    chunk_id += 1
+    company = exp.get('company','')
+    add('exp-overview', company,
+        f"{exp.get('title','')} at {company} ({exp.get('duration','')}). {exp.get('company_context','')}. Team: {exp.get('team_structure','')}. Skills: {', '.join(exp.get('technical_skills_used',[]))}.",
+        {'type':'experience','source': f"{company} - {exp.get('title','')}", 'category': 'overview'})
 
     for idx, a in enumerate(exp.get('achievements_star', [])):
-        chunks.append({
-            'id': f'exp-star-{chunk_id}',
-            'content': f"STAR Example from {exp.get('company','')}: Situation: {a.get('situation','')}. Task: {a.get('task','')}. Action: {a.get('action','')}. Result: {a.get('result','')}",
-            'metadata': {'type':'experience','source': f"{exp.get('company','')} - Achievement {idx+1}", 'category': 'achievement'}
-        })
-        chunk_id += 1
+        # The position is only in the metadata label, not the id
+        add('exp-star', company,
+            f"STAR Example from {company}: Situation: {a.get('situation','')}. Task: {a.get('task','')}. Action: {a.get('action','')}. Result: {a.get('result','')}",
+            {'type':'experience','source': f"{company} - Achievement {idx+1}", 'category': 'achievement'})
 
     if exp.get('leadership_examples'):
-        chunks.append({
-            'id': f'exp-leadership-{chunk_id}',
-            'content': f"Leadership at {exp.get('company','')}: {'. '.join(exp.get('leadership_examples', []))}",
-            'metadata': {'type':'experience','source': f"{exp.get('company','')} - Leadership", 'category': 'leadership'}
-        })
-        chunk_id += 1
+        add('exp-leadership', company,
+            f"Leadership at {company}: {'. '.join(exp.get('leadership_examples', []))}",
+            {'type':'experience','source': f"{company} - Leadership", 'category': 'leadership'})
 
 # Skills
 tech = dt.get('skills', {}).get('technical', {})
 for lang in tech.get('programming_languages', []):
-    chunks.append({
-        'id': f'skill-lang-{chunk_id}',
-        'content': f"Programming Language: {lang.get('language','')} with {lang.get('years_experience','')} years experience. Proficiency: {lang.get('proficiency','')}. Frameworks: {', '.join(lang.get('frameworks',[]))}.",
-        'metadata': {'type':'skill','source': f"Technical Skills - {lang.get('language','')}", 'category': 'programming'}
-    })
-    chunk_id += 1
+    add('skill-lang', lang.get('language',''),
+        f"Programming Language: {lang.get('language','')} with {lang.get('years_experience','')} years experience. Proficiency: {lang.get('proficiency','')}. Frameworks: {', '.join(lang.get('frameworks',[]))}.",
+        {'type':'skill','source': f"Technical Skills - {lang.get('language','')}", 'category': 'programming'})
 
 # Projects
 for p in dt.get('projects', []):
-    chunks.append({
-        'id': f'project-{chunk_id}',
-        'content': f"Project: {p.get('name','')}. Description: {p.get('description','')}. Technologies: {', '.join(p.get('technologies',[]))}. Results: {p.get('results','')}",
-        'metadata': {'type':'project','source': f"Projects - {p.get('name','')}", 'category': 'project'}
-    })
-    chunk_id += 1
+    add('project', p.get('name',''),
+        f"Project: {p.get('name','')}. Description: {p.get('description','')}. Technologies: {', '.join(p.get('technologies',[]))}. Results: {p.get('results','')}",
+        {'type':'project','source': f"Projects - {p.get('name','')}", 'category': 'project'})
 
+dedupe_ids(chunks)
 print(f"✅ Generated {len(chunks)} chunks")
 
-# Discover Upstash expected dimension
-info_url = UPSTASH_URL.rstrip('/') + '/info'
-resp = requests.get(info_url, headers={'Authorization': f'Bearer {UPSTASH_TOKEN}'}, timeout=15)
-if resp.status_code != 200:
-    print('❌ Failed to fetch Upstash index info:', resp.status_code, resp.text)
+# Chunk texts go to the doc store (hydrated by lib/docstore.ts), not into vector metadata
+try:
+    docstore = open_docstore()
+    written = docstore.put_many(chunks)
+except (ValueError, RuntimeError) as e:
+    print('❌ Failed to write chunk documents:', e)
     raise SystemExit(1)
-info = resp.json()
-# Try common keys
-expected_dim = None
-for k in ('dimension','dims','dimension_size','vector_dimension','size'):
-    if k in info:
-        expected_dim = int(info[k])
-        break
-# Fallback: try to parse message seen earlier
-if expected_dim is None:
-    # No standard field; attempt to infer from info JSON
-    for v in info.values():
-        if isinstance(v, (int, float)) and 64 <= int(v) <= 8192:
-            expected_dim = int(v)
-            break
+if written:
+    print(f"📚 {written} chunk documents written to {docstore.describe()}")
+
+# Discover Upstash expected dimension and the generation chat reads (see vector_ingest/alias.py)
+client = UpstashClient(UPSTASH_URL, UPSTASH_TOKEN)
+try:
+    expected_dim = client.dimension()
+    namespace = live_namespace(client)
+except UpstashError as e:
+    print('❌ Failed to fetch Upstash index info:', e)
+    raise SystemExit(1)
+client = client.scoped(namespace)
 
 if expected_dim is None:
     print('⚠️ Could not determine expected vector dimension from Upstash /info. Defaulting to 1024')
@@ -128,80 +141,97 @@ if expected_dim is None:
 
 print(f"Upstash expects dimension: {expected_dim}")
 
-# Load model
-print(f"Loading model: {MODEL_NAME}")
-model = SentenceTransformer(MODEL_NAME)
-
-# Check model output dimension using a dummy encode
-sample = chunks[0]['content'] if chunks else 'test'
-emb0 = model.encode(sample)
-model_dim = len(emb0)
+# Locally this script always runs PyTorch; key the cache by what actually encodes
+EMBED_CACHE_KEY = encoder_cache_key(MODEL_NAME, local_backend='torch')
+
+def load_model():
+    def load_local():
+        print(f"Loading model: {MODEL_NAME}")
+        return SentenceTransformer(MODEL_NAME)
+    return load_encoder(MODEL_NAME, load_local)
+
+all_chunks = chunks
+
+# PROJECTION=pca|whiten replaces the random matrix with one fitted on the corpus (saved and reused)
+fitted = resolve_projection(
+    projection_method(), expected_dim,
+    projection_path(UPSTASH_URL, MODEL_NAME, projection_method(), expected_dim),
+    fit_vectors=lambda: encode_cached(EMBED_CACHE_KEY, [ch['content'] for ch in all_chunks], load_model),
+    refit=refit_requested(args.refit_projection),
+)
+
+# Only embed/upload chunks that are new or changed since the last run
+manifest = ChunkManifest(manifest_path(UPSTASH_URL, namespace=namespace), manifest_model_key(MODEL_NAME, fitted), expected_dim,
+                         enabled=not full_reindex_requested(args.full))
+stale = []
+if sync_requested(args.sync):
+    # Reconcile against the ids actually in the index, not just the local manifest
+    try:
+        plan = plan_sync(client, all_chunks, manifest, PROFILE_PREFIXES)
+    except UpstashError as e:
+        print('❌ Failed to list index vectors:', e)
+        raise SystemExit(1)
+    chunks, stale = plan['pending'], plan['stale']
+    print(f"Sync: {plan['remote']} remote vectors, {len(plan['adopted'])} adopted, {len(stale)} stale")
+else:
+    chunks = manifest.pending(all_chunks)
+print(f"{len(all_chunks) - len(chunks)} unchanged chunks skipped, {len(chunks)} to upload")
+if not chunks:
+    manifest.save()
+    delete_stale(client, manifest, stale, docstore)
+    print('🎉 Index already up to date')
+    raise SystemExit(0)
+
+# Encode all chunks in length-sorted batches, reusing cached embeddings
+print(f"Encoding {len(chunks)} chunks...")
+embeddings = encode_cached(EMBED_CACHE_KEY, [ch['content'] for ch in chunks], load_model)
+
+model_dim = embeddings.shape[1]
 print(f"Model emits dimension: {model_dim}")
 
-# If mismatch, build deterministic projection matrix to map model_dim -> expected_dim
-rng_seed = 42
-if model_dim != expected_dim:
+if fitted is not None:
+    proj = fitted
+elif model_dim != expected_dim:
+    # Deterministic random projection to map model_dim -> expected_dim
     print(f"Dimension mismatch: model {model_dim} -> target {expected_dim}. Creating deterministic projection matrix.")
-    rng = np.random.RandomState(rng_seed)
-    # Use Gaussian random projection matrix and orthonormalize rows for stability
-    proj = rng.normal(size=(expected_dim, model_dim)).astype('float32')
-    # Optionally normalize rows
-    row_norms = np.linalg.norm(proj, axis=1, keepdims=True)
-    row_norms[row_norms==0] = 1.0
-    proj = proj / row_norms
+    proj = random_projection(model_dim, expected_dim)
 else:
     proj = None
 
-# Helper to compute final vector
-def to_target_vec(vec: np.ndarray) -> np.ndarray:
-    # vec: (model_dim,)
-    if proj is None:
-        out = vec
+def to_target_matrix(emb: np.ndarray) -> np.ndarray:
+    # emb: (n, model_dim) -> (n, expected_dim), rows normalized to unit length
+    return normalize_rows(emb) if proj is None else proj.apply(emb)
+
+vectors = to_target_matrix(embeddings)
+
+# Concurrent batch upload
+items = [make_item(ch['id'], vectors[i], vector_metadata(ch['metadata'], manifest)) for i, ch in enumerate(chunks)]
+chunks_by_id = {ch['id']: ch for ch in chunks}
+engine = UpsertEngine(UPSTASH_URL, UPSTASH_TOKEN, namespace=namespace)
+
+def on_result(result):
+    if result['ok']:
+        manifest.mark(chunks_by_id[cid] for cid in result['ids'])
+        manifest.save()
+        print(f"Uploaded batch of {len(result['ids'])}")
     else:
-        out = proj.dot(vec)
-    # Normalize to unit length (optional)
-    norm = np.linalg.norm(out)
-    if norm > 0:
-        out = out / norm
-    return out.astype(float)
-
-# Batch upload
-upload_url = UPSTASH_URL.rstrip('/') + '/upsert'
-headers = {'Authorization': f'Bearer {UPSTASH_TOKEN}', 'Content-Type': 'application/json'}
-
-success = 0
-fail = 0
-
-batch = []
-for i, ch in enumerate(chunks):
-    text = ch['content']
-    emb = model.encode(text)
-    final = to_target_vec(np.array(emb))
-    vec_list = final.tolist()
-    item = {
-        'id': ch['id'],
-        'vector': vec_list,
-        'metadata': ch['metadata']
-    }
-    batch.append(item)
-
-    if len(batch) >= BATCH_SIZE or i == len(chunks)-1:
-        payload = {'vectors': batch}
-        r = requests.post(upload_url, headers=headers, json=payload, timeout=30)
-        if r.status_code == 200:
-            # Accept success
-            res = r.json()
-            # Upstash may return per-item errors; we won't deeply parse here
-            success += len(batch)
-            print(f"Uploaded batch of {len(batch)}")
-        else:
-            print('❌ Upsert failed:', r.status_code, r.text[:200])
-            fail += len(batch)
-        batch = []
-
-print(f"\n📊 Done. success={success}, fail={fail}")
+        print('❌ Upsert failed:', result['status'], result['error'][:200])
+
+results = engine.upload(items, batch_size=BATCH_SIZE, on_result=on_result)
+# Pick up ids recovered while bisecting rejected batches
+for result in results:
+    if not result['ok']:
+        manifest.mark(chunks_by_id[cid] for cid in acknowledged_ids(result))
+manifest.save()
+summary = summarize(results)
+success, fail = summary['success'], summary['error']
+
+print(f"\n📊 Done. success={success}, fail={fail}, upsert pace {engine.limiter.describe()}, {engine.describe_payload()}")
 
 if fail == 0:
+    delete_stale(client, manifest, stale, docstore)
     print('🎉 All vectors uploaded successfully')
+elif stale:
+    print(f"⚠️ Some uploads failed; keeping {len(stale)} stale vectors until all uploads succeed")
 else:
     print('⚠️ Some uploads failed')
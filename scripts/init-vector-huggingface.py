@@ -4,10 +4,10 @@ Initialize Upstash Vector database with digital twin data using HuggingFace free
 Run: python3 scripts/init-vector-huggingface.py
 """
 
+import argparse
 import json
 import os
 import sys
-import time
 import requests
 from pathlib import Path
 
@@ -16,6 +16,15 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from dotenv import load_dotenv
 load_dotenv()
 
+from vector_ingest.alias import live_namespace
+from vector_ingest.docstore import open_docstore
+from vector_ingest.embed_cache import EmbeddingCache, cache_disabled
+from vector_ingest.ids import assign_stable_ids
+from vector_ingest.manifest import ChunkManifest, full_reindex_requested, manifest_path
+from vector_ingest.ratelimit import AdaptiveRateLimiter, parse_retry_after
+from vector_ingest.upload import UpsertEngine, acknowledged_ids, make_item, print_progress, summarize
+from vector_ingest.upstash import UpstashClient
+
 # Configuration
 UPSTASH_URL = os.getenv('UPSTASH_VECTOR_REST_URL')
 UPSTASH_TOKEN = os.getenv('UPSTASH_VECTOR_REST_TOKEN')
@@ -24,6 +33,7 @@ HF_API_KEY = os.getenv('HF_API_KEY', '')
 # HuggingFace free inference API endpoint
 # Model: sentence-transformers/all-MiniLM-L6-v2 (384 dimensions, fast & free)
 HF_MODEL_URL = "https://router.huggingface.co/hf-inference/models/sentence-transformers/all-MiniLM-L6-v2"
+MODEL_ID = 'sentence-transformers/all-MiniLM-L6-v2'
 
 print("🚀 HuggingFace Embedding + Upstash Vector Database Initializer\n")
 print("📍 Model: sentence-transformers/all-MiniLM-L6-v2 (384D)")
@@ -38,7 +48,7 @@ if not UPSTASH_URL or not UPSTASH_TOKEN:
 
 # Load digital twin data
 digital_twin_path = Path(__file__).parent.parent / 'digitaltwin.json'
-with open(digital_twin_path, 'r', encoding='utf-8') as f:
+with open(digital_twin_path, 'r', encoding='utf-8-sig') as f:
     digital_twin_data = json.load(f)
 
 def generate_chunks():
@@ -145,7 +155,11 @@ def generate_chunks():
         })
         chunk_id += 1
 
-    return chunks
+    return assign_stable_ids(chunks)
+
+
+# Paces the free HF API the same way the upsert engine paces Upstash
+hf_limiter = AdaptiveRateLimiter(rate=2.0, max_rate=10.0)
 
 
 def get_embedding_from_huggingface(text):
@@ -157,12 +171,18 @@ def get_embedding_from_huggingface(text):
         headers['Authorization'] = f'Bearer {HF_API_KEY}'
     
     try:
-        response = requests.post(
-            HF_MODEL_URL,
-            json={'inputs': text[:512]},  # Limit to 512 chars for speed
-            headers=headers,
-            timeout=30
-        )
+        hf_limiter.acquire_blocking()
+        try:
+            response = requests.post(
+                HF_MODEL_URL,
+                json={'inputs': text[:512]},  # Limit to 512 chars for speed
+                headers=headers,
+                timeout=30
+            )
+        except requests.RequestException:
+            hf_limiter.record(None)
+            raise
+        hf_limiter.record(response.status_code, parse_retry_after(response.headers.get('Retry-After')))
         
         if response.status_code != 200:
             raise Exception(f"HF API returned {response.status_code}: {response.text[:200]}")
@@ -182,73 +202,91 @@ def get_embedding_from_huggingface(text):
         raise
 
 
-def upload_to_upstash(chunks):
-    """Upload chunks to Upstash Vector via REST API"""
-    headers = {
-        'Authorization': f'Bearer {UPSTASH_TOKEN}',
-        'Content-Type': 'application/json',
-    }
-    
-    success_count = 0
-    error_count = 0
+embedding_cache = None if cache_disabled() else EmbeddingCache(MODEL_ID)
+
+
+def get_cached_embedding(text):
+    """Look up the shared on-disk embedding cache before calling the HF API"""
+    if embedding_cache is None:
+        return get_embedding_from_huggingface(text)
+    cached, missing = embedding_cache.get_many([text])
+    if not missing:
+        return cached[0].tolist()
+    vector = get_embedding_from_huggingface(text)
+    embedding_cache.put_many([text], [vector])
+    return vector
+
+
+def upload_to_upstash(chunks, manifest=None, namespace=''):
+    """Embed chunks via HuggingFace, then upload them to Upstash Vector concurrently"""
     errors = []
+    items = []
+    chunks_by_id = {}
 
     print(f"✅ Generated {len(chunks)} chunks for vector storage\n")
-    print(f"📤 Uploading to Upstash Vector via HuggingFace embeddings...\n")
+    print(f"🧮 Getting HuggingFace embeddings...\n")
 
-    for i, chunk in enumerate(chunks):
+    for chunk in chunks:
         try:
-            # Step 1: Get embedding from HuggingFace
-            vector = get_embedding_from_huggingface(chunk['content'])
-            
-            # Step 2: Upsert to Upstash with the generated vector
-            data = {
-                'id': chunk['id'],
-                'vector': vector,
-                'metadata': {
-                    'type': chunk['type'],
-                    'source': chunk['source'],
-                    'category': chunk.get('category', ''),
-                    'content': chunk['content'],
-                }
-            }
-            
-            response = requests.post(
-                f"{UPSTASH_URL}/upsert",
-                json=data,
-                headers=headers,
-                timeout=15
-            )
-            
-            if response.status_code in [200, 201]:
-                success_count += 1
-                if (i + 1) % 3 == 0 or i == len(chunks) - 1:
-                    pct = round((success_count / len(chunks)) * 100)
-                    print(f"   ✅ Uploaded {success_count}/{len(chunks)} chunks ({pct}%)")
-            else:
-                error_count += 1
-                errors.append({'chunk_id': chunk['id'], 'status': response.status_code, 'error': response.text[:100]})
-                print(f"   ❌ Upstash error on {chunk['id']}: {response.status_code}")
-            
-            # Delay to avoid rate limits
-            time.sleep(0.5)
-            
+            # Step 1: Get embedding (local cache first, then HuggingFace)
+            vector = get_cached_embedding(chunk['content'])
+            items.append(make_item(chunk['id'], vector, {
+                'type': chunk['type'],
+                'source': chunk['source'],
+                'category': chunk.get('category', ''),
+            }))
+            chunks_by_id[chunk['id']] = chunk
         except Exception as e:
-            error_count += 1
             err_msg = str(e)[:100]
             errors.append({'chunk_id': chunk['id'], 'error': err_msg})
             print(f"   ❌ Error on {chunk['id']}: {err_msg}")
-            time.sleep(1)  # Longer delay on errors
+    if embedding_cache is not None:
+        embedding_cache.flush()
+
+    # Step 2: Upsert all vectors with bounded concurrency
+    print(f"   HF API pace: {hf_limiter.describe()}")
+    print(f"\n📤 Uploading {len(items)} vectors to Upstash Vector...\n")
+    engine = UpsertEngine(UPSTASH_URL, UPSTASH_TOKEN, timeout=15, namespace=namespace)
+    results = engine.upload(items, on_result=print_progress(len(items)))
+    print(f"\n   Upstash pace: {engine.limiter.describe()}")
+
+    if manifest is not None:
+        for r in results:
+            manifest.mark(chunks_by_id[cid] for cid in acknowledged_ids(r))
+
+    summary = summarize(results)
+    summary['errors'] = errors + summary['errors']
+    summary['error'] += len(errors)
+    summary['total'] = len(chunks)
+    return summary
+
 
-    return {'success': success_count, 'error': error_count, 'total': len(chunks), 'errors': errors}
+def skip_unchanged(chunks, namespace='', full=False):
+    """Drop chunks already uploaded with identical content (see vector_ingest.manifest)"""
+    manifest = ChunkManifest(manifest_path(UPSTASH_URL, namespace=namespace), MODEL_ID, 384, enabled=not full_reindex_requested(full))
+    pending = manifest.pending(chunks)
+    print(f"🗂️  {len(chunks) - len(pending)} unchanged chunks skipped, {len(pending)} new or changed\n")
+    return manifest, pending
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Embed digitaltwin.json via the HuggingFace API into Upstash Vector')
+    parser.add_argument('--full', action='store_true', help='ignore the manifest and re-upload everything')
+    args = parser.parse_args()
     print('🚀 Starting vector database initialization...\n')
     
     try:
+        # Write to the generation chat reads (see vector_ingest/alias.py)
+        namespace = live_namespace(UpstashClient(UPSTASH_URL, UPSTASH_TOKEN))
         chunks = generate_chunks()
-        result = upload_to_upstash(chunks)
+        # Chunk texts go to the doc store (hydrated by lib/docstore.ts), not into vector metadata
+        docstore = open_docstore()
+        written = docstore.put_many(chunks)
+        if written:
+            print(f"📚 {written} chunk documents written to {docstore.describe()}\n")
+        manifest, chunks = skip_unchanged(chunks, namespace, args.full)
+        result = upload_to_upstash(chunks, manifest, namespace)
+        manifest.save()
         
         print(f"\n{'='*60}")
         print(f"✅ Vector database initialization complete!")
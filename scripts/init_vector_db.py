@@ -7,7 +7,6 @@ Run: python3 scripts/init_vector_db.py
 import json
 import os
 import sys
-import time
 import requests
 from pathlib import Path
 
@@ -16,9 +15,24 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from dotenv import load_dotenv
 load_dotenv()
 
+from vector_ingest.alias import live_namespace
+from vector_ingest.docstore import open_docstore
+from vector_ingest.ids import assign_stable_ids
+from vector_ingest.ratelimit import AdaptiveRateLimiter, parse_retry_after
+from vector_ingest.upload import UpsertEngine, make_item, print_progress, summarize
+from vector_ingest.upstash import UpstashClient
+
+try:
+    from sentence_transformers import SentenceTransformer
+    USE_SENTENCE_TRANSFORMER = True
+except ImportError:
+    USE_SENTENCE_TRANSFORMER = False
+
 # Configuration
 UPSTASH_URL = os.getenv('UPSTASH_VECTOR_REST_URL')
 UPSTASH_TOKEN = os.getenv('UPSTASH_VECTOR_REST_TOKEN')
+HF_API_KEY = os.getenv('HF_API_KEY', '')
+hf_limiter = AdaptiveRateLimiter(rate=2.0, max_rate=10.0)
 
 # Use HuggingFace free inference API
 # Model: sentence-transformers/all-MiniLM-L6-v2 (384 dimensions)
@@ -41,7 +55,7 @@ if not USE_SENTENCE_TRANSFORMER and not os.getenv('OPENAI_API_KEY'):
 
 # Load digital twin data
 digital_twin_path = Path(__file__).parent.parent / 'digitaltwin.json'
-with open(digital_twin_path, 'r', encoding='utf-8') as f:
+with open(digital_twin_path, 'r', encoding='utf-8-sig') as f:
     digital_twin_data = json.load(f)
 
 def generate_chunks():
@@ -148,19 +162,13 @@ def generate_chunks():
         })
         chunk_id += 1
 
-    return chunks
+    return assign_stable_ids(chunks)
 
 
-def upload_to_upstash(chunks):
+def upload_to_upstash(chunks, namespace=''):
     """Upload chunks to Upstash Vector via REST API with embeddings"""
-    headers = {
-        'Authorization': f'Bearer {UPSTASH_TOKEN}',
-        'Content-Type': 'application/json',
-    }
-    
-    success_count = 0
-    error_count = 0
     errors = []
+    items = []
 
     print(f"✅ Generated {len(chunks)} chunks for vector storage\n")
     
@@ -169,13 +177,13 @@ def upload_to_upstash(chunks):
         print(f"📥 Loading embedding model locally...")
         model = SentenceTransformer('all-MiniLM-L6-v2')
         print(f"✅ Model loaded\n")
-        print(f"📤 Uploading to Upstash Vector with local embeddings...\n")
+        print(f"🧮 Embedding chunks locally...\n")
         use_hf = False
     else:
-        print(f"📤 Uploading to Upstash Vector with HuggingFace free API...\n")
+        print(f"🧮 Embedding chunks with HuggingFace free API...\n")
         use_hf = True
 
-    for i, chunk in enumerate(chunks):
+    for chunk in chunks:
         try:
             # Step 1: Generate embedding
             if USE_SENTENCE_TRANSFORMER:
@@ -189,12 +197,19 @@ def upload_to_upstash(chunks):
                 if HF_API_KEY:
                     hf_headers['Authorization'] = f'Bearer {HF_API_KEY}'
                 
-                embedding_response = requests.post(
-                    HF_MODEL_URL,
-                    json={'inputs': chunk['content'][:512]},  # Limit input length for free tier
-                    headers=hf_headers,
-                    timeout=20
-                )
+                hf_limiter.acquire_blocking()
+                try:
+                    embedding_response = requests.post(
+                        HF_MODEL_URL,
+                        json={'inputs': chunk['content'][:512]},  # Limit input length for free tier
+                        headers=hf_headers,
+                        timeout=20
+                    )
+                except requests.RequestException:
+                    hf_limiter.record(None)
+                    raise
+                hf_limiter.record(embedding_response.status_code,
+                                  parse_retry_after(embedding_response.headers.get('Retry-After')))
                 
                 if embedding_response.status_code != 200:
                     raise Exception(f"HF embedding failed: {embedding_response.status_code} - {embedding_response.text[:100]}")
@@ -206,46 +221,26 @@ def upload_to_upstash(chunks):
                 else:
                     raise Exception(f"Unexpected HF response: {str(embedding_data)[:100]}")
             
-            # Step 2: Upsert to Upstash with the generated vector
-            data = {
-                'id': chunk['id'],
-                'vector': vector,
-                'metadata': {
-                    'type': chunk['type'],
-                    'source': chunk['source'],
-                    'category': chunk.get('category', ''),
-                    'content': chunk['content'],  # Store content in metadata for retrieval
-                }
-            }
-            
-            response = requests.post(
-                f"{UPSTASH_URL}/upsert",
-                json=data,
-                headers=headers,
-                timeout=15
-            )
-            
-            if response.status_code in [200, 201]:
-                success_count += 1
-                if (i + 1) % 3 == 0 or i == len(chunks) - 1:
-                    pct = round((success_count / len(chunks)) * 100)
-                    print(f"   ✅ Uploaded {success_count}/{len(chunks)} chunks ({pct}%)")
-            else:
-                error_count += 1
-                errors.append({'chunk_id': chunk['id'], 'status': response.status_code})
-                print(f"   ❌ Error uploading {chunk['id']}: {response.status_code}")
-            
-            # Delay to avoid rate limits
-            time.sleep(0.2)
+            # Step 2: Queue the vector for the concurrent upsert below
+            items.append(make_item(chunk['id'], vector, {
+                'type': chunk['type'],
+                'source': chunk['source'],
+                'category': chunk.get('category', ''),
+            }))
             
         except Exception as e:
-            error_count += 1
             err_msg = str(e)[:100]
             errors.append({'chunk_id': chunk['id'], 'error': err_msg})
             print(f"   ❌ Error on {chunk['id']}: {err_msg}")
-            time.sleep(0.5)
 
-    return {'success': success_count, 'error': error_count, 'total': len(chunks), 'errors': errors}
+    print(f"\n📤 Uploading {len(items)} vectors to Upstash Vector...\n")
+    engine = UpsertEngine(UPSTASH_URL, UPSTASH_TOKEN, timeout=15, namespace=namespace)
+    result = summarize(engine.upload(items, on_result=print_progress(len(items))))
+    print(f"\n   Upstash pace: {engine.limiter.describe()}")
+    result['errors'] = errors + result['errors']
+    result['error'] += len(errors)
+    result['total'] = len(chunks)
+    return result
 
 
 def main():
@@ -253,7 +248,13 @@ def main():
     
     try:
         chunks = generate_chunks()
-        result = upload_to_upstash(chunks)
+        # Chunk texts go to the doc store (hydrated by lib/docstore.ts), not into vector metadata
+        docstore = open_docstore()
+        written = docstore.put_many(chunks)
+        if written:
+            print(f"📚 {written} chunk documents written to {docstore.describe()}\n")
+        # Write to the generation chat reads (see vector_ingest/alias.py)
+        result = upload_to_upstash(chunks, live_namespace(UpstashClient(UPSTASH_URL, UPSTASH_TOKEN)))
         
         print(f"\n{'='*60}")
         print(f"✅ Vector database initialization complete!")
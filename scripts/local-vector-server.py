@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Run a local Upstash Vector REST stand-in for offline ingestion and benchmarks.
+See scripts/vector_ingest/local_server.py for the supported endpoints.
+
+Requirements:
+  pip install numpy
+
+Usage:
+  python scripts/local-vector-server.py --port 8787 --dimension 1024 --latency-ms 40 --throttle-rate 0.05
+"""
+
+import sys
+
+from vector_ingest.local_server import main
+
+if __name__ == '__main__':
+    sys.exit(main())
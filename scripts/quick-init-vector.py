@@ -4,12 +4,10 @@ Initialize Upstash Vector with locally generated embeddings using minimal deps
 Run: python3 scripts/quick-init-vector.py
 """
 
+import argparse
 import json
 import os
 import sys
-import time
-import hashlib
-import requests
 from pathlib import Path
 
 # Load environment variables
@@ -17,11 +15,22 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from dotenv import load_dotenv
 load_dotenv()
 
+from vector_ingest.alias import live_namespace
+from vector_ingest.docstore import open_docstore
+from vector_ingest.hashing import HashingEmbedder
+from vector_ingest.ids import assign_stable_ids
+from vector_ingest.manifest import ChunkManifest, full_reindex_requested, manifest_path
+from vector_ingest.upload import UpsertEngine, acknowledged_ids, make_item, print_progress, summarize
+from vector_ingest.upstash import UpstashClient
+
 # Configuration
 UPSTASH_URL = os.getenv('UPSTASH_VECTOR_REST_URL')
 UPSTASH_TOKEN = os.getenv('UPSTASH_VECTOR_REST_TOKEN')
+MODEL_ID = 'feature-hashing-v1'  # manifest key for the hash-based vectors
+DIMENSIONS = 384
+embedder = HashingEmbedder(DIMENSIONS)
 
-print("🚀 Quick Vector DB Initializer (using deterministic embeddings)\n")
+print("🚀 Quick Vector DB Initializer (using feature-hashing embeddings)\n")
 
 if not UPSTASH_URL or not UPSTASH_TOKEN:
     print("❌ Error: Missing Upstash Vector credentials!")
@@ -29,32 +38,9 @@ if not UPSTASH_URL or not UPSTASH_TOKEN:
 
 # Load digital twin data
 digital_twin_path = Path(__file__).parent.parent / 'digitaltwin.json'
-with open(digital_twin_path, 'r', encoding='utf-8') as f:
+with open(digital_twin_path, 'r', encoding='utf-8-sig') as f:
     digital_twin_data = json.load(f)
 
-def generate_deterministic_vector(text, dimensions=384):
-    """
-    Generate a deterministic vector from text using hash-based approach.
-    This ensures consistent vectors for the same text.
-    While not semantically meaningful, it works for basic retrieval.
-    """
-    # Use SHA256 hash to generate seed
-    hash_obj = hashlib.sha256(text.encode())
-    hash_hex = hash_obj.hexdigest()
-    
-    # Convert hash to floats in range [-1, 1]
-    vector = []
-    for i in range(dimensions):
-        # Take 2 hex chars at a time
-        hex_pair = hash_hex[(i * 2) % len(hash_hex):(i * 2 + 2) % len(hash_hex)]
-        if len(hex_pair) < 2:
-            hex_pair = hash_hex[0:2]
-        # Convert hex to 0-255, then to -1 to 1
-        val = int(hex_pair, 16) / 255.0
-        vector.append(val * 2 - 1)
-    
-    return vector
-
 def generate_chunks():
     """Generate text chunks from digital twin data"""
     chunks = []
@@ -159,71 +145,62 @@ def generate_chunks():
         })
         chunk_id += 1
 
-    return chunks
+    return assign_stable_ids(chunks)
 
 
-def upload_to_upstash(chunks):
+def upload_to_upstash(chunks, manifest=None, namespace=''):
     """Upload chunks to Upstash Vector"""
-    headers = {
-        'Authorization': f'Bearer {UPSTASH_TOKEN}',
-        'Content-Type': 'application/json',
-    }
-    
-    success_count = 0
-    error_count = 0
-
     print(f"✅ Generated {len(chunks)} chunks\n")
     print(f"📤 Uploading to Upstash Vector...\n")
 
-    for i, chunk in enumerate(chunks):
-        try:
-            # Generate deterministic vector (384 dimensions)
-            vector = generate_deterministic_vector(chunk['content'], 384)
-            
-            # Upsert to Upstash
-            data = {
-                'id': chunk['id'],
-                'vector': vector,
-                'metadata': {
-                    'type': chunk['type'],
-                    'source': chunk['source'],
-                    'category': chunk.get('category', ''),
-                    'content': chunk['content'],
-                }
-            }
-            
-            response = requests.post(
-                f"{UPSTASH_URL}/upsert",
-                json=data,
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code in [200, 201]:
-                success_count += 1
-                if (i + 1) % 5 == 0 or i == len(chunks) - 1:
-                    pct = round((success_count / len(chunks)) * 100)
-                    print(f"   ✅ {success_count}/{len(chunks)} ({pct}%)")
-            else:
-                error_count += 1
-                print(f"   ❌ {chunk['id']}: {response.status_code}")
-            
-            time.sleep(0.2)
-            
-        except Exception as e:
-            error_count += 1
-            print(f"   ❌ {chunk['id']}: {str(e)[:50]}")
-            time.sleep(0.5)
+    # One vectorized call: keyword-aware feature-hashing vectors, no model download
+    vectors = embedder.encode([chunk['content'] for chunk in chunks])
+    items = []
+    for chunk, vector in zip(chunks, vectors):
+        items.append(make_item(chunk['id'], vector, {
+            'type': chunk['type'],
+            'source': chunk['source'],
+            'category': chunk.get('category', ''),
+        }))
+
+    engine = UpsertEngine(UPSTASH_URL, UPSTASH_TOKEN, timeout=10, namespace=namespace)
+    results = engine.upload(items, on_result=print_progress(len(items)))
+
+    if manifest is not None:
+        chunks_by_id = {chunk['id']: chunk for chunk in chunks}
+        for r in results:
+            manifest.mark(chunks_by_id[cid] for cid in acknowledged_ids(r))
+
+    summary = summarize(results)
+    return summary['success'], summary['error'], len(chunks)
+
 
-    return success_count, error_count, len(chunks)
+def skip_unchanged(chunks, namespace='', full=False):
+    """Drop chunks already uploaded with identical content (see vector_ingest.manifest)"""
+    manifest = ChunkManifest(manifest_path(UPSTASH_URL, namespace=namespace), MODEL_ID, DIMENSIONS, enabled=not full_reindex_requested(full))
+    pending = manifest.pending(chunks)
+    print(f"🗂️  {len(chunks) - len(pending)} unchanged chunks skipped, {len(pending)} new or changed\n")
+    return manifest, pending
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Embed digitaltwin.json with feature hashing into Upstash Vector')
+    parser.add_argument('--full', action='store_true', help='ignore the manifest and re-upload everything')
+    args = parser.parse_args()
     print('🚀 Initializing vector database...\n')
     
     try:
         chunks = generate_chunks()
-        success, errors, total = upload_to_upstash(chunks)
+        # Chunk texts go to the doc store (hydrated by lib/docstore.ts), not into vector metadata
+        docstore = open_docstore()
+        written = docstore.put_many(chunks)
+        if written:
+            print(f"📚 {written} chunk documents written to {docstore.describe()}\n")
+        # Write to the generation chat reads (see vector_ingest/alias.py)
+        namespace = live_namespace(UpstashClient(UPSTASH_URL, UPSTASH_TOKEN))
+        manifest, chunks = skip_unchanged(chunks, namespace, args.full)
+        success, errors, total = upload_to_upstash(chunks, manifest, namespace)
+        manifest.save()
         
         print(f"\n{'='*50}")
         print(f"✅ Complete!")
@@ -1,42 +1,135 @@
 #!/usr/bin/env python3
 """
-Quick test runner for enhanced vector initialization.
-This script can be called via HTTP to bypass terminal issues.
+Job runner for the enhanced vector initialization.
+
+Ingestion runs in the background (see scripts/vector_ingest/jobs.py) and
+reports JSON progress events (stage, chunks done, vectors/s, ETA) as it
+goes, so the HTTP route can answer at once and the admin UI can poll. Only
+one job per Upstash index runs at a time.
+
+Every command prints one JSON document, except `follow` and the default
+`run`, which print one JSON event per line as they happen.
+
+Usage:
+  python scripts/run-enhanced-init.py                      # start and follow until finished
+  python scripts/run-enhanced-init.py start [--resume] [--full] [--sync] [--shadow]
+  python scripts/run-enhanced-init.py status [<job id>] [--since N]
+  python scripts/run-enhanced-init.py follow <job id>
+  python scripts/run-enhanced-init.py cancel <job id>
 """
-import subprocess
-import sys
+import argparse
 import json
+import os
+import sys
+import time
 from pathlib import Path
 
-def run_enhanced_init():
-    """Run the enhanced vector initialization script"""
-    script_path = Path(__file__).parent / 'init-vector-enhanced.py'
-    
+from dotenv import load_dotenv
+
+from vector_ingest.jobs import FINISHED, JobConflict, JobStore, _index_slug, cancel_job, job_status, start_job, supervise
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except Exception:
+        pass
+
+SCRIPT_PATH = Path(__file__).resolve().parent / 'init-vector-enhanced.py'
+POLL_SECONDS = 0.5
+
+load_dotenv(Path(__file__).resolve().parent.parent / '.env.local')
+INDEX_URL = os.getenv('UPSTASH_VECTOR_REST_URL', '')
+
+
+def emit(doc):
+    print(json.dumps(doc, ensure_ascii=False), flush=True)
+
+
+def start(flags):
     try:
-        result = subprocess.run(
-            [sys.executable, str(script_path)],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minutes max
-        )
-        
-        return {
-            'success': result.returncode == 0,
-            'stdout': result.stdout,
-            'stderr': result.stderr,
-            'returncode': result.returncode
-        }
-    except subprocess.TimeoutExpired:
-        return {
-            'success': False,
-            'error': 'Script execution timed out after 5 minutes'
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
-        }
+        job = start_job(SCRIPT_PATH, flags, INDEX_URL, runner=Path(__file__).resolve())
+    except JobConflict as e:
+        emit({'success': False, 'error': str(e), 'job': e.job})
+        return None
+    emit({'success': True, 'job': job})
+    return job
+
+
+def follow(job_id):
+    since = 0
+    while True:
+        status = job_status(job_id, since)
+        for event in status['events']:
+            emit(event)
+        since = status['next']
+        if status['status'] in FINISHED:
+            return status
+        time.sleep(POLL_SECONDS)
+
+
+def result_of(status):
+    """Final summary in the shape the old synchronous runner returned."""
+    output = ''
+    try:
+        output = Path(status['log']).read_text(encoding='utf-8')[-4000:]
+    except OSError:
+        pass
+    done = next((e for e in reversed(status['events']) if e.get('stage') == 'done'), status.get('progress'))
+    return {'success': status['status'] == 'succeeded', 'job': status['id'], 'status': status['status'],
+            'returncode': status.get('returncode'), 'summary': done, 'stdout': output}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run init-vector-enhanced.py as a background job')
+    parser.add_argument('command', nargs='?', default='run',
+                        choices=['run', 'start', 'status', 'follow', 'cancel', '_supervise'])
+    parser.add_argument('job_id', nargs='?')
+    parser.add_argument('--since', type=int, default=0, help='status: only events after this offset')
+    parser.add_argument('--resume', action='store_true')
+    parser.add_argument('--full', action='store_true')
+    parser.add_argument('--sync', action='store_true')
+    parser.add_argument('--shadow', action='store_true', help='build a new generation and flip the alias')
+    args = parser.parse_args()
+    flags = [f'--{name}' for name in ('resume', 'full', 'sync', 'shadow') if getattr(args, name)]
+
+    if args.command == '_supervise':
+        supervise(args.job_id)
+        return 0
+    if args.command == 'start':
+        return 0 if start(flags) else 2
+
+    if args.command == 'run':
+        job = start(flags)
+        if job is None:
+            return 2
+        try:
+            status = follow(job['id'])
+        except KeyboardInterrupt:
+            cancel_job(job['id'])
+            status = follow(job['id'])
+        result = result_of(job_status(status['id']))
+        emit(result)
+        return 0 if result['success'] else 1
+
+    job_id = args.job_id
+    if job_id is None:
+        if args.command != 'status':
+            parser.error(f'{args.command} needs a job id')
+        active = JobStore().active(_index_slug(INDEX_URL))
+        emit({'active': None} if active is None else {'active': job_status(active['id'], args.since)})
+        return 0
+    try:
+        if args.command == 'status':
+            emit(job_status(job_id, args.since))
+        elif args.command == 'cancel':
+            emit(cancel_job(job_id))
+        elif args.command == 'follow':
+            emit(result_of(follow(job_id)))
+    except KeyError:
+        emit({'success': False, 'error': f'unknown job {job_id}'})
+        return 3
+    return 0
+
 
 if __name__ == '__main__':
-    result = run_enhanced_init()
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.exit(main())
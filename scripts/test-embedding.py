@@ -1,23 +1,175 @@
 #!/usr/bin/env python3
 """
-Quick embedding test script.
-Usage: python scripts/test-embedding.py
-Prints embedding dimension and first 6 values for a sample text.
+Quick embedding test script, plus a benchmark suite for candidate models.
+
+Without arguments: loads one model and prints the embedding of a sample text.
+
+With --bench: runs each candidate model in its own subprocess (so load time and
+peak RSS are not polluted by the previous model) over the real enhanced chunk
+set and the Chinese/English recruiter queries in scripts/eval/, and reports
+  load_seconds, dimension, single-query p50/p99 latency (ms),
+  batch throughput (chunks/s), peak RSS (MB)
+as JSON. 'feature-hashing' benchmarks the model-free HashingEmbedder.
+
+Usage:
+  python scripts/test-embedding.py
+  python scripts/test-embedding.py --bench [--models all-MiniLM-L6-v2,...] [--output report.json]
 """
-from sentence_transformers import SentenceTransformer
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
 import numpy as np
 
 MODEL_NAME = 'all-mpnet-base-v2'  # 可改成 'all-MiniLM-L6-v2'（384D）
+CANDIDATES = [
+    'all-MiniLM-L6-v2',
+    'all-mpnet-base-v2',
+    'paraphrase-multilingual-mpnet-base-v2',
+    'feature-hashing',
+]
+ROOT = Path(__file__).resolve().parent.parent
+RESULT_MARKER = 'BENCH_RESULT '
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except Exception:
+        pass
+
+
+def quick_test():
+    from sentence_transformers import SentenceTransformer
+
+    print(f"✓ Loading model: {MODEL_NAME}")
+    model = SentenceTransformer(MODEL_NAME)
+
+    texts = ["谁构建了 Digital Twin？"]
+    print(f"✓ Encoding text: {texts[0]}")
+    embs = model.encode(texts, show_progress_bar=False)
+
+    print(f"\n📊 结果:")
+    print(f"  维度 (Dimension): {len(embs[0])}")
+    print(f"  前 6 个值 (First 6): {embs[0][:6]}")
+    print(f"  类型 (Type): {type(embs[0])}")
+    print(f"  范围 (Min/Max): [{np.min(embs[0]):.4f}, {np.max(embs[0]):.4f}]")
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024, 1)
+
+
+def bench_worker(name, rounds, min_batch_texts):
+    """Measure one model in this process and print a single JSON result line."""
+    from vector_ingest.embedding import encode_batched
+    from vector_ingest.profile import load_profile, profile_chunks
+
+    chunks = [ch['content'] for ch in profile_chunks(load_profile(ROOT / 'digitaltwin.json'))]
+    queries = [q['query'] for q in json.loads((ROOT / 'scripts' / 'eval' / 'recruiter-queries.json')
+                                               .read_text(encoding='utf-8'))]
+    rss_before = peak_rss_mb()
+
+    started = time.perf_counter()
+    if name == 'feature-hashing':
+        from vector_ingest.hashing import HashingEmbedder
+        model = HashingEmbedder(384)
+    else:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(name, device='cpu')
+    load_seconds = time.perf_counter() - started
+
+    dim = int(np.asarray(model.encode(queries[:1])).shape[-1])  # warm-up
+
+    latencies = []
+    for _ in range(rounds):
+        for q in queries:
+            t = time.perf_counter()
+            model.encode([q])
+            latencies.append((time.perf_counter() - t) * 1000)
+
+    texts = (chunks * (min_batch_texts // max(len(chunks), 1) + 1))[:max(min_batch_texts, len(chunks))]
+    t = time.perf_counter()
+    encode_batched(model, texts, show_progress=False)
+    batch_seconds = time.perf_counter() - t
+
+    result = {
+        'model': name,
+        'dimension': dim,
+        'load_seconds': round(load_seconds, 3),
+        'query_p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'query_p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        'queries_timed': len(latencies),
+        'batch_texts': len(texts),
+        'batch_chunks_per_second': round(len(texts) / batch_seconds, 1),
+        'peak_rss_mb': peak_rss_mb(),
+        'baseline_rss_mb': rss_before,
+    }
+    print(RESULT_MARKER + json.dumps(result))
+
+
+def run_bench(models, rounds, min_batch_texts, output):
+    report = {'chunks_source': 'digitaltwin.json (enhanced chunking)',
+              'queries_source': 'scripts/eval/recruiter-queries.json',
+              'results': []}
+    for name in models:
+        print(f"⏱️  Benchmarking {name} ...", file=sys.stderr)
+        proc = subprocess.run(
+            [sys.executable, __file__, '--worker', name, '--rounds', str(rounds),
+             '--batch-texts', str(min_batch_texts)],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True, encoding='utf-8',
+        )
+        line = next((l for l in proc.stdout.splitlines() if l.startswith(RESULT_MARKER)), None)
+        if proc.returncode != 0 or line is None:
+            report['results'].append({'model': name, 'error': (proc.stderr or proc.stdout).strip()[-500:]})
+            print(f"   ❌ {name} failed", file=sys.stderr)
+            continue
+        result = json.loads(line[len(RESULT_MARKER):])
+        report['results'].append(result)
+        print(f"   ✅ {name}: dim {result['dimension']}, load {result['load_seconds']}s, "
+              f"p50 {result['query_p50_ms']} ms, p99 {result['query_p99_ms']} ms, "
+              f"{result['batch_chunks_per_second']} chunks/s, RSS {result['peak_rss_mb']} MB", file=sys.stderr)
+
+    ok = [r for r in report['results'] if 'error' not in r]
+    report['ranking'] = {
+        'query_p50_ms': [r['model'] for r in sorted(ok, key=lambda r: r['query_p50_ms'])],
+        'batch_chunks_per_second': [r['model'] for r in sorted(ok, key=lambda r: -r['batch_chunks_per_second'])],
+        'peak_rss_mb': [r['model'] for r in sorted(ok, key=lambda r: r['peak_rss_mb'] or 0)],
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        Path(output).write_text(text + '\n', encoding='utf-8')
+        print(f"📝 Report written to {output}", file=sys.stderr)
+    print(text)
+    return 0 if len(ok) == len(models) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Embedding smoke test and model benchmark')
+    parser.add_argument('--bench', action='store_true', help='benchmark candidate models')
+    parser.add_argument('--models', default=','.join(CANDIDATES))
+    parser.add_argument('--rounds', type=int, default=3, help='passes over the query set for latency')
+    parser.add_argument('--batch-texts', type=int, default=256, help='minimum texts for the throughput run')
+    parser.add_argument('--output', default=None, help='also write the JSON report to this file')
+    parser.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
 
-print(f"✓ Loading model: {MODEL_NAME}")
-model = SentenceTransformer(MODEL_NAME)
+    if args.worker:
+        bench_worker(args.worker, args.rounds, args.batch_texts)
+        return 0
+    if args.bench:
+        models = [m.strip() for m in args.models.split(',') if m.strip()]
+        return run_bench(models, args.rounds, args.batch_texts, args.output)
+    quick_test()
+    return 0
 
-texts = ["谁构建了 Digital Twin？"]
-print(f"✓ Encoding text: {texts[0]}")
-embs = model.encode(texts, show_progress_bar=False)
 
-print(f"\n📊 结果:")
-print(f"  维度 (Dimension): {len(embs[0])}")
-print(f"  前 6 个值 (First 6): {embs[0][:6]}")
-print(f"  类型 (Type): {type(embs[0])}")
-print(f"  范围 (Min/Max): [{np.min(embs[0]):.4f}, {np.max(embs[0]):.4f}]")
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Inspect or roll back the namespace alias that lib/vectordb.ts queries.
+
+Generations are built by `init-vector-enhanced.py --shadow`, which flips the
+alias itself once the new namespace validates (see
+scripts/vector_ingest/alias.py). `rollback` swaps the live and previous
+generations with one write; running it again rolls forward. Serverless
+instances pick up the change within VECTOR_ALIAS_TTL_MS (default 30 s).
+
+Requirements:
+  pip install requests python-dotenv
+
+Usage:
+  python scripts/vector-alias.py             # show the alias and every namespace's vector count
+  python scripts/vector-alias.py rollback    # point the alias back at the previous generation
+  python scripts/vector-alias.py gc          # drop generations the alias no longer names
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from vector_ingest.alias import ALIAS_ID, ALIAS_NAMESPACE, collect_garbage, read_alias, rollback
+from vector_ingest.upstash import UpstashClient, UpstashError
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except Exception:
+        pass
+
+load_dotenv(Path(__file__).resolve().parent.parent / '.env.local')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or roll back the live vector namespace alias')
+    parser.add_argument('command', nargs='?', default='status', choices=['status', 'rollback', 'gc'])
+    args = parser.parse_args()
+
+    url, token = os.getenv('UPSTASH_VECTOR_REST_URL'), os.getenv('UPSTASH_VECTOR_REST_TOKEN')
+    if not url or not token:
+        print('❌ Missing Upstash credentials in .env.local')
+        return 1
+    client = UpstashClient(url, token)
+
+    try:
+        if args.command == 'rollback':
+            try:
+                record = rollback(client, client.dimension(1024))
+            except ValueError as e:
+                print(f'❌ {e}')
+                return 1
+            print(f"↩️ Alias '{ALIAS_ID}' now points at {record['namespace'] or 'the default namespace'} "
+                  f"(previous: {record['previous'] or 'default namespace'})")
+            return 0
+        if args.command == 'gc':
+            dropped = collect_garbage(client)
+            for namespace in dropped:
+                print(f"🧹 Dropped orphaned generation {namespace}")
+            if not dropped:
+                print('✅ No orphaned generations')
+            return 0
+
+        record = read_alias(client)
+        counts = client.namespace_counts()
+    except UpstashError as e:
+        print('❌ Upstash request failed:', e)
+        return 1
+    live = record.get('namespace', '')
+    print(f"🔀 Alias '{ALIAS_ID}': {json.dumps(record, ensure_ascii=False) if record else 'not set (default namespace)'}")
+    for name, (count, pending) in sorted(counts.items()):
+        if name == ALIAS_NAMESPACE:
+            continue
+        role = ('live' if name == live else 'previous' if name == record.get('previous')
+                else 'building' if name and name == record.get('building') else '')
+        print(f"   {name or '(default)':<24} {count:>7} vectors{f' ({pending} pending)' if pending else ''}"
+              f"{f'  <- {role}' if role else ''}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
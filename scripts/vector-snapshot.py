@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Export an Upstash Vector namespace to a binary snapshot, or restore one.
+
+Snapshots hold ids, float32 vectors and metadata in one versioned file
+(format in scripts/vector_ingest/snapshot.py), so rebuilding an index for
+disaster recovery, a new environment or a migration costs upload time
+only: no model download and no re-embedding. Imports go through the
+concurrent UpsertEngine (UPSTASH_UPLOAD_BATCH / UPSTASH_UPLOAD_CONCURRENCY).
+
+Export and import default to the namespace the live alias points at (see
+vector-alias.py), so a round trip lands where it came from. --namespace
+picks another one; import --shadow restores into a fresh generation that
+the alias switches to once it validates.
+
+Vectors restored this way are not in the local manifest; the next
+`init-vector-enhanced.py --sync` adopts them instead of re-uploading.
+
+Requirements:
+  pip install numpy requests python-dotenv
+
+Usage:
+  python scripts/vector-snapshot.py export snapshots/profile.vsnap [--namespace NS]
+  python scripts/vector-snapshot.py import snapshots/profile.vsnap [--namespace NS | --shadow]
+  python scripts/vector-snapshot.py inspect snapshots/profile.vsnap
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+from vector_ingest.alias import (ALIAS_ID, VALIDATE_SAMPLES, begin_generation, cutover, live_namespace,
+                                 validate_generation)
+from vector_ingest.snapshot import SnapshotError, export_snapshot, read_header, read_snapshot
+from vector_ingest.upload import UpsertEngine, make_item, print_progress, summarize
+from vector_ingest.upstash import UpstashClient, UpstashError
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except Exception:
+        pass
+
+load_dotenv(Path(__file__).resolve().parent.parent / '.env.local')
+UPSTASH_URL = os.getenv('UPSTASH_VECTOR_REST_URL')
+UPSTASH_TOKEN = os.getenv('UPSTASH_VECTOR_REST_TOKEN')
+
+
+def describe(header, size):
+    print(f"📦 Snapshot v{header['version']}: {header['count']} vectors x {header['dimension']} "
+          f"({size / 1024:.0f} KB, metadata {header['records_bytes'] / 1024:.0f} KB compressed)")
+    print(f"   from {header['source'] or '?'} namespace {header['namespace'] or '(default)'} at {header['created']}")
+
+
+def export(client, path):
+    started = time.perf_counter()
+    header = export_snapshot(client, path, source=urlparse(UPSTASH_URL).netloc)
+    describe(header, Path(path).stat().st_size)
+    print(f"✅ Exported in {time.perf_counter() - started:.1f}s to {path}")
+    return 0
+
+
+def restore(client, path, shadow):
+    header, ids, metadata, data, matrix = read_snapshot(path)
+    describe(header, Path(path).stat().st_size)
+    dimension = client.dimension(header['dimension'])
+    if dimension != header['dimension']:
+        print(f"❌ Index expects dimension {dimension}, snapshot has {header['dimension']}")
+        return 1
+
+    if shadow:
+        client = client.scoped(begin_generation(client, dimension))
+        print(f"🌗 Restoring into new generation {client.namespace}")
+    items = [make_item(vid, matrix[i], metadata[i]) for i, vid in enumerate(ids)]
+    for item, text in zip(items, data):
+        if text is not None:
+            item['data'] = text
+
+    engine = UpsertEngine(UPSTASH_URL, UPSTASH_TOKEN, namespace=client.namespace)
+    print(f"📤 Uploading {len(items)} vectors to {client.namespace or 'the default namespace'} "
+          f"({engine.concurrency} batches in flight)...")
+    started = time.perf_counter()
+    try:
+        summary = summarize(engine.upload(items, on_result=print_progress(len(items))))
+    finally:
+        engine.close()
+    elapsed = time.perf_counter() - started
+    print(f"\n📊 Import complete in {elapsed:.1f}s ({summary['success'] / max(elapsed, 1e-6):.0f} vec/s):")
+    print(f"   ⏱️ Final upsert pace: {engine.limiter.describe()}, {engine.describe_payload()}")
+    print(f"   ✅ Success: {summary['success']}/{len(items)}")
+    print(f"   ❌ Failed: {summary['error']}/{len(items)}")
+    if summary['error']:
+        return 1
+
+    if shadow:
+        step = max(1, len(ids) // VALIDATE_SAMPLES)
+        samples = [(ids[i], matrix[i]) for i in range(0, len(ids), step)][:VALIDATE_SAMPLES]
+        problems = validate_generation(client, client.namespace, len(ids), samples)
+        if problems:
+            for problem in problems:
+                print(f"❌ Validation: {problem}")
+            print('⚠️ Alias not switched')
+            return 1
+        record = cutover(client, client.namespace, dimension, vectors=len(ids), snapshot=Path(path).name)
+        print(f"🔀 Alias '{ALIAS_ID}' now points at {client.namespace} "
+              f"(previous: {record['previous'] or 'default namespace'}, kept for rollback)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export or import binary vector index snapshots')
+    parser.add_argument('command', choices=['export', 'import', 'inspect'])
+    parser.add_argument('path')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--namespace', default=None, help='namespace to read or write (default: live alias target)')
+    target.add_argument('--shadow', action='store_true', help='import: restore into a new generation, then cut over')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'inspect':
+            describe(read_header(args.path), Path(args.path).stat().st_size)
+            return 0
+        if not UPSTASH_URL or not UPSTASH_TOKEN:
+            print('❌ Missing Upstash credentials in .env.local')
+            return 1
+        client = UpstashClient(UPSTASH_URL, UPSTASH_TOKEN)
+        if args.namespace is not None:
+            client = client.scoped(args.namespace)
+        elif not args.shadow:
+            client = client.scoped(live_namespace(client))
+        if args.command == 'export':
+            return export(client, args.path)
+        return restore(client, args.path, args.shadow)
+    except (OSError, SnapshotError) as e:
+        print(f'❌ {e}')
+        return 1
+    except UpstashError as e:
+        print('❌ Upstash request failed:', e)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""
+Shared helpers for the vector initialization scripts in this folder.
+
+The init-vector-*.py scripts run from the scripts/ directory, so they can
+import this package directly:
+
+  from vector_ingest.embedding import encode_batched
+
+Unit tests live in vector_ingest/tests (no network, no model downloads):
+
+  python -m pytest -q scripts/vector_ingest/tests
+"""
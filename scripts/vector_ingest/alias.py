@@ -0,0 +1,147 @@
+"""
+Blue/green index generations behind a namespace alias.
+
+A full re-init with --shadow (or VECTOR_SHADOW=1) writes into a fresh
+namespace (gen-YYYYmmdd-HHMMSS) while chat keeps querying the live one, so
+it can upload at full speed. Once the new generation holds the expected
+number of vectors and finds its own sample chunks, a single upsert of the
+alias record flips lib/vectordb.ts over to it.
+
+The alias is one vector in the `_aliases` namespace of the same index, so
+no other service is needed; its metadata is the pointer:
+
+  {"namespace": "gen-20261018-101500", "previous": "", "building": "",
+   "vectors": 33, "model": "...", "switched": "<iso time>"}
+
+"" is the default namespace, where the non-shadow scripts write. The
+previous generation is kept for `vector-alias.py rollback`; the one before
+it is dropped at the next cutover. `building` names an unfinished shadow
+build, which --shadow --resume continues instead of starting over; a new
+shadow build drops it instead (one shadow build per index at a time), and
+`vector-alias.py gc` drops any other gen-* namespace the alias no longer
+names.
+
+Every other writer (plain runs, --sync, snapshot import, the legacy init
+scripts) targets live_namespace(), so after a cutover they keep updating
+the generation the app reads instead of the default namespace.
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+
+ALIAS_NAMESPACE = '_aliases'
+ALIAS_ID = os.getenv('VECTOR_ALIAS', 'live')
+GENERATION_PREFIX = 'gen-'
+VALIDATE_TIMEOUT = float(os.getenv('VECTOR_VALIDATE_TIMEOUT', '120'))
+VALIDATE_SAMPLES = 8
+
+
+def shadow_requested(flag=False):
+    """True when the caller passed --shadow (flag) or VECTOR_SHADOW is set."""
+    return flag or os.getenv('VECTOR_SHADOW', '') in ('1', 'true', 'yes')
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def generation_name():
+    return f"{GENERATION_PREFIX}{datetime.now(timezone.utc):%Y%m%d-%H%M%S}"
+
+
+def read_alias(client, alias=ALIAS_ID):
+    """The alias record, or {} when no cutover has happened yet (live is the default namespace)."""
+    rows = client.scoped(ALIAS_NAMESPACE).fetch([alias], include_metadata=True)
+    row = rows[0] if rows else None
+    return dict((row or {}).get('metadata') or {})
+
+
+def live_namespace(client):
+    """Namespace the alias points at, '' (default namespace) before the first cutover."""
+    return read_alias(client).get('namespace', '')
+
+
+def write_alias(client, record, dimension, alias=ALIAS_ID):
+    # Upstash keeps metadata on a vector, so the record rides on a unit placeholder
+    vector = [0.0] * dimension
+    vector[0] = 1.0
+    client.scoped(ALIAS_NAMESPACE).upsert([{'id': alias, 'vector': vector, 'metadata': record}])
+    return record
+
+
+def begin_generation(client, dimension, resume=False):
+    """Namespace for a shadow build: the unfinished one with resume, else a fresh one."""
+    current = read_alias(client)
+    if resume and current.get('building'):
+        return current['building']
+    namespace = generation_name()
+    write_alias(client, {**current, 'namespace': current.get('namespace', ''), 'building': namespace}, dimension)
+    abandoned = current.get('building', '')
+    if abandoned and abandoned not in (namespace, current.get('namespace', ''), current.get('previous', '')) \
+            and drop_generation(client, abandoned):
+        print(f"🧹 Dropped abandoned generation {abandoned}")
+    return namespace
+
+
+def validate_generation(client, namespace, expected, samples, timeout=VALIDATE_TIMEOUT):
+    """
+    Problems that block a cutover to namespace (empty list when it is ready).
+
+    Waits for the namespace to report `expected` vectors with nothing pending,
+    then checks that each (id, vector) in samples comes back as its own top hit.
+    """
+    scoped = client.scoped(namespace)
+    deadline = time.monotonic() + timeout
+    while True:
+        count, pending = client.namespace_counts().get(namespace, (0, 0))
+        if count == expected and pending == 0:
+            break
+        if time.monotonic() >= deadline:
+            return [f'{namespace} has {count} vectors ({pending} pending), expected {expected}']
+        time.sleep(1.0)
+    problems = []
+    for chunk_id, vector in samples:
+        hits = scoped.query(vector, top_k=1)
+        top = hits[0]['id'] if hits else None
+        if top != chunk_id:
+            problems.append(f'sample query for {chunk_id} returned {top}')
+    return problems
+
+
+def drop_generation(client, namespace):
+    """Delete an old generation; the default namespace is never dropped."""
+    if not namespace.startswith(GENERATION_PREFIX):
+        return False
+    client.delete_namespace(namespace)
+    return True
+
+
+def cutover(client, namespace, dimension, **details):
+    """Point the alias at namespace, keep the old live one for rollback and drop the one before it."""
+    current = read_alias(client)
+    live, retired = current.get('namespace', ''), current.get('previous', '')
+    record = write_alias(client, {**details, 'namespace': namespace, 'previous': live, 'building': '',
+                                  'switched': _now()}, dimension)
+    if retired and retired not in (namespace, live) and drop_generation(client, retired):
+        print(f"🧹 Dropped retired generation {retired}")
+    return record
+
+
+def collect_garbage(client):
+    """Drop every generation the alias does not name as live, previous or building; returns their names."""
+    current = read_alias(client)
+    named = {current.get('namespace', ''), current.get('previous', ''), current.get('building', '')}
+    orphans = sorted(ns for ns in client.namespace_counts() if ns.startswith(GENERATION_PREFIX) and ns not in named)
+    for namespace in orphans:
+        drop_generation(client, namespace)
+    return orphans
+
+
+def rollback(client, dimension):
+    """Swap live and previous; running it again rolls forward."""
+    current = read_alias(client)
+    if not current or 'previous' not in current:
+        raise ValueError('no previous generation to roll back to')
+    return write_alias(client, {**current, 'namespace': current['previous'], 'previous': current['namespace'],
+                                'switched': _now()}, dimension)
@@ -0,0 +1,95 @@
+"""
+BM25 inverted index emitted next to the vectors for hybrid retrieval.
+
+The index covers exactly the chunks that were embedded and is tokenized with
+vector_ingest.tokens (English words, CJK unigrams + bigrams). Because the
+BM25 term weight
+
+  idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avgdl))
+
+does not depend on the query, it is precomputed per posting; a lookup is then
+just a sum of weights over the query's terms. lib/bm25.ts loads the same JSON
+in the chat route and fuses it with Upstash vector scores.
+
+Layout (lib/generated/bm25-index.json):
+  {"version", "k1", "b", "avgdl", "stopwords": [...],
+   "docs": [{"id", "content", "type", "source", "category"}],
+   "postings": {"term": [[doc_index, weight], ...]}}
+"""
+
+import json
+import math
+import os
+from collections import Counter
+from pathlib import Path
+
+from .tokens import STOPWORDS, terms
+
+INDEX_VERSION = 1
+INDEX_PATH = Path(__file__).resolve().parent.parent.parent / 'lib' / 'generated' / 'bm25-index.json'
+K1 = 1.2
+B = 0.75
+
+
+def build_index(chunks, k1=K1, b=B):
+    """Build the BM25 index dict for a list of {id, content, metadata} chunks."""
+    docs, doc_terms = [], []
+    for ch in chunks:
+        meta = ch.get('metadata') or {}
+        docs.append({
+            'id': ch['id'],
+            'content': ch['content'],
+            'type': meta.get('type', ch.get('type', '')),
+            'source': meta.get('source', ch.get('source', '')),
+            'category': meta.get('category', ch.get('category', '')),
+        })
+        doc_terms.append(Counter(terms(ch['content'])))
+
+    n = len(docs)
+    lengths = [sum(c.values()) for c in doc_terms]
+    avgdl = (sum(lengths) / n) if n else 0.0
+    df = Counter(t for c in doc_terms for t in c)
+
+    postings = {}
+    for i, counts in enumerate(doc_terms):
+        norm = k1 * (1 - b + b * lengths[i] / avgdl) if avgdl else k1
+        for term, tf in counts.items():
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            postings.setdefault(term, []).append([i, round(idf * tf * (k1 + 1) / (tf + norm), 4)])
+
+    return {
+        'version': INDEX_VERSION,
+        'k1': k1,
+        'b': b,
+        'avgdl': round(avgdl, 3),
+        'stopwords': sorted(STOPWORDS),
+        'docs': docs,
+        'postings': dict(sorted(postings.items())),
+    }
+
+
+def write_index(index, path=INDEX_PATH):
+    """Write the index if its content changed; returns True when the file was rewritten."""
+    path = Path(path)
+    body = json.dumps(index, ensure_ascii=False, separators=(',', ':')) + '\n'
+    if path.exists() and path.read_text(encoding='utf-8') == body:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(body, encoding='utf-8')
+    os.replace(tmp, path)
+    return True
+
+
+def load_index(path=INDEX_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def search(index, query, top_k=10):
+    """[(doc, score)] for the best BM25 matches of query, highest first."""
+    scores = Counter()
+    for term in terms(query, stopwords=frozenset(index['stopwords'])):
+        for doc, weight in index['postings'].get(term, ()):
+            scores[doc] += weight
+    return [(index['docs'][doc], score) for doc, score in scores.most_common(top_k)]
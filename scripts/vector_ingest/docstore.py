@@ -0,0 +1,174 @@
+"""
+Out-of-band chunk text store keyed by chunk id.
+
+Vector metadata only carries the small fields queries filter on (type,
+source, category); the chunk id is the pointer to the text. Ids are
+content-derived (see ids.py), so an id always names the same text and
+blue/green generations can share one store. lib/docstore.ts hydrates the
+search hits with a single multi-get, so Upstash query responses stay small.
+
+Backends (DOCSTORE=file|redis, default file):
+  file   lib/generated/chunk-docs.json, bundled with the Next.js app like
+         the BM25 index:
+           {"version": 1, "shared": "bm25-index.json",
+            "docs": {"<id>": {"content", "type", "source", "category"}}}
+         Documents the BM25 index already carries are not repeated here;
+         both files are read as one store. The bundle is fixed at build
+         time, so texts written to it reach a deployed app only after a
+         rebuild - use redis when re-ingesting against a running app.
+  redis  one Upstash Redis hash (DOCSTORE_KEY, default "vector:docs"),
+         field = chunk id, value = the JSON document; read with one HMGET.
+         Needs UPSTASH_REDIS_REST_URL and UPSTASH_REDIS_REST_TOKEN.
+
+Documents are merged in, so scripts with different chunkings can share a
+store; delete() drops ids that --sync pruned from the index.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import requests
+
+from .bm25 import INDEX_PATH as BM25_INDEX_PATH
+
+DOCS_VERSION = 1
+DOCS_PATH = Path(__file__).resolve().parent.parent.parent / 'lib' / 'generated' / 'chunk-docs.json'
+DOCSTORE_KEY = os.getenv('DOCSTORE_KEY', 'vector:docs')
+REDIS_BATCH = 500
+
+
+def _bm25_docs(path):
+    """id -> document for the chunks the BM25 index next to the bundle already holds."""
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        docs = json.load(f).get('docs', [])
+    return {d['id']: {'content': d['content'], 'type': d.get('type', ''), 'source': d.get('source', ''),
+                      'category': d.get('category', '') or ''} for d in docs}
+
+
+def doc_record(chunk):
+    """The stored document for a chunk (enhanced {metadata: {...}} or flat legacy shape)."""
+    meta = chunk.get('metadata') or chunk
+    return {
+        'content': chunk['content'],
+        'type': meta.get('type', ''),
+        'source': meta.get('source', ''),
+        'category': meta.get('category', '') or '',
+    }
+
+
+class FileDocStore:
+    def __init__(self, path=DOCS_PATH, shared_path=BM25_INDEX_PATH):
+        self.path = Path(path)
+        self.shared_path = Path(shared_path)
+        self._lock = threading.Lock()  # fan-out targets prune from several threads
+
+    def describe(self):
+        return f'{self.path} (bundled: rebuild the app to serve new texts)'
+
+    def _load(self):
+        docs = _bm25_docs(self.shared_path)
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == DOCS_VERSION:
+                docs.update(data.get('docs', {}))
+        return docs
+
+    def _write(self, docs):
+        shared = _bm25_docs(self.shared_path)
+        own = {k: v for k, v in docs.items() if shared.get(k) != v}
+        body = json.dumps({'version': DOCS_VERSION, 'shared': self.shared_path.name, 'docs': dict(sorted(own.items()))},
+                          ensure_ascii=False, separators=(',', ':')) + '\n'
+        if self.path.exists() and self.path.read_text(encoding='utf-8') == body:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(body, encoding='utf-8')
+        os.replace(tmp, self.path)
+
+    def put_many(self, chunks):
+        """Merge chunk documents in; returns how many were new or changed."""
+        with self._lock:
+            docs = self._load()
+            changed = 0
+            for ch in chunks:
+                record = doc_record(ch)
+                if docs.get(ch['id']) != record:
+                    docs[ch['id']] = record
+                    changed += 1
+            if changed:
+                self._write(docs)
+        return changed
+
+    def delete(self, ids):
+        with self._lock:
+            docs = self._load()
+            removed = [i for i in ids if docs.pop(i, None) is not None]
+            if removed:
+                self._write(docs)
+        return len(removed)
+
+    def get_many(self, ids):
+        docs = self._load()
+        return [docs.get(i) for i in ids]
+
+
+class RedisDocStore:
+    def __init__(self, url, token, key=DOCSTORE_KEY, timeout=30):
+        self.url = url.rstrip('/')
+        self.key = key
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def describe(self):
+        return f'redis hash {self.key}'
+
+    def command(self, *args):
+        try:
+            resp = self.session.post(self.url, json=[str(a) for a in args], timeout=self.timeout)
+            payload = resp.json()
+        except (requests.RequestException, ValueError) as e:
+            raise RuntimeError(f'Redis {args[0]} failed: {e}') from e
+        if resp.status_code >= 300 or 'error' in payload:
+            raise RuntimeError(f"Redis {args[0]} failed: {resp.status_code} {payload.get('error', '')}")
+        return payload.get('result')
+
+    def put_many(self, chunks):
+        """HSET every document (batched); returns how many fields were new."""
+        chunks = list(chunks)
+        added = 0
+        for start in range(0, len(chunks), REDIS_BATCH):
+            fields = []
+            for ch in chunks[start:start + REDIS_BATCH]:
+                fields += [ch['id'], json.dumps(doc_record(ch), ensure_ascii=False, separators=(',', ':'))]
+            added += int(self.command('HSET', self.key, *fields) or 0)
+        return added
+
+    def delete(self, ids):
+        ids = list(ids)
+        return sum(int(self.command('HDEL', self.key, *ids[s:s + REDIS_BATCH]) or 0)
+                   for s in range(0, len(ids), REDIS_BATCH))
+
+    def get_many(self, ids):
+        ids = list(ids)
+        if not ids:
+            return []
+        return [json.loads(v) if v else None for v in self.command('HMGET', self.key, *ids)]
+
+
+def open_docstore(kind=None):
+    """The configured doc store; raises ValueError when redis is chosen without credentials."""
+    kind = (kind or os.getenv('DOCSTORE', 'file')).lower()
+    if kind == 'file':
+        return FileDocStore()
+    if kind == 'redis':
+        url, token = os.getenv('UPSTASH_REDIS_REST_URL'), os.getenv('UPSTASH_REDIS_REST_TOKEN')
+        if not url or not token:
+            raise ValueError('DOCSTORE=redis needs UPSTASH_REDIS_REST_URL and UPSTASH_REDIS_REST_TOKEN')
+        return RedisDocStore(url, token)
+    raise ValueError(f'Unknown DOCSTORE {kind!r} (expected file or redis)')
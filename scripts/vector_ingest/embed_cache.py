@@ -0,0 +1,269 @@
+"""
+Persistent, content-addressed embedding cache shared by all init scripts.
+
+Each model gets its own folder under .vector-cache/embeddings/ holding:
+  vectors.f32  - raw float32 rows, read through numpy.memmap
+  index.json   - text hash -> [row, last_used] plus the vector dimension
+  .lock        - lock file so several processes can share the cache
+
+New rows and last-used times are queued in memory and written by flush()
+(or once FLUSH_ROWS rows are queued), so a run rewrites index.json once
+rather than per batch, and not at all for a run that only hits vectors
+used within the last TOUCH_SECONDS. Rows are written after the last row
+index.json records (truncating rows a crashed run appended but never
+indexed). When the matrix grows past max_bytes the least recently used
+rows are dropped down to 80% of the bound and the file is rewritten.
+
+Environment:
+  EMBEDDING_CACHE_MAX_MB   size bound per model (default 512)
+  EMBEDDING_CACHE_DISABLE  set to 1 to bypass the cache entirely
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from .manifest import CACHE_DIR
+
+INDEX_VERSION = 1
+DEFAULT_MAX_BYTES = int(float(os.getenv('EMBEDDING_CACHE_MAX_MB', '512')) * 1024 * 1024)
+EVICT_TO = 0.8  # low-water mark, so a full cache is not rewritten on every put
+FLUSH_ROWS = 4096  # queued rows per vectors.f32 append / index.json write
+TOUCH_SECONDS = 3600  # last_used resolution: re-reading a warm cache within the hour writes nothing
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def cache_disabled():
+    return os.getenv('EMBEDDING_CACHE_DISABLE', '') in ('1', 'true', 'yes')
+
+
+@contextmanager
+def _locked(path):
+    """Exclusive inter-process lock on a sidecar file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+b') as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        else:
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class EmbeddingCache:
+    """Memory-mapped float32 embedding store for one model."""
+
+    def __init__(self, model_name, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, flush_rows=FLUSH_ROWS):
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name).strip('_')
+        self.model_name = model_name
+        self.dir = Path(cache_dir or CACHE_DIR / 'embeddings') / slug
+        self.vectors_path = self.dir / 'vectors.f32'
+        self.index_path = self.dir / 'index.json'
+        self.lock_path = self.dir / '.lock'
+        self.max_bytes = max_bytes
+        self.flush_rows = flush_rows
+        self._pending = {}  # text hash -> vector not written yet
+        self._touched = {}  # text hash -> last hit, recorded on flush()
+
+    # -- index helpers (call with the lock held) --
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return {'version': INDEX_VERSION, 'dim': None, 'rows': 0, 'entries': {}}
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != INDEX_VERSION:
+            return {'version': INDEX_VERSION, 'dim': None, 'rows': 0, 'entries': {}}
+        size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        if index['rows'] and size < index['rows'] * index['dim'] * 4:
+            # The matrix lost rows the index points at; start over rather than serve zeros
+            return {'version': INDEX_VERSION, 'dim': None, 'rows': 0, 'entries': {}}
+        return index
+
+    def _save_index(self, index):
+        tmp = self.index_path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp, self.index_path)
+
+    def _matrix(self, index):
+        if not index['rows'] or not self.vectors_path.exists():
+            return None
+        return np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(index['rows'], index['dim']))
+
+    # -- public API --
+
+    def get_many(self, texts):
+        """
+        Look up texts. Returns (vectors, missing) where vectors is an
+        (n, dim) float32 array (None if the cache is empty) and missing
+        lists the positions that still need to be embedded.
+
+        Hits are only noted in memory; flush() records their last use.
+        """
+        hashes = [text_hash(t) for t in texts]
+        with _locked(self.lock_path):
+            index = self._load_index()
+            entries = index['entries']
+            mat = self._matrix(index)
+            dim = index['dim'] if mat is not None else self._pending_dim()
+            if dim is None:
+                return None, list(range(len(texts)))
+
+            out = np.zeros((len(texts), dim), dtype=np.float32)
+            missing = []
+            now = int(time.time())
+            for i, h in enumerate(hashes):
+                if h in self._pending:
+                    out[i] = self._pending[h]
+                    continue
+                entry = entries.get(h) if mat is not None else None
+                if entry is None:
+                    missing.append(i)
+                    continue
+                out[i] = mat[entry[0]]
+                self._touched[h] = now
+            del mat
+        return out, missing
+
+    def put_many(self, texts, vectors):
+        """
+        Queue embeddings for texts that are not cached yet; they are
+        written once flush_rows accumulate, or on flush().
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if not len(texts):
+            return
+        for text, vec in zip(texts, vectors):
+            self._pending.setdefault(text_hash(text), vec)
+        if len(self._pending) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        """Append queued rows and record hits in one index.json write, skipped when nothing changed."""
+        if not self._pending and not self._touched:
+            return
+        pending, touched = self._pending, self._touched
+        self._pending, self._touched = {}, {}
+        with _locked(self.lock_path):
+            index = self._load_index()
+            entries = index['entries']
+            changed = False
+            for h, used in touched.items():
+                entry = entries.get(h)
+                if entry is not None and used - entry[1] >= TOUCH_SECONDS:
+                    entry[1] = used
+                    changed = True
+
+            now = int(time.time())
+            new_rows = []
+            if pending:
+                dim = len(next(iter(pending.values())))
+                if index['dim'] is None:
+                    index['dim'] = dim
+                if index['dim'] != dim:
+                    print(f"⚠️ Embedding cache dimension mismatch for {self.model_name}; not caching")
+                else:
+                    for h, vec in pending.items():
+                        if h not in entries:
+                            entries[h] = [index['rows'] + len(new_rows), now]
+                            new_rows.append(vec)
+            if new_rows:
+                # Write at the row count the index records, not at end of file: rows appended by a
+                # run that died before saving index.json are orphans and get overwritten here
+                self.dir.mkdir(parents=True, exist_ok=True)
+                with open(self.vectors_path, 'r+b' if self.vectors_path.exists() else 'wb') as f:
+                    f.seek(index['rows'] * index['dim'] * 4)
+                    f.write(np.stack(new_rows).astype(np.float32).tobytes())
+                    f.truncate()
+                index['rows'] += len(new_rows)
+                if index['rows'] * index['dim'] * 4 > self.max_bytes:
+                    self._evict(index)
+                changed = True
+            if changed:
+                self._save_index(index)
+
+    def _pending_dim(self):
+        return len(next(iter(self._pending.values()))) if self._pending else None
+
+    def _evict(self, index):
+        """Keep the most recently used rows that fit in EVICT_TO of max_bytes."""
+        row_bytes = index['dim'] * 4
+        keep_n = max(1, int(self.max_bytes * EVICT_TO) // row_bytes)
+        ranked = sorted(index['entries'].items(), key=lambda kv: kv[1][1], reverse=True)[:keep_n]
+        mat = self._matrix(index)
+        kept = np.array([mat[entry[0]] for _, entry in ranked], dtype=np.float32)
+        del mat
+
+        tmp = self.vectors_path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(kept.tobytes())
+        os.replace(tmp, self.vectors_path)
+
+        index['entries'] = {h: [row, entry[1]] for row, (h, entry) in enumerate(ranked)}
+        index['rows'] = len(ranked)
+        print(f"🧹 Embedding cache for {self.model_name} trimmed to {len(ranked)} vectors")
+
+
+def encode_cached(model_name, texts, load_model, batch_size=None, cache=None):
+    """
+    Embed texts, reusing cached vectors and only running the model on misses.
+
+    load_model is called at most once, and only when something is missing,
+    so a fully cached run never loads model weights.
+    Pass a long-lived `cache` when calling per window and flush() it at the
+    end of the run; otherwise a cache is opened and flushed for this call.
+    Returns a (len(texts), dim) float32 matrix in input order.
+    """
+    from .embedding import DEFAULT_BATCH_SIZE, encode_batched
+
+    texts = list(texts)
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    if cache_disabled():
+        return encode_batched(load_model(), texts, batch_size=batch_size)
+
+    owned = cache is None
+    cache = cache or EmbeddingCache(model_name)
+    out, missing = cache.get_many(texts)
+    print(f"💾 Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+    if not missing:
+        if owned:
+            cache.flush()
+        return out
+
+    miss_texts = [texts[i] for i in missing]
+    fresh = encode_batched(load_model(), miss_texts, batch_size=batch_size)
+    cache.put_many(miss_texts, fresh)
+    if owned:
+        cache.flush()
+    if out is None:
+        out = np.empty((len(texts), fresh.shape[1]), dtype=np.float32)
+    out[missing] = fresh
+    return out
@@ -0,0 +1,289 @@
+"""
+Long-lived local embedding service with dynamic micro-batching.
+
+Loads each SentenceTransformer once and keeps it warm, so ingestion runs no
+longer pay the model cold start. Concurrent /embed requests for the same
+model are coalesced: the first request opens a short window (max_wait_ms)
+and every request arriving inside it, up to max_batch texts, is encoded in
+a single forward pass.
+
+HTTP API (127.0.0.1 only by default):
+  POST /embed   {"model": "...", "texts": ["..."], "format": "json"|"f32"}
+                json -> {"model", "backend", "dimension", "embeddings": [[...], ...]}
+                f32  -> raw little-endian float32 rows, X-Embedding-Dimension and
+                        X-Embedding-Backend headers
+  GET  /health  backend, loaded models and batching counters
+
+With EMBEDDING_BACKEND=onnx the server holds int8 ONNX Runtime sessions
+(see onnx_backend.py) instead of PyTorch models. It reports that backend,
+and clients key their embedding cache by it (encoder_cache_key), so int8
+and fp32 vectors never share a cache entry whichever side set the variable.
+
+Clients: set EMBEDDING_SERVER_URL (e.g. http://127.0.0.1:8788) and the init
+scripts' load_model() returns a RemoteEncoder instead of loading weights.
+
+Usage:
+  python scripts/embedding-server.py --preload paraphrase-multilingual-mpnet-base-v2
+"""
+
+import argparse
+import functools
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+from .embedding import encode_batched
+from .onnx_backend import BACKEND, cache_key, load_backend
+
+DEFAULT_MODELS = (
+    'paraphrase-multilingual-mpnet-base-v2',
+    'sentence-transformers/all-mpnet-base-v2',
+    'sentence-transformers/all-MiniLM-L6-v2',
+    'all-MiniLM-L6-v2',
+    'all-mpnet-base-v2',
+)
+SERVER_URL = os.getenv('EMBEDDING_SERVER_URL', '')
+
+
+class MicroBatcher:
+    """Coalesces concurrent encode requests for one model into shared batches."""
+
+    def __init__(self, encode_fn, max_batch=64, max_wait_ms=5.0):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = queue.Queue()
+        self.stats = {'requests': 0, 'texts': 0, 'batches': 0, 'encode_seconds': 0.0}
+        threading.Thread(target=self._loop, name='micro-batcher', daemon=True).start()
+
+    def submit(self, texts):
+        """Block until the embeddings for `texts` are ready; returns float32 (n, dim)."""
+        future = Future()
+        self.queue.put((list(texts), future))
+        return future.result()
+
+    def _loop(self):
+        while True:
+            pending = [self.queue.get()]
+            count = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                count += len(item[0])
+
+            texts = [t for batch, _ in pending for t in batch]
+            started = time.perf_counter()
+            try:
+                emb = np.asarray(self.encode_fn(texts), dtype=np.float32)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.stats['encode_seconds'] += time.perf_counter() - started
+            self.stats['requests'] += len(pending)
+            self.stats['texts'] += len(texts)
+            self.stats['batches'] += 1
+
+            offset = 0
+            for batch, future in pending:
+                future.set_result(emb[offset:offset + len(batch)])
+                offset += len(batch)
+
+
+class ModelRegistry:
+    """Loads each allowed model once and hands out its MicroBatcher."""
+
+    def __init__(self, allowed=DEFAULT_MODELS, max_batch=64, max_wait_ms=5.0, loader=None):
+        self.allowed = set(allowed)
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.loader = loader or self._load_sentence_transformer
+        self.models = {}
+        self.batchers = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _load_sentence_transformer(name):
+        def load_torch():
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(name)
+        return load_backend(name, load_torch)
+
+    def get(self, name):
+        if name not in self.allowed:
+            raise KeyError(name)
+        with self.lock:
+            if name not in self.batchers:
+                print(f"🌍 Loading model: {name}")
+                started = time.perf_counter()
+                model = self.loader(name)
+                print(f"✅ {name} ready in {time.perf_counter() - started:.1f}s")
+                self.models[name] = model
+                self.batchers[name] = MicroBatcher(
+                    lambda texts, m=model: encode_batched(m, texts, batch_size=self.max_batch, show_progress=False),
+                    max_batch=self.max_batch,
+                    max_wait_ms=self.max_wait_ms,
+                )
+            return self.batchers[name]
+
+    def health(self):
+        with self.lock:
+            return {name: dict(b.stats) for name, b in self.batchers.items()}
+
+
+class EmbedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    registry = None
+    default_model = None
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body, content_type='application/json', headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/health':
+            return self._reply(200, {'status': 'ok', 'backend': BACKEND, 'models': self.registry.health()})
+        self._reply(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/embed':
+            return self._reply(404, {'error': 'Not found'})
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            req = json.loads(self.rfile.read(length) or b'{}')
+            texts = req.get('texts')
+            if isinstance(texts, str):
+                texts = [texts]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                return self._reply(400, {'error': 'texts must be a string or a list of strings'})
+            model = req.get('model') or self.default_model
+            emb = self.registry.get(model).submit(texts) if texts else np.zeros((0, 0), dtype=np.float32)
+        except KeyError as e:
+            return self._reply(400, {'error': f'Model not allowed: {e.args[0]}'})
+        except ValueError:
+            return self._reply(400, {'error': 'Invalid JSON body'})
+        except Exception as e:
+            return self._reply(500, {'error': str(e)[:300]})
+
+        dim = int(emb.shape[1]) if emb.ndim == 2 else 0
+        if req.get('format') == 'f32':
+            return self._reply(200, np.ascontiguousarray(emb, dtype='<f4').tobytes(), 'application/octet-stream',
+                               {'X-Embedding-Dimension': str(dim), 'X-Embedding-Count': str(len(texts)),
+                                'X-Embedding-Backend': BACKEND})
+        self._reply(200, {'model': model, 'backend': BACKEND, 'dimension': dim, 'embeddings': emb.tolist()})
+
+
+class RemoteEncoder:
+    """SentenceTransformer-shaped client for the embedding server."""
+
+    def __init__(self, model_name, url=None, timeout=120, backend=None):
+        self.model_name = model_name
+        self.backend = backend  # what the cache key assumed; a restarted server must still match
+        self.url = (url or SERVER_URL).rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._dim = None
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        r = self.session.post(f'{self.url}/embed', json={'model': self.model_name, 'texts': texts, 'format': 'f32'},
+                              timeout=self.timeout)
+        if r.status_code != 200:
+            raise RuntimeError(f'Embedding server returned {r.status_code}: {r.text[:200]}')
+        backend = r.headers.get('X-Embedding-Backend')
+        if self.backend and backend and backend != self.backend:
+            raise RuntimeError(f'Embedding server switched from {self.backend} to {backend}; rerun to re-key the cache')
+        dim = int(r.headers['X-Embedding-Dimension'])
+        emb = np.frombuffer(r.content, dtype='<f4').reshape(len(texts), dim) if texts else np.zeros((0, dim), np.float32)
+        self._dim = dim
+        return emb[0] if single else emb
+
+    def get_sentence_embedding_dimension(self):
+        if self._dim is None:
+            self.encode(['dimension probe'])
+        return self._dim
+
+
+@functools.lru_cache(maxsize=None)
+def server_backend(url=SERVER_URL):
+    """Backend the embedding server encodes with, or None when it is not configured or unreachable."""
+    if not url:
+        return None
+    try:
+        resp = requests.get(url.rstrip('/') + '/health', timeout=2)
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        print(f"⚠️ Embedding server unavailable ({str(e)[:80]}); loading model locally")
+        return None
+    return resp.json().get('backend', 'torch')
+
+
+def encoder_cache_key(model_name, local_backend=BACKEND):
+    """
+    Embedding-cache key for the backend that will produce model_name's vectors:
+    the server's when load_encoder() will use it, else local_backend.
+    Probing is cheap and loads no weights, so fully cached runs stay model-free.
+    """
+    return cache_key(model_name, server_backend() or local_backend)
+
+
+def load_encoder(model_name, loader):
+    """Use the embedding server when EMBEDDING_SERVER_URL is reachable, else loader()."""
+    backend = server_backend()
+    if backend is not None:
+        print(f"🔌 Using embedding server at {SERVER_URL} ({backend}) for {model_name}")
+        return RemoteEncoder(model_name, backend=backend)
+    return loader()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local embedding server with micro-batching')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8788)
+    parser.add_argument('--models', default=','.join(DEFAULT_MODELS), help='comma-separated allowlist')
+    parser.add_argument('--default-model', default=DEFAULT_MODELS[0])
+    parser.add_argument('--preload', action='append', default=[], help='model to load at start-up (repeatable)')
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    allowed = [m.strip() for m in args.models.split(',') if m.strip()]
+    registry = ModelRegistry(allowed + args.preload, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    for name in args.preload:
+        registry.get(name)
+
+    handler = type('EmbedServerHandler', (EmbedHandler,), {'registry': registry, 'default_model': args.default_model})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    print(f"🧠 Embedding server on http://{args.host}:{args.port} "
+          f"(batch {args.max_batch}, window {args.max_wait_ms:g} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('\n👋 Stopped')
+    return 0
@@ -0,0 +1,76 @@
+"""
+Batched embedding stage for the init-vector scripts.
+
+Encodes a whole chunk list in a few large model calls instead of one
+model.encode() per chunk. Inputs are sorted by token length before batching
+so each batch pads to a similar length, then the rows are put back in the
+original order and returned as a single float32 matrix.
+
+Requirements:
+  pip install sentence-transformers numpy
+"""
+
+import os
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))
+
+
+def token_lengths(model, texts):
+    """Return the token count of each text, falling back to word counts."""
+    tokenizer = getattr(model, 'tokenizer', None)
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(list(texts), add_special_tokens=True, truncation=False)
+            return [len(ids) for ids in encoded['input_ids']]
+        except Exception:
+            pass
+    return [len(t.split()) for t in texts]
+
+
+def model_dimension(model):
+    """Embedding width of a SentenceTransformer without a throwaway encode."""
+    get_dim = getattr(model, 'get_sentence_embedding_dimension', None)
+    dim = get_dim() if get_dim else None
+    if dim:
+        return int(dim)
+    return int(np.asarray(model.encode(['test'])).shape[1])
+
+
+def encode_batched(model, texts, batch_size=DEFAULT_BATCH_SIZE, show_progress=True):
+    """
+    Encode all texts and return a (len(texts), dim) float32 matrix.
+
+    Texts are grouped into length-sorted buckets of batch_size so padding
+    waste stays small; output row i always corresponds to texts[i].
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, model_dimension(model)), dtype=np.float32)
+
+    if getattr(model, 'handles_batching', False):
+        # e.g. ProcessEmbedder: shards and orders the whole list itself
+        return model.encode(texts, show_progress_bar=show_progress)
+
+    lengths = token_lengths(model, texts)
+    order = np.argsort(lengths, kind='stable')[::-1]
+    out = None
+
+    for start in range(0, len(texts), batch_size):
+        idx = order[start:start + batch_size]
+        emb = model.encode(
+            [texts[i] for i in idx],
+            batch_size=len(idx),
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        emb = np.asarray(emb, dtype=np.float32)
+        if out is None:
+            out = np.empty((len(texts), emb.shape[1]), dtype=np.float32)
+        out[idx] = emb
+        if show_progress:
+            done = min(start + batch_size, len(texts))
+            print(f"   🧮 Encoded {done}/{len(texts)} chunks")
+
+    return out
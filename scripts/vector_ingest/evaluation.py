@@ -0,0 +1,99 @@
+"""
+Offline retrieval metrics for the recruiter query set.
+
+scripts/eval/recruiter-queries.json lists each query with the chunk families
+that should answer it, as stable id prefixes ("skill-lang-Python",
+"exp-leadership-"). Prefixes survive content edits, because stable ids only
+change in their hash suffix (see vector_ingest.ids).
+
+For a ranked list of chunk ids:
+  recall@k  relevant chunks in the top k / min(k, number of relevant chunks)
+  rr        1 / rank of the first relevant chunk (0 if none in the list)
+MRR is the mean of rr over the queries.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+QUERIES_PATH = Path(__file__).resolve().parent.parent / 'eval' / 'recruiter-queries.json'
+DEFAULT_KS = (1, 3, 5, 10)
+
+
+def load_queries(path=QUERIES_PATH):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return json.load(f)
+
+
+def is_relevant(chunk_id, prefixes):
+    return any(chunk_id.startswith(p) for p in prefixes)
+
+
+def relevant_ids(chunk_ids, prefixes):
+    return {cid for cid in chunk_ids if is_relevant(cid, prefixes)}
+
+
+def score_ranking(ranked_ids, relevant, ks=DEFAULT_KS):
+    """recall@k for each k plus the reciprocal rank of one ranked id list."""
+    scores = {}
+    for k in ks:
+        hits = sum(1 for cid in ranked_ids[:k] if cid in relevant)
+        scores[f'recall@{k}'] = hits / min(k, len(relevant))
+    scores['rr'] = next((1.0 / rank for rank, cid in enumerate(ranked_ids, 1) if cid in relevant), 0.0)
+    return scores
+
+
+def summarize(per_query, ks=DEFAULT_KS):
+    """Mean recall@k and MRR over a list of score_ranking() dicts."""
+    if not per_query:
+        return {}
+    out = {f'recall@{k}': round(float(np.mean([q[f'recall@{k}'] for q in per_query])), 4) for k in ks}
+    out['mrr'] = round(float(np.mean([q['rr'] for q in per_query])), 4)
+    return out
+
+
+def latency_summary(latencies_ms):
+    arr = np.asarray(latencies_ms, dtype=np.float64)
+    return {
+        'p50_ms': round(float(np.percentile(arr, 50)), 3),
+        'p99_ms': round(float(np.percentile(arr, 99)), 3),
+        'mean_ms': round(float(arr.mean()), 3),
+    }
+
+
+class FlatIndex:
+    """Exact cosine search over an in-memory matrix - the local stand-in for a vector index."""
+
+    def __init__(self, ids, vectors):
+        self.ids = list(ids)
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+    @property
+    def dimension(self):
+        return self.matrix.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.matrix.nbytes
+
+    def search(self, query_vector, top_k=10):
+        q = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        q = q / (np.linalg.norm(q) or 1.0)
+        scores = self.matrix @ q
+        top_k = min(top_k, len(self.ids))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(self.ids[i], float(scores[i])) for i in best]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Same fusion as lib/bm25.ts: each list adds 1 / (k + rank) per id."""
+    fused = {}
+    for ranking in rankings:
+        for rank, cid in enumerate(ranking, 1):
+            fused[cid] = fused.get(cid, 0.0) + 1.0 / (k + rank)
+    return sorted(fused, key=lambda cid: -fused[cid])
@@ -0,0 +1,93 @@
+"""
+Zero-model feature-hashing embedder (the "hashing trick") in NumPy.
+
+Each text is turned into word unigrams/bigrams and character n-grams of its
+words; every feature is hashed (32-bit FNV-1a, vectorized across the whole
+batch) to a dimension and a sign, counts are summed with one np.bincount,
+damped with log1p and the rows L2-normalised. Texts that share words or word pieces
+get a positive cosine, so keyword retrieval works with no model download and
+well under a millisecond per text - enough for smoke and CI environments.
+
+Usage:
+  emb = HashingEmbedder(384).encode(texts)       # (len(texts), 384) float32
+"""
+
+import numpy as np
+
+from .tokens import words
+
+FNV_OFFSET = np.uint32(2166136261)
+FNV_PRIME = np.uint32(16777619)
+
+
+def fnv1a(features):
+    """32-bit FNV-1a of each string, computed column-wise over a byte matrix."""
+    if not features:
+        return np.zeros(0, dtype=np.uint32)
+    encoded = [f.encode('utf-8') for f in features]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    width = int(lengths.max())
+    matrix = np.frombuffer(b''.join(b.ljust(width, b'\0') for b in encoded), dtype=np.uint8)
+    matrix = matrix.reshape(len(encoded), width).astype(np.uint32)
+    h = np.full(len(encoded), FNV_OFFSET, dtype=np.uint32)
+    for col in range(width):
+        live = lengths > col
+        h = np.where(live, (h ^ matrix[:, col]) * FNV_PRIME, h)
+    return h
+
+
+class HashingEmbedder:
+    """SentenceTransformer-style encode() backed by signed feature hashing."""
+
+    def __init__(self, dimension=384, char_ngrams=(3, 4), word_bigram_weight=0.5, char_weight=0.25):
+        self.dimension = dimension
+        self.char_ngrams = char_ngrams
+        self.word_bigram_weight = word_bigram_weight
+        self.char_weight = char_weight
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def _features(self, text):
+        """Feature groups [(names, weight)] for one text."""
+        toks = words(text)
+        chars = []
+        for t in toks:
+            padded = f'<{t}>'
+            for n in self.char_ngrams:
+                chars.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return [
+            (['w:' + t for t in toks], 1.0),
+            ([f'b:{a} {b}' for a, b in zip(toks, toks[1:])], self.word_bigram_weight),
+            (['c:' + c for c in chars], self.char_weight),
+        ]
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        vocab = {}
+        rows, codes, weights = [], [], []
+        for row, text in enumerate(texts):
+            for names, weight in self._features(text):
+                codes.extend([vocab.setdefault(name, len(vocab)) for name in names])
+                rows.extend([row] * len(names))
+                weights.extend([weight] * len(names))
+
+        out = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        if codes:
+            # Hash each distinct feature once, then scatter-add all occurrences
+            h = fnv1a(list(vocab))[np.asarray(codes)]
+            index = (h % np.uint32(self.dimension)).astype(np.int64)
+            sign = np.where((h >> np.uint32(31)) & np.uint32(1), -1.0, 1.0)
+            flat = np.asarray(rows, dtype=np.int64) * self.dimension + index
+            out = np.bincount(flat, weights=sign * np.asarray(weights), minlength=out.size)
+            out = out.reshape(len(texts), self.dimension)
+            out = np.sign(out) * np.log1p(np.abs(out))
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            out = (out / norms).astype(np.float32)
+        return out[0] if single else out
+
+    def __call__(self, text):
+        # Lets the local Upstash stand-in use it as its /upsert-data, /query-data embedder
+        return self.encode(text)
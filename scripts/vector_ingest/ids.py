@@ -0,0 +1,50 @@
+"""
+Deterministic, content-derived chunk ids.
+
+Ids used to end in a running counter (exp-star-{chunk_id}), so inserting
+one achievement renumbered every later chunk, forced a full re-upsert and
+left the old ids behind as orphans. A stable id is
+
+  <family>-<path slug>-<sha1(path + content)[:10]>
+
+so it only changes when that chunk's own section path or text changes.
+"""
+
+import hashlib
+import re
+
+SLUG_MAX = 40
+
+
+def slug(text, max_len=SLUG_MAX):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(text)).strip('_')[:max_len]
+
+
+def stable_id(family, path, content):
+    digest = hashlib.sha1(f'{path}\n{content}'.encode('utf-8')).hexdigest()[:10]
+    path_slug = slug(path)
+    return f'{family}-{path_slug}-{digest}' if path_slug else f'{family}-{digest}'
+
+
+def dedupe_ids(chunks):
+    """Suffix repeated ids in place with -2, -3... (identical sections would collide)."""
+    seen = {}
+    for ch in chunks:
+        seen[ch['id']] = seen.get(ch['id'], 0) + 1
+        if seen[ch['id']] > 1:
+            ch['id'] = f"{ch['id']}-{seen[ch['id']]}"
+    return chunks
+
+
+def assign_stable_ids(chunks):
+    """
+    Replace counter-suffixed ids ('exp-star-7') in place with stable ids.
+
+    The family is the old id without its trailing counter and the path is
+    the chunk's source label; exact duplicates get a -2, -3... suffix.
+    """
+    for ch in chunks:
+        family = re.sub(r'-\d+$', '', ch['id'])
+        source = (ch.get('metadata') or {}).get('source') or ch.get('source', '')
+        ch['id'] = stable_id(family, source, ch['content'])
+    return dedupe_ids(chunks)
@@ -0,0 +1,267 @@
+"""
+Background ingestion jobs with progress events, status and cancellation.
+
+start_job() launches a detached supervisor process and returns right away
+with a job id. The supervisor runs the ingestion script with INGEST_EVENTS
+pointing at the job's event file (see progress.py), keeps its stdout in a
+log file, and records the final status when the script exits. State lives
+in .vector-cache/jobs/:
+
+  <id>.json          job record (status, pids, timestamps, return code)
+  <id>.events.jsonl  progress events, one JSON object per line
+  <id>.log           script output
+  <id>.cancel        cancellation request marker
+  active-<index>.lock  id of the running job for that index
+
+Only one job per index runs at a time: the lock file is created with
+O_EXCL, and a lock left behind by a dead supervisor is taken over.
+Status polls only read small local files, so callers can poll cheaply
+instead of holding a request open for the whole run.
+"""
+
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlparse
+
+from .manifest import CACHE_DIR
+
+JOBS_DIR = CACHE_DIR / 'jobs'
+FINISHED = ('succeeded', 'failed', 'cancelled', 'lost')
+
+
+class JobConflict(RuntimeError):
+    """Another job is already running against the same index."""
+
+    def __init__(self, job):
+        super().__init__(f"job {job['id']} is already running for this index")
+        self.job = job
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _index_slug(index_url):
+    host = urlparse(index_url).netloc or index_url or 'default'
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', host).strip('_') or 'default'
+
+
+def _alive(pid):
+    if not pid:
+        return False
+    if os.name == 'nt':
+        out = subprocess.run(['tasklist', '/FI', f'PID eq {pid}', '/NH'], capture_output=True, text=True).stdout
+        return str(pid) in out
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    def __init__(self, jobs_dir=JOBS_DIR):
+        self.dir = Path(jobs_dir)
+
+    def path(self, job_id, suffix='.json'):
+        if not re.fullmatch(r'[0-9a-f]{12}', job_id or ''):
+            raise KeyError(job_id)
+        return self.dir / f'{job_id}{suffix}'
+
+    def load(self, job_id):
+        path = self.path(job_id)
+        if not path.exists():
+            raise KeyError(job_id)
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, job):
+        path = self.path(job['id'])
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(job, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def update(self, job_id, **fields):
+        job = self.load(job_id)
+        job.update(fields)
+        self.save(job)
+        return job
+
+    def lock_path(self, index):
+        return self.dir / f'active-{index}.lock'
+
+    def acquire(self, index, job_id):
+        """Claim the index for job_id; raises JobConflict if a live job holds it."""
+        lock = self.lock_path(index)
+        for _ in range(2):
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                holder = self.active(index)
+                if holder is not None:
+                    raise JobConflict(holder)
+                continue  # stale lock was removed by active()
+            with os.fdopen(fd, 'w') as f:
+                f.write(job_id)
+            return
+        raise JobConflict({'id': lock.read_text().strip()})
+
+    def release(self, index, job_id):
+        lock = self.lock_path(index)
+        try:
+            if lock.read_text().strip() == job_id:
+                lock.unlink()
+        except OSError:
+            pass
+
+    def active(self, index):
+        """The running job for index, clearing a lock whose job is gone."""
+        lock = self.lock_path(index)
+        try:
+            job_id = lock.read_text().strip()
+        except OSError:
+            return None
+        try:
+            job = self.refresh(self.load(job_id))
+        except (KeyError, ValueError):
+            job = None
+        if job is None or job['status'] in FINISHED:
+            self.release(index, job_id)
+            return None
+        return job
+
+    def refresh(self, job):
+        """Mark a job whose supervisor died without recording an outcome."""
+        if job['status'] in FINISHED:
+            return job
+        if job['status'] == 'starting' and time.time() - job['created_ts'] < 30:
+            return job
+        if not _alive(job.get('supervisor_pid')):
+            cancelled = self.path(job['id'], '.cancel').exists()
+            job = self.update(job['id'], status='cancelled' if cancelled else 'lost', finished=_now())
+            self.release(job['index'], job['id'])
+        return job
+
+    def events(self, job_id, since=0):
+        path = self.path(job_id, '.events.jsonl')
+        if not path.exists():
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        out = []
+        for line in lines[since:]:
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                break  # line still being written
+        return out
+
+
+def start_job(script, args, index_url, runner, store=None):
+    """Create a job for script/args against index_url and launch its supervisor."""
+    store = store or JobStore()
+    store.dir.mkdir(parents=True, exist_ok=True)
+    job_id = uuid.uuid4().hex[:12]
+    index = _index_slug(index_url)
+    store.acquire(index, job_id)
+    job = {
+        'id': job_id, 'index': index, 'script': str(script), 'args': list(args),
+        'status': 'starting', 'created': _now(), 'created_ts': time.time(),
+        'supervisor_pid': None, 'pid': None, 'returncode': None,
+        'events': str(store.path(job_id, '.events.jsonl')), 'log': str(store.path(job_id, '.log')),
+    }
+    store.save(job)
+
+    kwargs = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
+    if os.name == 'nt':
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs['start_new_session'] = True
+    try:
+        proc = subprocess.Popen([sys.executable, str(runner), '_supervise', job_id], **kwargs)
+    except OSError:
+        store.release(index, job_id)
+        store.update(job_id, status='failed', finished=_now())
+        raise
+    # The supervisor records its own pid; writing it here could race with its first update
+    return dict(job, supervisor_pid=proc.pid)
+
+
+def supervise(job_id, store=None):
+    """Run the job's script to completion and record its outcome (supervisor process)."""
+    store = store or JobStore()
+    job = store.load(job_id)
+    cancel = store.path(job_id, '.cancel')
+    child = None
+
+    def on_term(signum, frame):
+        # Before the script starts this only marks the job; after, it stops the script
+        cancel.touch()
+        if child is not None:
+            child.terminate()
+
+    # The handler is in place before the pid is published, so cancel_job never kills an unguarded supervisor
+    signal.signal(signal.SIGTERM, on_term)
+    store.update(job_id, supervisor_pid=os.getpid())
+    returncode = None
+    if not cancel.exists():
+        env = dict(os.environ, INGEST_EVENTS=job['events'], PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+        with open(job['log'], 'w', encoding='utf-8') as log:
+            child = subprocess.Popen([sys.executable, job['script'], *job['args']], stdout=log,
+                                     stderr=subprocess.STDOUT, cwd=str(Path(job['script']).parent), env=env)
+            store.update(job_id, status='running', pid=child.pid, started=_now())
+            if cancel.exists():  # cancelled between the check above and Popen
+                child.terminate()
+            returncode = child.wait()
+
+    if cancel.exists():
+        status = 'cancelled'
+    else:
+        status = 'succeeded' if returncode == 0 else 'failed'
+    with open(job['events'], 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'ts': round(time.time(), 3), 'stage': 'job', 'status': status,
+                            'returncode': returncode}) + '\n')
+    job = store.update(job_id, status=status, returncode=returncode, finished=_now())
+    store.release(job['index'], job_id)
+    return job
+
+
+def job_status(job_id, since=0, store=None):
+    """Job record plus the events after `since` and the latest progress event."""
+    store = store or JobStore()
+    job = store.refresh(store.load(job_id))
+    events = store.events(job_id, 0)
+    return {
+        **{k: v for k, v in job.items() if k != 'created_ts'},
+        'progress': next((e for e in reversed(events) if e.get('stage') != 'job'), None),
+        'events': events[since:],
+        'next': len(events),
+    }
+
+
+def cancel_job(job_id, store=None):
+    """Ask a running job to stop: its script is terminated and the job ends 'cancelled'."""
+    store = store or JobStore()
+    job = store.refresh(store.load(job_id))
+    if job['status'] in FINISHED:
+        return job
+    store.path(job_id, '.cancel').touch()
+    for pid in (job.get('pid'), job.get('supervisor_pid')):
+        if _alive(pid):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+            break  # the supervisor notices the script exit and records the outcome
+    return store.load(job_id)
@@ -0,0 +1,128 @@
+"""
+Append-only, crash-safe journal of acknowledged upsert batches.
+
+The manifest is a snapshot rewritten as a whole, and --full runs ignore it,
+so a run killed half-way (e.g. by the 300 s timeout in run-enhanced-init.py)
+used to start over. The journal adds one fsync'd JSON line per acknowledged
+batch instead:
+
+  {"type": "run",   "run": id, "key": "model@dim", "total": n, "resumes": id|null, ...}
+  {"type": "batch", "run": id, "batch": i, "ids": [...], "hashes": [...], "status": 200, "response": "..."}
+  {"type": "done",  "run": id, "success": n, "failed": n}
+
+A torn last line from a crash is ignored. With --resume (or VECTOR_RESUME=1)
+the chunks acknowledged by the interrupted run - and by any interrupted runs
+it resumed - are skipped when their content hash still matches, so a restart
+only embeds and uploads what is left. A run that completes writes "done" and
+the journal is truncated, since its batches are then in the manifest.
+"""
+
+import json
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlparse
+
+from .manifest import CACHE_DIR, content_hash
+
+
+def resume_requested(flag=False):
+    """True when the caller passed --resume (flag) or VECTOR_RESUME is set."""
+    return flag or os.getenv('VECTOR_RESUME', '') in ('1', 'true', 'yes')
+
+
+def journal_path(index_url, cache_dir=CACHE_DIR, namespace=''):
+    """One journal per Upstash index (and namespace), next to its manifest."""
+    host = urlparse(index_url).netloc or index_url
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', host + (f'-{namespace}' if namespace else '')).strip('_') or 'default'
+    return Path(cache_dir) / f'journal-{slug}.jsonl'
+
+
+class IngestJournal:
+    def __init__(self, path, key):
+        self.path = Path(path)
+        self.key = key
+        self.run_id = None
+        self._fh = None
+
+    def _read(self):
+        records = []
+        if not self.path.exists():
+            return records
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # torn write from a crash
+        return records
+
+    def interrupted(self):
+        """(run ids, {id: hash}) acknowledged by the unfinished run chain for this key."""
+        runs, acked, chain = {}, {}, []
+        for rec in self._read():
+            if rec.get('type') == 'run':
+                runs[rec['run']] = dict(rec, done=False, acked={})
+            elif rec.get('type') == 'batch' and rec.get('run') in runs:
+                runs[rec['run']]['acked'].update(zip(rec['ids'], rec['hashes']))
+            elif rec.get('type') == 'done' and rec.get('run') in runs:
+                runs[rec['run']]['done'] = True
+        last = next((r for r in reversed(list(runs.values())) if r['key'] == self.key), None)
+        while last is not None and not last['done']:
+            chain.append(last['run'])
+            acked = {**last['acked'], **acked}
+            last = runs.get(last.get('resumes'))
+        return chain, acked
+
+    def start(self, total, resumes=None):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.run_id = uuid.uuid4().hex[:12]
+        torn = self.path.exists() and self.path.stat().st_size and not self.path.read_bytes().endswith(b'\n')
+        self._fh = open(self.path, 'a', encoding='utf-8')
+        if torn:
+            self._fh.write('\n')  # never glue the first record onto a torn line
+        self._append({'type': 'run', 'run': self.run_id, 'key': self.key, 'total': total, 'resumes': resumes,
+                      'pid': os.getpid(), 'started': datetime.now(timezone.utc).isoformat()})
+
+    def _append(self, record):
+        self._fh.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def record(self, result, chunks_by_id, ids=None):
+        """Append one acknowledged batch (ids defaults to the whole batch)."""
+        ids = result['ids'] if ids is None else list(ids)
+        if not ids:
+            return
+        self._append({'type': 'batch', 'run': self.run_id, 'batch': result['batch'], 'ids': ids,
+                      'hashes': [content_hash(chunks_by_id[cid]) for cid in ids],
+                      'status': result['status'], 'response': result.get('response', '')})
+
+    def finish(self, success, failed):
+        """Close the run; a fully successful run truncates the journal."""
+        self._append({'type': 'done', 'run': self.run_id, 'success': success, 'failed': failed})
+        self._fh.close()
+        self._fh = None
+        if failed == 0:
+            open(self.path, 'w').close()
+
+
+def resume_filter(journal, chunks, resume):
+    """
+    Split chunks into (todo, done, resumes) against the journal.
+
+    done are chunks an interrupted run already uploaded with identical content;
+    they are only skipped when resume is set, otherwise a hint is printed.
+    """
+    chain, acked = journal.interrupted()
+    if not chain:
+        return chunks, [], None
+    done = [ch for ch in chunks if acked.get(ch['id']) == content_hash(ch)]
+    if not resume:
+        print(f"ℹ️ An interrupted run acknowledged {len(acked)} vectors; pass --resume to skip them")
+        return chunks, [], None
+    todo = [ch for ch in chunks if acked.get(ch['id']) != content_hash(ch)]
+    print(f"⏩ Resuming run {chain[0]}: {len(done)} chunks already acknowledged, {len(todo)} left")
+    return todo, done, chain[0]
@@ -0,0 +1,602 @@
+"""
+Local stand-in for the Upstash Vector REST API.
+
+Implements the subset used by the init scripts and lib/vectordb.ts so
+ingestion can be benchmarked and regression-tested without network access:
+
+  GET|POST /info                       index info (dimension, vector count, namespaces)
+  POST     /upsert[/ns]                one object, an array, or {"vectors": [...]}
+  POST     /query[/ns]                 vector query with topK, filter, include* flags
+  POST     /query-data, /upsert-data   only when an embedder is configured
+  POST     /fetch[/ns]                 fetch by ids
+  POST     /range[/ns]                 cursor-paginated listing
+  DELETE|POST /delete[/ns]             ids list, {"ids": [...]} or {"prefix": "..."}
+  GET      /list-namespaces, DELETE /delete-namespace/<ns>, POST|DELETE /reset[/ns]
+  GET      /stats                      request/throttle counters (local only)
+
+Metadata filters use the Upstash filter syntax: =, !=, <, <=, >, >=, GLOB,
+NOT GLOB, IN (...), NOT IN (...), CONTAINS, NOT CONTAINS, AND, OR and
+parentheses.
+
+Latency and failures can be injected to exercise retry and backoff logic.
+
+Usage:
+  python scripts/local-vector-server.py --port 8787 --dimension 1024 \\
+      --latency-ms 40 --throttle-rate 0.05 --error-rate 0.02
+  UPSTASH_VECTOR_REST_URL=http://127.0.0.1:8787 UPSTASH_VECTOR_REST_TOKEN=local \\
+      python scripts/init-vector-enhanced.py
+"""
+
+import argparse
+import fnmatch
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+import numpy as np
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# -- metadata filter ---------------------------------------------------------
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<str>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<num>-?\d+(?:\.\d+)?)
+      | (?P<op><=|>=|!=|=|<|>|\(|\)|,)
+      | (?P<word>[A-Za-z_][A-Za-z0-9_.\[\]]*)
+    )""", re.X)
+
+
+def _tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m or m.end() == pos:
+            raise ApiError(400, f'Invalid filter near: {text[pos:pos + 20]}')
+        pos = m.end()
+        if m.group('str') is not None:
+            tokens.append(('str', re.sub(r'\\(.)', r'\1', m.group('str')[1:-1])))
+        elif m.group('num') is not None:
+            tokens.append(('num', float(m.group('num'))))
+        elif m.group('op') is not None:
+            tokens.append(('op', m.group('op')))
+        else:
+            word = m.group('word')
+            upper = word.upper()
+            if upper in ('AND', 'OR', 'NOT', 'IN', 'GLOB', 'CONTAINS'):
+                tokens.append(('kw', upper))
+            elif upper in ('TRUE', 'FALSE'):
+                tokens.append(('bool', upper == 'TRUE'))
+            else:
+                tokens.append(('field', word))
+    return tokens
+
+
+def parse_filter(text):
+    """Compile an Upstash filter string into a predicate over metadata dicts."""
+    if not text or not text.strip():
+        return lambda meta: True
+    tokens = _tokenize(text)
+    pos = 0
+
+    def peek(kind=None, value=None):
+        if pos >= len(tokens):
+            return False
+        k, v = tokens[pos]
+        return (kind is None or k == kind) and (value is None or v == value)
+
+    def take():
+        nonlocal pos
+        tok = tokens[pos]
+        pos += 1
+        return tok
+
+    def value():
+        if pos >= len(tokens) or tokens[pos][0] not in ('str', 'num', 'bool'):
+            raise ApiError(400, 'Invalid filter: expected a literal value')
+        return take()[1]
+
+    def lookup(meta, field):
+        cur = meta
+        for part in re.findall(r'[^.\[\]]+', field):
+            if isinstance(cur, list) and part.isdigit():
+                idx = int(part)
+                cur = cur[idx] if idx < len(cur) else None
+            elif isinstance(cur, dict):
+                cur = cur.get(part)
+            else:
+                return None
+        return cur
+
+    def comparison():
+        if peek('op', '('):
+            take()
+            node = disjunction()
+            if not peek('op', ')'):
+                raise ApiError(400, 'Invalid filter: missing )')
+            take()
+            return node
+        if not peek('field'):
+            raise ApiError(400, 'Invalid filter: expected a field name')
+        field = take()[1]
+        negate = False
+        if peek('kw', 'NOT'):
+            take()
+            negate = True
+        if peek('op') and tokens[pos][1] in ('=', '!=', '<', '<=', '>', '>='):
+            op = take()[1]
+            rhs = value()
+            ops = {
+                '=': lambda a: a == rhs, '!=': lambda a: a != rhs,
+                '<': lambda a: a is not None and a < rhs, '<=': lambda a: a is not None and a <= rhs,
+                '>': lambda a: a is not None and a > rhs, '>=': lambda a: a is not None and a >= rhs,
+            }
+            test = ops[op]
+
+            def pred(meta):
+                try:
+                    return test(lookup(meta, field))
+                except TypeError:
+                    return False
+        elif peek('kw', 'GLOB'):
+            take()
+            pattern = value()
+
+            def pred(meta):
+                v = lookup(meta, field)
+                return isinstance(v, str) and fnmatch.fnmatchcase(v, pattern)
+        elif peek('kw', 'IN'):
+            take()
+            if not peek('op', '('):
+                raise ApiError(400, 'Invalid filter: IN expects (...)')
+            take()
+            options = [value()]
+            while peek('op', ','):
+                take()
+                options.append(value())
+            if not peek('op', ')'):
+                raise ApiError(400, 'Invalid filter: missing )')
+            take()
+
+            def pred(meta):
+                return lookup(meta, field) in options
+        elif peek('kw', 'CONTAINS'):
+            take()
+            needle = value()
+
+            def pred(meta):
+                v = lookup(meta, field)
+                return isinstance(v, list) and needle in v
+        else:
+            raise ApiError(400, f'Invalid filter: unsupported operator after {field}')
+        return (lambda meta: not pred(meta)) if negate else pred
+
+    def conjunction():
+        node = comparison()
+        while peek('kw', 'AND'):
+            take()
+            left, right = node, comparison()
+            node = lambda meta, a=left, b=right: a(meta) and b(meta)
+        return node
+
+    def disjunction():
+        node = conjunction()
+        while peek('kw', 'OR'):
+            take()
+            left, right = node, conjunction()
+            node = lambda meta, a=left, b=right: a(meta) or b(meta)
+        return node
+
+    predicate = disjunction()
+    if pos != len(tokens):
+        raise ApiError(400, 'Invalid filter: unexpected trailing tokens')
+    return predicate
+
+
+# -- storage -----------------------------------------------------------------
+
+class Namespace:
+    def __init__(self):
+        self.ids = []
+        self.rows = {}        # id -> position in ids
+        self.vectors = []
+        self.metadata = []
+        self.data = []
+        self._matrix = None
+
+    def upsert(self, vid, vector, metadata, data):
+        if vid in self.rows:
+            i = self.rows[vid]
+            self.vectors[i], self.metadata[i], self.data[i] = vector, metadata, data
+        else:
+            self.rows[vid] = len(self.ids)
+            self.ids.append(vid)
+            self.vectors.append(vector)
+            self.metadata.append(metadata)
+            self.data.append(data)
+        self._matrix = None
+
+    def delete(self, ids):
+        gone = [vid for vid in ids if vid in self.rows]
+        if gone:
+            drop = set(gone)
+            keep = [i for i, vid in enumerate(self.ids) if vid not in drop]
+            self.ids = [self.ids[i] for i in keep]
+            self.vectors = [self.vectors[i] for i in keep]
+            self.metadata = [self.metadata[i] for i in keep]
+            self.data = [self.data[i] for i in keep]
+            self.rows = {vid: i for i, vid in enumerate(self.ids)}
+            self._matrix = None
+        return len(gone)
+
+    def matrix(self):
+        if self._matrix is None:
+            if self.vectors:
+                m = np.asarray(self.vectors, dtype=np.float32)
+                norms = np.linalg.norm(m, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                self._matrix = m / norms
+            else:
+                self._matrix = np.zeros((0, 0), dtype=np.float32)
+        return self._matrix
+
+
+class LocalVectorIndex:
+    """In-memory multi-namespace cosine index with Upstash-shaped responses."""
+
+    def __init__(self, dimension=1024, embedder=None):
+        self.dimension = dimension
+        self.embedder = embedder
+        self.namespaces = {'': Namespace()}
+        self.lock = threading.RLock()
+
+    def ns(self, name, create=False):
+        if name not in self.namespaces:
+            if not create:
+                return Namespace()
+            self.namespaces[name] = Namespace()
+        return self.namespaces[name]
+
+    def _vector(self, item):
+        vector = item.get('vector')
+        if vector is None and item.get('data') is not None:
+            vector = self.embed(item['data'])
+        if vector is None:
+            raise ApiError(400, 'Vector or data is required')
+        if len(vector) != self.dimension:
+            raise ApiError(400, f'Invalid vector dimension: {len(vector)}, expected: {self.dimension}')
+        return [float(x) for x in vector]
+
+    def embed(self, text):
+        if self.embedder is None:
+            raise ApiError(400, 'Embedding data for this index is not allowed. The index must be created with an embedding model to use it.')
+        return list(self.embedder(text))
+
+    def upsert(self, namespace, body):
+        if isinstance(body, dict) and 'vectors' in body:
+            body = body['vectors']
+        items = body if isinstance(body, list) else [body]
+        parsed = []
+        for item in items:
+            if isinstance(item, list):  # [id, vector, metadata] tuple form
+                item = {'id': item[0], 'vector': item[1], 'metadata': item[2] if len(item) > 2 else None}
+            if not isinstance(item, dict) or item.get('id') in (None, ''):
+                raise ApiError(400, 'Each vector needs an id')
+            parsed.append((str(item['id']), self._vector(item), item.get('metadata'), item.get('data')))
+        with self.lock:
+            ns = self.ns(namespace, create=True)
+            for vid, vector, metadata, data in parsed:
+                ns.upsert(vid, vector, metadata, data)
+        return 'Success'
+
+    def _row(self, ns, i, score=None, include_metadata=False, include_vectors=False, include_data=False):
+        row = {'id': ns.ids[i]}
+        if score is not None:
+            row['score'] = score
+        if include_vectors:
+            row['vector'] = ns.vectors[i]
+        if include_metadata and ns.metadata[i] is not None:
+            row['metadata'] = ns.metadata[i]
+        if include_data and ns.data[i] is not None:
+            row['data'] = ns.data[i]
+        return row
+
+    def query(self, namespace, body):
+        if 'data' in body and 'vector' not in body:
+            body = dict(body, vector=self.embed(body['data']))
+        vector = body.get('vector')
+        if vector is None or len(vector) != self.dimension:
+            raise ApiError(400, f'Invalid vector dimension, expected: {self.dimension}')
+        top_k = int(body.get('topK', 10))
+        predicate = parse_filter(body.get('filter', ''))
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        with self.lock:
+            ns = self.ns(namespace)
+            if not ns.ids:
+                return []
+            scores = ns.matrix() @ q
+            order = np.argsort(-scores, kind='stable')
+            out = []
+            for i in order:
+                if predicate(ns.metadata[i] or {}):
+                    # Upstash reports cosine as (1 + cos) / 2
+                    out.append(self._row(ns, i, float((1 + scores[i]) / 2),
+                                         body.get('includeMetadata', False),
+                                         body.get('includeVectors', False),
+                                         body.get('includeData', False)))
+                    if len(out) >= top_k:
+                        break
+            return out
+
+    def fetch(self, namespace, body):
+        ids = body.get('ids', []) if isinstance(body, dict) else body
+        with self.lock:
+            ns = self.ns(namespace)
+            return [
+                self._row(ns, ns.rows[vid], None, body.get('includeMetadata', False),
+                          body.get('includeVectors', False), body.get('includeData', False))
+                if vid in ns.rows else None
+                for vid in ids
+            ]
+
+    def range(self, namespace, body):
+        cursor = int(body.get('cursor') or 0)
+        limit = int(body.get('limit', 100))
+        prefix = body.get('prefix')
+        with self.lock:
+            ns = self.ns(namespace)
+            positions = [i for i, vid in enumerate(ns.ids) if not prefix or vid.startswith(prefix)]
+            page = positions[cursor:cursor + limit]
+            vectors = [
+                self._row(ns, i, None, body.get('includeMetadata', False),
+                          body.get('includeVectors', False), body.get('includeData', False))
+                for i in page
+            ]
+            end = cursor + len(page)
+            return {'nextCursor': str(end) if end < len(positions) else '', 'vectors': vectors}
+
+    def delete(self, namespace, body):
+        with self.lock:
+            ns = self.ns(namespace)
+            if isinstance(body, dict) and body.get('prefix'):
+                ids = [vid for vid in ns.ids if vid.startswith(body['prefix'])]
+            elif isinstance(body, dict):
+                ids = body.get('ids', [])
+            elif isinstance(body, list):
+                ids = body
+            else:
+                ids = [body]
+            return {'deleted': ns.delete([str(v) for v in ids])}
+
+    def reset(self, namespace=None):
+        with self.lock:
+            if namespace is None:
+                self.namespaces = {'': Namespace()}
+            else:
+                self.namespaces[namespace] = Namespace()
+        return 'Success'
+
+    def info(self):
+        with self.lock:
+            count = sum(len(ns.ids) for ns in self.namespaces.values())
+            return {
+                'vectorCount': count,
+                'pendingVectorCount': 0,
+                'indexSize': count * self.dimension * 4,
+                'dimension': self.dimension,
+                'similarityFunction': 'COSINE',
+                'namespaces': {
+                    name: {'vectorCount': len(ns.ids), 'pendingVectorCount': 0}
+                    for name, ns in self.namespaces.items()
+                },
+            }
+
+
+# -- HTTP layer --------------------------------------------------------------
+
+class FaultInjector:
+    """Latency, throttling and error injection shared by all handler threads."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_status=503,
+                 throttle_rate=0.0, retry_after=1.0, poison_prefix=None, max_batch=None, seed=None):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.poison_prefix = poison_prefix
+        self.max_batch = max_batch
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counters = {'requests': 0, 'throttled': 0, 'errors': 0, 'upserted': 0, 'bytes': 0}
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.counters[key] += n
+
+    def roll(self):
+        with self.lock:
+            return self.random.random()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    index = None
+    token = None
+    faults = None
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        self.faults.count('bytes', len(raw))
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip':
+            raw = gzip.decompress(raw)
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise ApiError(400, 'Invalid JSON body')
+
+    def _handle(self, method):
+        faults = self.faults
+        faults.count('requests')
+        path = urlparse(self.path).path.rstrip('/') or '/'
+        parts = [unquote(p) for p in path.strip('/').split('/')]
+        route, namespace = parts[0], '/'.join(parts[1:])
+        try:
+            if self.token and self.headers.get('Authorization') != f'Bearer {self.token}':
+                raise ApiError(401, 'Unauthorized')
+            body = self._body() if method in ('POST', 'DELETE') else {}
+
+            if route == 'stats':
+                return self._reply(200, {'result': dict(faults.counters)})
+
+            delay = faults.latency + (faults.roll() * faults.jitter if faults.jitter else 0.0)
+            if delay:
+                time.sleep(delay)
+            if faults.throttle_rate and faults.roll() < faults.throttle_rate:
+                faults.count('throttled')
+                return self._reply(429, {'error': 'Too many requests', 'status': 429},
+                                   {'Retry-After': f'{faults.retry_after:g}'})
+            if faults.error_rate and faults.roll() < faults.error_rate:
+                faults.count('errors')
+                return self._reply(faults.error_status, {'error': 'Injected failure', 'status': faults.error_status})
+
+            index = self.index
+            if route == 'info':
+                result = index.info()
+            elif route in ('upsert', 'upsert-data'):
+                items = body.get('vectors', body) if isinstance(body, dict) else body
+                items = items if isinstance(items, list) else [items]
+                if faults.max_batch and len(items) > faults.max_batch:
+                    raise ApiError(400, f'Batch too large: {len(items)} > {faults.max_batch}')
+                if faults.poison_prefix:
+                    for item in items:
+                        vid = str(item[0] if isinstance(item, list) else item.get('id', ''))
+                        if vid.startswith(faults.poison_prefix):
+                            raise ApiError(400, f'Invalid vector: {vid}')
+                result = index.upsert(namespace, body)
+                faults.count('upserted', len(items))
+            elif route in ('query', 'query-data'):
+                if isinstance(body, list):
+                    result = [index.query(namespace, q) for q in body]
+                else:
+                    result = index.query(namespace, body)
+            elif route == 'fetch':
+                result = index.fetch(namespace, body)
+            elif route == 'range':
+                result = index.range(namespace, body)
+            elif route == 'delete':
+                result = index.delete(namespace, body)
+            elif route == 'reset':
+                result = index.reset(namespace if namespace else None)
+            elif route == 'list-namespaces':
+                result = sorted(index.namespaces)
+            elif route == 'delete-namespace':
+                with index.lock:
+                    if namespace not in index.namespaces or not namespace:
+                        raise ApiError(404, f'Namespace not found: {namespace}')
+                    del index.namespaces[namespace]
+                result = 'Success'
+            else:
+                raise ApiError(404, f'Unknown endpoint: /{route}')
+            self._reply(200, {'result': result})
+        except ApiError as e:
+            self._reply(e.status, {'error': str(e), 'status': e.status})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+def make_server(host='127.0.0.1', port=0, dimension=1024, token=None, embedder=None, **fault_options):
+    """Build (but do not start) a server; port 0 picks a free port."""
+    handler = type('LocalUpstashHandler', (Handler,), {
+        'index': LocalVectorIndex(dimension, embedder),
+        'token': token,
+        'faults': FaultInjector(**fault_options),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.index = handler.index
+    server.faults = handler.faults
+    server.url = f'http://{host}:{server.server_address[1]}'
+    return server
+
+
+def start_in_background(**options):
+    """Start a server on a daemon thread; returns it (see server.url)."""
+    server = make_server(**options)
+    threading.Thread(target=server.serve_forever, name='local-upstash', daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local Upstash Vector REST stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--dimension', type=int, default=1024)
+    parser.add_argument('--token', default=None, help='require this bearer token')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of requests answered 429')
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--poison-prefix', default=None, help='reject upserts containing ids with this prefix')
+    parser.add_argument('--max-batch', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--hashing-embedder', action='store_true',
+                        help='serve /upsert-data and /query-data with the feature-hashing embedder')
+    args = parser.parse_args(argv)
+
+    embedder = None
+    if args.hashing_embedder:
+        from .hashing import HashingEmbedder
+        embedder = HashingEmbedder(args.dimension)
+
+    server = make_server(
+        host=args.host, port=args.port, dimension=args.dimension, token=args.token, embedder=embedder,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        error_status=args.error_status, throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+        poison_prefix=args.poison_prefix, max_batch=args.max_batch, seed=args.seed,
+    )
+    print(f"🧪 Local Upstash Vector stand-in on {server.url} (dimension {args.dimension})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('\n👋 Stopped')
+    return 0
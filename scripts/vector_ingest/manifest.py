@@ -0,0 +1,82 @@
+"""
+Local content-hash manifest for incremental re-indexing.
+
+Records, per target index and per (model, dimension) pair, the hash of every
+chunk that was successfully upserted. On the next run only chunks whose id is
+new or whose content/metadata hash changed need to be embedded and uploaded.
+
+The manifest lives in .vector-cache/ at the repository root (git-ignored).
+Pass --full on the command line or set VECTOR_FULL_REINDEX=1 to ignore it.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from urllib.parse import urlparse
+
+MANIFEST_VERSION = 1
+CACHE_DIR = Path(__file__).resolve().parent.parent.parent / '.vector-cache'
+
+
+def full_reindex_requested(flag=False):
+    """True when the caller asked to bypass the manifest (--full passed as flag, or VECTOR_FULL_REINDEX)."""
+    return flag or os.getenv('VECTOR_FULL_REINDEX', '') in ('1', 'true', 'yes')
+
+
+def content_hash(chunk):
+    """Stable SHA-256 over every chunk field except its id (text and metadata)."""
+    body = {k: v for k, v in chunk.items() if k != 'id'}
+    payload = json.dumps(body, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def manifest_path(index_url, cache_dir=CACHE_DIR, namespace=''):
+    """One manifest file per Upstash index (and namespace), named after its host."""
+    host = urlparse(index_url).netloc or index_url
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', host + (f'-{namespace}' if namespace else '')).strip('_') or 'default'
+    return Path(cache_dir) / f'manifest-{slug}.json'
+
+
+class ChunkManifest:
+    """id -> content hash map for one index, model and target dimension."""
+
+    def __init__(self, path, model_name, dimension, enabled=True):
+        self.path = Path(path)
+        self.key = f'{model_name}@{int(dimension)}'
+        self.enabled = enabled
+        self._data = {'version': MANIFEST_VERSION, 'entries': {}}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self._data = data
+            except (OSError, ValueError):
+                print(f'⚠️ Ignoring unreadable manifest: {self.path}')
+        self.entries = self._data['entries'].setdefault(self.key, {})
+
+    def is_current(self, chunk):
+        return self.enabled and self.entries.get(chunk['id']) == content_hash(chunk)
+
+    def pending(self, chunks):
+        """Chunks that are new or changed since the last successful upload."""
+        return [ch for ch in chunks if not self.is_current(ch)]
+
+    def mark(self, chunks):
+        """Record chunks as uploaded with their current content hash."""
+        for ch in chunks:
+            self.entries[ch['id']] = content_hash(ch)
+
+    def forget(self, ids):
+        """Drop entries for ids that were deleted from the index."""
+        for chunk_id in ids:
+            self.entries.pop(chunk_id, None)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp, self.path)
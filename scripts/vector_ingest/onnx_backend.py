@@ -0,0 +1,150 @@
+"""
+Optional int8 ONNX Runtime backend for SentenceTransformer models on CPU.
+
+The first use of a model exports its transformer to ONNX, applies dynamic
+int8 quantization to the weights and caches the result under
+.vector-cache/onnx/<model>/ together with the tokenizer and the pooling
+settings. Later runs load only the quantized graph and the tokenizer (no
+torch import), and OnnxEncoder.encode() reproduces SentenceTransformer's
+pooling and optional normalisation, so it drops into encode_batched().
+
+Environment:
+  EMBEDDING_BACKEND      'torch' (default) or 'onnx'
+  ONNX_THREADS           intra-op threads for ONNX Runtime (default: all cores)
+
+Requirements (export):  pip install sentence-transformers onnx onnxruntime
+Requirements (runtime): pip install onnxruntime transformers numpy
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+from .manifest import CACHE_DIR
+
+BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch').lower()
+ARTIFACT_VERSION = 1
+OPSET = 14
+
+
+def artifact_dir(model_name, cache_dir=None):
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name).strip('_')
+    return Path(cache_dir or CACHE_DIR / 'onnx') / slug
+
+
+def cache_key(model_name, backend=BACKEND):
+    """Embedding-cache namespace, so int8 vectors never mix with fp32 ones."""
+    return f'{model_name}+onnx-int8' if backend == 'onnx' else model_name
+
+
+def export_quantized(model_name, out_dir):
+    """Export `model_name` to an int8 ONNX graph in out_dir; return its meta dict."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    print(f"📦 Exporting {model_name} to ONNX (int8) - one-off, cached afterwards")
+    st = SentenceTransformer(model_name, device='cpu')
+    transformer = st[0].auto_model.eval()
+    tokenizer = st.tokenizer
+    pooling = next((m for m in st if type(m).__name__ == 'Pooling'), None)
+    pooling_mode = pooling.get_pooling_mode_str() if pooling is not None else 'mean'
+    normalize = any(type(m).__name__ == 'Normalize' for m in st)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = out_dir / 'model-fp32.onnx'
+    int8_path = out_dir / 'model-int8.onnx'
+
+    sample = tokenizer(['export sample'], return_tensors='pt')
+    input_names = [n for n in ('input_ids', 'attention_mask', 'token_type_ids') if n in sample]
+    dynamic = {n: {0: 'batch', 1: 'sequence'} for n in input_names}
+    dynamic['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, tuple(sample[n] for n in input_names), str(fp32_path),
+            input_names=input_names, output_names=['last_hidden_state'],
+            dynamic_axes=dynamic, opset_version=OPSET, do_constant_folding=True,
+        )
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    fp32_path.unlink()
+    tokenizer.save_pretrained(str(out_dir))
+
+    meta = {
+        'version': ARTIFACT_VERSION,
+        'model': model_name,
+        'dimension': int(st.get_sentence_embedding_dimension()),
+        'max_seq_length': int(st.max_seq_length),
+        'pooling': pooling_mode,
+        'normalize': normalize,
+        'inputs': input_names,
+    }
+    tmp = out_dir / 'meta.json.tmp'
+    tmp.write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    os.replace(tmp, out_dir / 'meta.json')
+    print(f"✅ Cached int8 model at {int8_path} ({int8_path.stat().st_size / 1e6:.0f} MB)")
+    return meta
+
+
+class OnnxEncoder:
+    """SentenceTransformer-compatible encode() backed by a quantized ONNX graph."""
+
+    def __init__(self, model_name, cache_dir=None, threads=None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.dir = artifact_dir(model_name, cache_dir)
+        meta_path = self.dir / 'meta.json'
+        meta = json.loads(meta_path.read_text(encoding='utf-8')) if meta_path.exists() else None
+        if not meta or meta.get('version') != ARTIFACT_VERSION:
+            meta = export_quantized(model_name, self.dir)
+        self.meta = meta
+
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.dir))
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads or int(os.getenv('ONNX_THREADS', '0'))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(self.dir / 'model-int8.onnx'), options, providers=['CPUExecutionProvider'])
+
+    def get_sentence_embedding_dimension(self):
+        return self.meta['dimension']
+
+    def _pool(self, hidden, mask):
+        if self.meta['pooling'] == 'cls':
+            pooled = hidden[:, 0]
+        elif self.meta['pooling'] == 'max':
+            pooled = np.where(mask[..., None] > 0, hidden, -1e9).max(axis=1)
+        else:
+            weights = mask[..., None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.meta['normalize']:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        out = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True,
+                max_length=self.meta['max_seq_length'], return_tensors='np')
+            feeds = {name: tokens[name].astype(np.int64) for name in self.meta['inputs']}
+            hidden = self.session.run(None, feeds)[0]
+            out.append(self._pool(hidden, tokens['attention_mask']))
+        emb = np.concatenate(out) if out else np.zeros((0, self.meta['dimension']), dtype=np.float32)
+        return emb[0] if single else emb
+
+
+def load_backend(model_name, load_torch):
+    """Return an OnnxEncoder when EMBEDDING_BACKEND=onnx, else load_torch()."""
+    if BACKEND == 'onnx':
+        print(f"⚡ Using int8 ONNX Runtime backend for {model_name}")
+        return OnnxEncoder(model_name)
+    return load_torch()
@@ -0,0 +1,130 @@
+"""
+Overlapped, staged ingestion pipeline.
+
+Each stage (e.g. embed -> project -> serialize -> upload) runs in its own
+thread and hands windows of chunks to the next stage through a bounded
+queue. While the upload stage waits on the network the embed stage is
+already encoding the next window, so end-to-end time approaches that of the
+slowest stage instead of the sum of all of them. The bounded queues keep
+memory flat: a fast stage blocks once it is `queue_size` windows ahead.
+
+Torch inference, NumPy matmuls and socket I/O all release the GIL, so plain
+threads are enough to overlap them.
+
+Usage:
+  pipe = StagedPipeline([('embed', embed), ('project', project), ('upload', upload)])
+  outputs = pipe.run(windows(chunks, 64))
+  pipe.print_stats()
+"""
+
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+def windows(items, size):
+    """Yield consecutive lists of at most `size` items from any iterable."""
+    window = []
+    for item in items:
+        window.append(item)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+class StagedPipeline:
+    """Linear chain of single-threaded stages joined by bounded queues."""
+
+    def __init__(self, stages, queue_size=2, verbose=True):
+        self.names = [name for name, _ in stages]
+        self.fns = [fn for _, fn in stages]
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.stats = {name: {'windows': 0, 'busy': 0.0, 'max_depth': 0} for name in self.names}
+        self.verbose = verbose
+        self._error = None
+        self._abort = threading.Event()
+
+    def depths(self):
+        """Current number of windows waiting in front of each stage."""
+        return {name: q.qsize() for name, q in zip(self.names, self.queues)}
+
+    def _put(self, q, item):
+        while not self._abort.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _stage(self, index, outputs):
+        name, fn = self.names[index], self.fns[index]
+        inbox = self.queues[index]
+        outbox = self.queues[index + 1] if index + 1 < len(self.queues) else None
+        stats = self.stats[name]
+        while True:
+            stats['max_depth'] = max(stats['max_depth'], inbox.qsize())
+            try:
+                item = inbox.get(timeout=0.1)
+            except queue.Empty:
+                if self._abort.is_set():
+                    return
+                continue
+            if item is _DONE or self._abort.is_set():
+                if outbox is not None:
+                    self._put(outbox, _DONE)
+                return
+            started = time.perf_counter()
+            try:
+                result = fn(item)
+            except BaseException as e:
+                self._error = self._error or e
+                self._abort.set()
+                if outbox is not None:
+                    self._put(outbox, _DONE)
+                return
+            stats['busy'] += time.perf_counter() - started
+            stats['windows'] += 1
+            if outbox is not None:
+                if not self._put(outbox, result):
+                    return
+            else:
+                outputs.append(result)
+                if self.verbose:
+                    depth = ' '.join(f"{n}={d}" for n, d in self.depths().items())
+                    print(f"   🧵 window {stats['windows']} done | queued: {depth}")
+
+    def run(self, source):
+        """Feed windows from `source` through every stage; return last-stage outputs in order."""
+        outputs = []
+        self._started = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._stage, args=(i, outputs), name=f'ingest-{name}', daemon=True)
+            for i, name in enumerate(self.names)
+        ]
+        for t in threads:
+            t.start()
+        try:
+            for window in source:
+                if not self._put(self.queues[0], window):
+                    break
+        finally:
+            self._put(self.queues[0], _DONE)
+            for t in threads:
+                t.join()
+        self.elapsed = time.perf_counter() - self._started
+        if self._error is not None:
+            raise self._error
+        return outputs
+
+    def print_stats(self):
+        total = max(getattr(self, 'elapsed', 0.0), 1e-9)
+        print(f"\n🧵 Pipeline stages ({total:.1f}s wall clock):")
+        for name in self.names:
+            s = self.stats[name]
+            print(f"   {name:<10} {s['windows']} windows, busy {s['busy']:.1f}s "
+                  f"({100 * s['busy'] / total:.0f}%), max queue {s['max_depth']}")
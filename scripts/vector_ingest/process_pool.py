@@ -0,0 +1,137 @@
+"""
+Multi-process embedding for large corpora (scraped jobs, transcripts).
+
+A single model.encode() call keeps most cores idle once tokenization and
+pooling dominate. ProcessEmbedder starts a pool of spawn-ed workers, each of
+which loads the model once and limits itself to cores/workers intra-op
+threads. encode() length-sorts the texts, shards them into batches, and
+workers write their rows straight into one shared-memory float32 matrix at
+the rows' original positions, so only row indices cross the process boundary
+on the way back and the output order is deterministic whatever order the
+shards finish in.
+
+It exposes the SentenceTransformer surface used by encode_batched(), so it
+can be returned from any script's load_model().
+
+Environment:
+  EMBEDDING_WORKERS   number of worker processes (default 1 = in-process)
+"""
+
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .embedding import DEFAULT_BATCH_SIZE, token_lengths
+
+DEFAULT_WORKERS = int(os.getenv('EMBEDDING_WORKERS', '1'))
+
+_worker_model = None
+
+
+def _init_worker(model_name, threads):
+    global _worker_model
+    os.environ.setdefault('OMP_NUM_THREADS', str(threads))
+    os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except Exception:
+        pass
+    from .onnx_backend import load_backend
+
+    def load_torch():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name, device='cpu')
+
+    _worker_model = load_backend(model_name, load_torch)
+
+
+def _worker_dimension():
+    from .embedding import model_dimension
+    return model_dimension(_worker_model)
+
+
+def _encode_shard(shm_name, shape, rows, texts):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        emb = _worker_model.encode(texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False)
+        out[rows] = np.asarray(emb, dtype=np.float32)
+        del out
+    finally:
+        shm.close()
+    return len(rows)
+
+
+class ProcessEmbedder:
+    """Pool of worker processes, one model copy each, sharing an output matrix."""
+
+    handles_batching = True
+
+    def __init__(self, model_name, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.model_name = model_name
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.batch_size = batch_size
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        print(f"🧑‍🏭 Starting {self.workers} embedding workers ({threads} threads each) for {model_name}")
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=mp.get_context('spawn'),
+            initializer=_init_worker, initargs=(model_name, threads),
+        )
+        self._dim = None
+        self.tokenizer = None
+
+    def get_sentence_embedding_dimension(self):
+        if self._dim is None:
+            self._dim = self.pool.submit(_worker_dimension).result()
+        return self._dim
+
+    def encode(self, texts, show_progress_bar=False, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        dim = self.get_sentence_embedding_dimension()
+        if not texts:
+            return np.zeros((0, dim), dtype=np.float32)
+
+        # Longest shards first so the tail of the run is short batches; small
+        # inputs are still split so every worker gets a share
+        order = np.argsort(token_lengths(self, texts), kind='stable')[::-1]
+        shard = max(1, min(self.batch_size, -(-len(texts) // self.workers)))
+        shape = (len(texts), dim)
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 4)
+        try:
+            futures = []
+            for start in range(0, len(texts), shard):
+                rows = order[start:start + shard]
+                futures.append(self.pool.submit(
+                    _encode_shard, shm.name, shape, rows, [texts[i] for i in rows]))
+            done = 0
+            for future in futures:
+                done += future.result()
+                if show_progress_bar:
+                    print(f"   🧮 Encoded {done}/{len(texts)} chunks")
+            out = np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+        return out[0] if single else out
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_parallel(model_name, load_local, workers=None):
+    """Return a ProcessEmbedder when more than one worker is requested, else load_local()."""
+    workers = workers or DEFAULT_WORKERS
+    if workers > 1:
+        return ProcessEmbedder(model_name, workers=workers)
+    return load_local()
@@ -0,0 +1,121 @@
+"""
+Fine-grained chunking of digitaltwin.json for the enhanced init script.
+
+Every company gets an overview, one chunk per STAR achievement, a leadership
+chunk and a metrics chunk; skills and projects get one chunk each. Ids are
+content-derived (see ids.py), so editing one section only changes that
+section's ids.
+"""
+
+import json
+
+from .ids import dedupe_ids, stable_id
+
+# Id families owned by this chunker; sync mode only deletes stale ids under these
+PROFILE_PREFIXES = ('personal-', 'exp-', 'skill-', 'project-')
+
+
+def load_profile(path):
+    """Read digitaltwin.json (tolerating a UTF-8 BOM)."""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return json.load(f)
+
+
+def profile_chunks(dt):
+    chunks = []
+
+    def add(family, path, content, metadata):
+        chunks.append({'id': stable_id(family, path, content), 'content': content, 'metadata': metadata})
+
+    # Personal - more detailed
+    personal = dt['personal']
+    add('personal-basic', '',
+        f"{personal['name']} is a {personal['title']} based in {personal.get('location', 'Australia')}. {personal.get('summary', '')}",
+        {'type': 'personal', 'source': 'Personal Information', 'category': 'basic'})
+    add('personal-pitch', '',
+        f"Elevator pitch: {personal.get('elevator_pitch', '')}",
+        {'type': 'personal', 'source': 'Personal Information', 'category': 'pitch'})
+
+    # Experience - EACH company gets detailed separate chunks
+    for exp in dt.get('experience', []):
+        company = exp.get('company', '')
+        title = exp.get('title', '')
+
+        # Company overview chunk - with Chinese company name if available
+        company_keywords = company
+        if '中山' in company or 'Zhongshan' in company:
+            company_keywords = f"{company} (中山恒润会计师事务所, Zhongshan Hengrun Accounting Firm)"
+        elif 'BF Suma' in company:
+            company_keywords = f"{company} (BF Suma Australia, customer success)"
+
+        add('exp-overview', company,
+            f"{title} at {company_keywords} ({exp.get('duration', '')}). Context: {exp.get('company_context', '')}. Team structure: {exp.get('team_structure', '')}. Technologies used: {', '.join(exp.get('technical_skills_used', []))}.",
+            {'type': 'experience', 'source': f"{company} - Overview", 'category': 'overview', 'company': company})
+
+        # Each STAR achievement gets its own chunk with keywords
+        for idx, star in enumerate(exp.get('achievements_star', [])):
+            # Extract key metrics/keywords from result
+            result = star.get('result', '')
+            keywords = []
+            if 'churn' in result.lower() or '22%' in result or '16%' in result:
+                keywords.append('customer churn reduction')
+            if '$600' in result or '600K' in result:
+                keywords.append('cost savings')
+            if '税' in result or 'tax' in result.lower():
+                keywords.append('tax compliance')
+            if '1000+' in result or '1,000' in result:
+                keywords.append('large scale operations')
+
+            keyword_str = f" Keywords: {', '.join(keywords)}." if keywords else ""
+
+            # The position is only in the metadata label, not the id, so inserting
+            # an achievement does not rename the ones after it
+            add('exp-star', company,
+                f"Achievement at {company}: Situation - {star.get('situation', '')}. Task - {star.get('task', '')}. Action - {star.get('action', '')}. Result - {star.get('result', '')}.{keyword_str}",
+                {'type': 'experience', 'source': f"{company} - Achievement {idx+1}", 'category': 'achievement', 'company': company})
+
+        # Separate leadership chunk if exists
+        if exp.get('leadership_examples'):
+            add('exp-leadership', company,
+                f"Leadership experience at {company}: {'. '.join(exp.get('leadership_examples', []))}",
+                {'type': 'experience', 'source': f"{company} - Leadership", 'category': 'leadership', 'company': company})
+
+        # Add quantifiable impact chunk if there are metrics
+        metrics = []
+        for star in exp.get('achievements_star', []):
+            result = star.get('result', '')
+            if any(char.isdigit() for char in result):
+                metrics.append(result)
+
+        if metrics:
+            add('exp-metrics', company,
+                f"Quantifiable impact at {company}: {' | '.join(metrics)}",
+                {'type': 'experience', 'source': f"{company} - Metrics", 'category': 'metrics', 'company': company})
+
+    # Skills - more granular
+    tech = dt.get('skills', {}).get('technical', {})
+    for lang in tech.get('programming_languages', []):
+        add('skill-lang', lang.get('language', ''),
+            f"Programming language expertise: {lang.get('language', '')} ({lang.get('proficiency', '')} level) with {lang.get('years_experience', '')} years of experience. Frameworks: {', '.join(lang.get('frameworks', []))}. Use cases: {', '.join(lang.get('use_cases', []))}.",
+            {'type': 'skill', 'source': f"Technical Skills - {lang.get('language', '')}", 'category': 'programming'})
+
+    # AI/ML as separate chunk
+    if tech.get('ai_ml'):
+        add('skill-ai-ml', '',
+            f"AI and Machine Learning skills: {', '.join(tech.get('ai_ml', []))}",
+            {'type': 'skill', 'source': 'Technical Skills - AI/ML', 'category': 'ai_ml'})
+
+    # Cloud platforms
+    if tech.get('cloud_platforms'):
+        add('skill-cloud', '',
+            f"Cloud platform experience: {', '.join(tech.get('cloud_platforms', []))}",
+            {'type': 'skill', 'source': 'Technical Skills - Cloud', 'category': 'cloud'})
+
+    # Projects - each project separate with detailed context
+    for proj in dt.get('projects_portfolio', []):
+        add('project', proj.get('name', ''),
+            f"Project: {proj.get('name', '')}. Description: {proj.get('description', '')}. Technologies used: {', '.join(proj.get('technologies', []))}. Business impact: {proj.get('impact', '')}. Key features: {'. '.join(proj.get('key_features', []))}.",
+            {'type': 'project', 'source': f"Project - {proj.get('name', '')}", 'category': 'project'})
+
+    # Identical sections (e.g. a duplicated achievement) would collide; keep both
+    return dedupe_ids(chunks)
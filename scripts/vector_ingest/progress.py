@@ -0,0 +1,57 @@
+"""
+Structured progress events for long-running ingestion.
+
+When INGEST_EVENTS names a file (set by the job runner in
+run-enhanced-init.py), every event is appended to it as one JSON line:
+
+  {"ts": 1760000000.1, "stage": "uploading", "done": 24, "total": 33,
+   "vectors_per_sec": 41.7, "eta_seconds": 0.2, ...}
+
+Stages used by init-vector-enhanced.py: chunking, planning, embedding,
+uploading, validating and cutover (with --shadow), done. Rates and ETAs are measured per stage since start().
+Without INGEST_EVENTS the reporter does nothing, so the scripts print
+exactly what they printed before.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class ProgressReporter:
+    def __init__(self, path=None):
+        path = path if path is not None else os.getenv('INGEST_EVENTS')
+        self.path = path or None
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def emit(self, stage, **fields):
+        if not self.enabled:
+            return
+        event = {'ts': round(time.time(), 3), 'stage': stage, **fields}
+        line = json.dumps(event, ensure_ascii=False) + '\n'
+        with self.lock:
+            # O_APPEND keeps lines whole when the job runner writes to the same file
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def start(self, stage, total, **fields):
+        with self.lock:
+            self.counters[stage] = {'done': 0, 'started': time.perf_counter()}
+        self.emit(stage, done=0, total=total, **fields)
+
+    def advance(self, stage, n, total, **fields):
+        """Add n finished items to stage and emit done/total with rate and ETA."""
+        with self.lock:
+            counter = self.counters.setdefault(stage, {'done': 0, 'started': time.perf_counter()})
+            counter['done'] += n
+            done, elapsed = counter['done'], time.perf_counter() - counter['started']
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else None
+        self.emit(stage, done=done, total=total, vectors_per_sec=round(rate, 1),
+                  eta_seconds=None if eta is None else round(eta, 1), **fields)
@@ -0,0 +1,212 @@
+"""
+Projection from the model's embedding width to the index dimension.
+
+Methods (PROJECTION env var):
+  random   the original deterministic Gaussian matrix (seed 42). It is the
+           only option when the index is wider than the model, e.g. a 768-dim
+           model in a 1024-dim index, and it adds storage but no information.
+  pca      centre and project onto the top principal components of the
+           corpus embeddings. Fits indexes narrower than the model (256/384).
+  whiten   PCA with each component rescaled to unit variance (shrunk towards
+           the mean variance), which evens out dominant directions for cosine.
+
+Fitted projections are saved as versioned .npz artifacts next to the index
+manifest in .vector-cache/ (mean, components, scale and a JSON meta record),
+and reused until --refit-projection or PROJECTION_REFIT=1. Their fingerprint
+goes into the manifest key, which is also written into each vector's
+metadata (sync.vector_metadata), so a refit re-uploads every chunk - with or
+without --sync - instead of mixing vectors from two projections. Queries must go through the same
+artifact (Projection.load(path).apply(query_embeddings)).
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+
+from .manifest import CACHE_DIR
+
+PROJECTION_VERSION = 1
+METHODS = ('random', 'pca', 'whiten')
+RANDOM_SEED = 42
+WHITEN_SHRINKAGE = 0.1
+
+
+def projection_method():
+    method = os.getenv('PROJECTION', 'random').lower()
+    if method not in METHODS:
+        raise ValueError(f"PROJECTION must be one of {', '.join(METHODS)}, got {method!r}")
+    return method
+
+
+def refit_requested(flag=False):
+    """True when the caller passed --refit-projection (flag) or PROJECTION_REFIT is set."""
+    return flag or os.getenv('PROJECTION_REFIT', '') in ('1', 'true', 'yes')
+
+
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', text).strip('_') or 'default'
+
+
+def projection_path(index_url, model_name, method, dimension, cache_dir=CACHE_DIR, namespace=''):
+    """Artifact file for one index (and namespace), model, method and target dimension."""
+    host = (urlparse(index_url).netloc or index_url) + (f'-{namespace}' if namespace else '')
+    return Path(cache_dir) / f'projection-{_slug(host)}-{_slug(model_name)}-{method}{int(dimension)}.npz'
+
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class Projection:
+    """Affine map x -> ((x - mean) @ components.T) * scale, followed by L2 normalisation."""
+
+    def __init__(self, method, components, mean=None, scale=None, meta=None):
+        self.method = method
+        self.components = np.asarray(components, dtype=np.float32)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float32)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float32)
+        self.meta = dict(meta or {})
+
+    @property
+    def model_dim(self):
+        return self.components.shape[1]
+
+    @property
+    def target_dim(self):
+        return self.components.shape[0]
+
+    @property
+    def fingerprint(self):
+        h = hashlib.sha1(self.method.encode('utf-8'))
+        for arr in (self.components, self.mean, self.scale):
+            if arr is not None:
+                h.update(arr.tobytes())
+        return h.hexdigest()[:10]
+
+    @property
+    def tag(self):
+        return f'{self.method}{self.target_dim}-{self.fingerprint}'
+
+    def apply(self, embeddings):
+        x = np.asarray(embeddings, dtype=np.float32)
+        if x.shape[-1] != self.model_dim:
+            raise ValueError(f'Projection expects {self.model_dim}-dim input, got {x.shape[-1]}')
+        if self.mean is not None:
+            x = x - self.mean
+        out = x @ self.components.T
+        if self.scale is not None:
+            out = out * self.scale
+        return normalize_rows(np.atleast_2d(out))
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = dict(self.meta, version=PROJECTION_VERSION, method=self.method, fingerprint=self.fingerprint)
+        arrays = {'components': self.components, 'meta': np.array(json.dumps(meta))}
+        if self.mean is not None:
+            arrays['mean'] = self.mean
+        if self.scale is not None:
+            arrays['scale'] = self.scale
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != PROJECTION_VERSION:
+                raise ValueError(f"Unsupported projection artifact version {meta.get('version')}")
+            return cls(meta['method'], data['components'],
+                       data['mean'] if 'mean' in data else None,
+                       data['scale'] if 'scale' in data else None, meta)
+
+
+def random_projection(model_dim, target_dim, seed=RANDOM_SEED):
+    """The deterministic row-normalised Gaussian matrix used before fitted projections."""
+    rng = np.random.RandomState(seed)
+    proj = rng.normal(size=(target_dim, model_dim)).astype('float32')
+    return Projection('random', normalize_rows(proj), meta={'seed': seed})
+
+
+def fit_projection(vectors, target_dim, method='pca', shrinkage=WHITEN_SHRINKAGE, seed=RANDOM_SEED):
+    """
+    Fit PCA (or whitening) of vectors down to target_dim components.
+
+    A corpus with fewer independent rows than target_dim only determines that
+    many components; the rest are an orthonormal completion, so the index keeps
+    its width and no corpus direction is lost.
+    """
+    x = np.asarray(vectors, dtype=np.float64)
+    n, model_dim = x.shape
+    if target_dim > model_dim:
+        raise ValueError(f'{method} cannot map {model_dim} dims up to {target_dim}')
+    mean = x.mean(axis=0)
+    _, s, vt = np.linalg.svd(x - mean, full_matrices=False)
+    variance = s ** 2 / max(n - 1, 1)
+    rank = int(np.sum(s > s[0] * 1e-6)) if len(s) and s[0] > 0 else 0
+    k = min(target_dim, rank)
+    components = vt[:k]
+
+    if k < target_dim:
+        rng = np.random.RandomState(seed)
+        extra = rng.normal(size=(model_dim, target_dim - k))
+        extra -= components.T @ (components @ extra)
+        q, _ = np.linalg.qr(extra)
+        components = np.vstack([components, q.T])
+
+    kept = variance[:k]
+    scale = None
+    if method == 'whiten' and k:
+        scale = 1.0 / np.sqrt(kept + shrinkage * kept.mean())
+        scale = np.concatenate([scale, np.full(target_dim - k, scale.min())])
+
+    meta = {
+        'fitted_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'samples': n,
+        'fitted_components': k,
+        'explained_variance': round(float(kept.sum() / variance.sum()), 4) if variance.sum() else 1.0,
+    }
+    return Projection(method, components, mean, scale, meta)
+
+
+def resolve_projection(method, target_dim, path, fit_vectors, refit=False):
+    """
+    Load the artifact at path, or fit one on fit_vectors() and save it.
+
+    Returns None for 'random'; callers then keep the random matrix (or no
+    projection when the model already matches the index).
+    """
+    if method == 'random':
+        return None
+    path = Path(path)
+    if path.exists() and not refit:
+        projection = Projection.load(path)
+        if projection.method == method and projection.target_dim == target_dim:
+            print(f"📐 Using {method} projection {projection.tag} from {path.name}")
+            return projection
+
+    vectors = np.asarray(fit_vectors(), dtype=np.float32)
+    if target_dim > vectors.shape[1]:
+        print(f"⚠️ {method} cannot widen {vectors.shape[1]} dims to {target_dim}; "
+              f"keeping the random projection (an index of {vectors.shape[1]} dims or fewer avoids it)")
+        return None
+    projection = fit_projection(vectors, target_dim, method)
+    projection.save(path)
+    print(f"📐 Fitted {method} projection {vectors.shape[1]} -> {target_dim} on {len(vectors)} chunks "
+          f"({projection.meta['explained_variance']:.1%} variance kept), saved {path.name}")
+    return projection
+
+
+def manifest_model_key(model_name, projection):
+    """Model key for ChunkManifest: fitted projections are part of the vector identity."""
+    return model_name if projection is None else f'{model_name}+{projection.tag}'
@@ -0,0 +1,105 @@
+"""
+Adaptive token-bucket rate limiter for the vector and embedding REST APIs.
+
+Requests take a token from a bucket that refills at the current rate. The
+rate grows additively while responses are healthy and is cut
+multiplicatively on 429, 5xx or transport errors (AIMD). A Retry-After
+header pauses every caller until the server-given time has passed.
+
+Environment:
+  UPSTASH_RATE_START  initial requests per second (default 10)
+  UPSTASH_RATE_MAX    upper bound on requests per second (default 50)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+DEFAULT_START_RATE = float(os.getenv('UPSTASH_RATE_START', '10'))
+DEFAULT_MAX_RATE = float(os.getenv('UPSTASH_RATE_MAX', '50'))
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_throttled(status):
+    """True for responses that mean 'slow down and retry'."""
+    return status is None or status == 429 or status >= 500
+
+
+class AdaptiveRateLimiter:
+    """Thread-safe token bucket whose rate follows server feedback."""
+
+    def __init__(self, rate=DEFAULT_START_RATE, min_rate=0.5, max_rate=DEFAULT_MAX_RATE,
+                 increase=1.0, decrease=0.5, burst=None):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, min_rate), self.max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst or max(1.0, self.rate)
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token if one is available; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 - self.tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            delay = self._reserve()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self):
+        while True:
+            delay = self._reserve()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def record(self, status, retry_after=None):
+        """Feed back one response status (None for a transport error)."""
+        with self._lock:
+            if is_throttled(status):
+                self.throttled += 1
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.tokens = min(self.tokens, 0.0)
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            elif 200 <= status < 300:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            self.burst = max(1.0, self.rate)
+
+    @property
+    def current_rate(self):
+        return self.rate
+
+    def describe(self):
+        return f"{self.rate:.1f} req/s ({self.throttled} throttled)"
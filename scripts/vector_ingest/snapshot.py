@@ -0,0 +1,146 @@
+"""
+Versioned binary snapshots of an Upstash Vector namespace.
+
+A snapshot holds every id, vector and metadata record of one namespace, so
+an index can be rebuilt (disaster recovery, a new environment, a migration)
+by uploading alone - no model load and no re-embedding.
+
+Layout (little-endian):
+
+  magic    8 bytes   b'VSNAPSHT'
+  length   uint32    size of the header
+  header   JSON      {"version": 1, "count", "dimension", "dtype": "<f4",
+                      "records_bytes", "matrix_offset", "crc32",
+                      "source", "namespace", "created"}
+  records  zlib      JSON {"ids": [...], "keys": [...], "rows": [[...]], "data": [...] | null}
+                     metadata is stored column-wise: the key list once and one
+                     value list per vector (null where a vector lacks a key)
+  padding            zero bytes up to a 64-byte boundary
+  matrix   float32   count x dimension, row i belongs to ids[i]
+
+The matrix is raw float32, so import memory-maps it instead of parsing
+text, and the file takes about 4 bytes per component (JSON needs ~10).
+Readers reject snapshots whose version is newer than SNAPSHOT_VERSION.
+"""
+
+import json
+import os
+import struct
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b'VSNAPSHT'
+SNAPSHOT_VERSION = 1
+ALIGN = 64
+DTYPE = '<f4'
+CRC_BLOCK_ROWS = 4096
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _columns(metadata):
+    keys = sorted({k for m in metadata for k in (m or {})})
+    return keys, [[(m or {}).get(k) for k in keys] for m in metadata]
+
+
+def export_snapshot(client, path, source=''):
+    """Write every vector in client's namespace to path; returns the header."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    matrix_tmp = path.with_name(path.name + '.matrix.tmp')
+    ids, metadata, data = [], [], []
+    dimension, crc = None, 0
+    try:
+        # Vectors are spooled to disk page by page; only ids and metadata stay in memory
+        with open(matrix_tmp, 'wb') as spool:
+            for row in client.iter_vectors(include_metadata=True, include_vectors=True, include_data=True):
+                vector = np.asarray(row['vector'], dtype=DTYPE)
+                if dimension is None:
+                    dimension = len(vector)
+                elif len(vector) != dimension:
+                    raise SnapshotError(f"{row['id']} has {len(vector)} components, expected {dimension}")
+                block = vector.tobytes()
+                crc = zlib.crc32(block, crc)
+                spool.write(block)
+                ids.append(row['id'])
+                metadata.append(row.get('metadata'))
+                data.append(row.get('data'))
+        if not ids:
+            raise SnapshotError(f"namespace {client.namespace or '(default)'} has no vectors to export")
+
+        keys, rows = _columns(metadata)
+        records = zlib.compress(json.dumps(
+            {'ids': ids, 'keys': keys, 'rows': rows, 'data': data if any(d is not None for d in data) else None},
+            ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 9)
+        header = {
+            'version': SNAPSHOT_VERSION, 'count': len(ids), 'dimension': dimension or 0, 'dtype': DTYPE,
+            'records_bytes': len(records), 'matrix_offset': 0, 'crc32': crc,
+            'source': source, 'namespace': client.namespace, 'created': datetime.now(timezone.utc).isoformat(),
+        }
+        # The header records the matrix offset, which depends on the header's own length
+        while True:
+            blob = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            start = len(MAGIC) + 4 + len(blob) + len(records)
+            offset = -(-start // ALIGN) * ALIGN
+            if header['matrix_offset'] == offset:
+                break
+            header['matrix_offset'] = offset
+
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as out, open(matrix_tmp, 'rb') as spool:
+            out.write(MAGIC)
+            out.write(struct.pack('<I', len(blob)))
+            out.write(blob)
+            out.write(records)
+            out.write(b'\0' * (header['matrix_offset'] - start))
+            while True:
+                block = spool.read(1 << 20)
+                if not block:
+                    break
+                out.write(block)
+        os.replace(tmp, path)
+    finally:
+        if matrix_tmp.exists():
+            matrix_tmp.unlink()
+    return header
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise SnapshotError(f'{path} is not a vector snapshot')
+        (length,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(length).decode('utf-8'))
+        records_at = f.tell()
+    if header.get('version', 0) > SNAPSHOT_VERSION:
+        raise SnapshotError(f"{path} is snapshot version {header['version']}; "
+                            f"this tool reads up to {SNAPSHOT_VERSION}")
+    header['records_offset'] = records_at
+    return header
+
+
+def read_snapshot(path, verify=True):
+    """(header, ids, metadata, data, matrix); matrix is a read-only memory map."""
+    header = read_header(path)
+    with open(path, 'rb') as f:
+        f.seek(header['records_offset'])
+        records = json.loads(zlib.decompress(f.read(header['records_bytes'])).decode('utf-8'))
+    ids, keys = records['ids'], records['keys']
+    metadata = [{k: v for k, v in zip(keys, row) if v is not None} for row in records['rows']]
+    data = records.get('data') or [None] * len(ids)
+    count, dim = header['count'], header['dimension']
+    if count == 0:
+        return header, ids, metadata, data, np.zeros((0, dim), dtype=DTYPE)
+    matrix = np.memmap(path, dtype=header['dtype'], mode='r', offset=header['matrix_offset'], shape=(count, dim))
+    if verify:
+        crc = 0
+        for start in range(0, count, CRC_BLOCK_ROWS):
+            crc = zlib.crc32(np.ascontiguousarray(matrix[start:start + CRC_BLOCK_ROWS]).tobytes(), crc)
+        if crc != header['crc32']:
+            raise SnapshotError(f'{path} is corrupt: matrix checksum mismatch')
+    return header, ids, metadata, data, matrix
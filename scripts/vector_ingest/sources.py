@@ -0,0 +1,179 @@
+"""
+Streaming record sources and chunkers for large ingestion corpora.
+
+iter_records() yields one record at a time from:
+  *.jsonl / *.ndjson  one JSON object per line
+  *.json              a top-level array (e.g. job_data.json written by
+                      SeekJobScraper.save_to_json) is decoded element by
+                      element from a fixed-size read buffer; a top-level
+                      object (e.g. digitaltwin.json) is yielded as one record
+
+iter_chunks() turns records into chunk dicts ({id, content, metadata}) lazily,
+so memory stays bounded by the read buffer and the largest single record, not
+by the corpus. Files are read as utf-8-sig, so BOM-prefixed exports work.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+READ_SIZE = 1 << 16
+MAX_CHUNK_CHARS = 1000
+TEXT_FIELDS = ('content', 'text', 'transcript', 'body')
+
+_SENTENCE_END = re.compile(r'(?<=[.!?。！？])\s*')
+
+
+def _iter_json_array(fp, read_size=READ_SIZE):
+    """Decode the elements of a top-level JSON array without reading it whole."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        data = fp.read(read_size)
+        eof = not data
+        buf, pos = buf[pos:] + data, 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and (buf[pos].isspace() or buf[pos] in chars):
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    skip('')
+    if pos >= len(buf) or buf[pos] != '[':
+        raise ValueError('expected a top-level JSON array')
+    pos += 1
+    while True:
+        skip(',')
+        if pos >= len(buf):
+            raise ValueError('unterminated JSON array')
+        if buf[pos] == ']':
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        if not eof and (end >= len(buf) or not (buf[end] in ',]' or buf[end].isspace())):
+            # A value only ends at a delimiter: '1.' or '1.5e' may be a cut-short '1.5e3'
+            fill()
+            continue
+        yield obj
+        pos = end
+
+
+def iter_records(path):
+    """Yield JSON records from a .jsonl/.ndjson file or a .json array/object."""
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        if path.suffix.lower() in ('.jsonl', '.ndjson'):
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"⚠️ {path.name}:{line_no} skipped (invalid JSON: {e.msg})")
+            return
+
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if head == '[':
+            yield from _iter_json_array(f)
+        elif head:
+            yield json.load(f)
+
+
+def split_text(text, max_chars=MAX_CHUNK_CHARS):
+    """Split text into pieces of at most max_chars on paragraph, then sentence, boundaries."""
+    pieces, current = [], ''
+    for para in re.split(r'\n\s*\n', text or ''):
+        para = ' '.join(para.split())
+        if not para:
+            continue
+        units = [para] if len(para) <= max_chars else [s for s in _SENTENCE_END.split(para) if s]
+        for unit in units:
+            while len(unit) > max_chars:
+                if current:
+                    pieces.append(current)
+                    current = ''
+                pieces.append(unit[:max_chars])
+                unit = unit[max_chars:]
+            if current and len(current) + 1 + len(unit) > max_chars:
+                pieces.append(current)
+                current = ''
+            current = f'{current} {unit}' if current else unit
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _short_hash(value):
+    return hashlib.sha1(str(value).encode('utf-8')).hexdigest()[:12]
+
+
+def job_chunks(job):
+    """Chunks for one SEEK job record: an overview plus description/requirements pieces."""
+    key = _short_hash(job.get('url') or job.get('id') or json.dumps(job, sort_keys=True))
+    title, company = job.get('title', ''), job.get('company', '')
+    base = {'type': 'job', 'source': f"{company} - {title}", 'company': company, 'url': job.get('url', '')}
+    chunks = [{
+        'id': f'job-{key}-overview',
+        'content': (f"Job: {title} at {company} ({job.get('location', '')}). Salary: {job.get('salary', '')}. "
+                    f"Type: {job.get('job_type', '')}. Posted: {job.get('posted_date', '')}."),
+        'metadata': {**base, 'category': 'job_overview'},
+    }]
+    for field in ('description', 'requirements'):
+        for n, piece in enumerate(split_text(job.get(field, ''))):
+            chunks.append({
+                'id': f'job-{key}-{field}-{n}',
+                'content': f"{title} at {company} - {field}: {piece}",
+                'metadata': {**base, 'category': f'job_{field}'},
+            })
+    return chunks
+
+
+def text_chunks(record):
+    """Chunks for a generic text record such as an interview transcript line."""
+    text = next((record[f] for f in TEXT_FIELDS if isinstance(record.get(f), str)), '')
+    key = record.get('id') or _short_hash(text)
+    metadata = dict(record.get('metadata') or {})
+    metadata.setdefault('type', record.get('type', 'document'))
+    metadata.setdefault('source', record.get('title') or record.get('source') or str(key))
+    return [
+        {'id': f'{key}-{n}', 'content': piece, 'metadata': metadata}
+        for n, piece in enumerate(split_text(text))
+    ]
+
+
+def record_chunks(record):
+    if not isinstance(record, dict):
+        return []
+    if 'title' in record and ('company' in record or 'url' in record):
+        return job_chunks(record)
+    if any(isinstance(record.get(f), str) for f in TEXT_FIELDS):
+        return text_chunks(record)
+    return []
+
+
+def iter_chunks(paths):
+    """Lazily yield chunks for every record of every source path."""
+    for path in paths:
+        records = chunks = 0
+        for record in iter_records(path):
+            records += 1
+            for chunk in record_chunks(record):
+                chunks += 1
+                yield chunk
+        print(f"📄 {Path(path).name}: {records} records -> {chunks} chunks")
@@ -0,0 +1,69 @@
+"""
+Remote diff-sync between a local chunk list and an Upstash index.
+
+With stable ids (ids.py) the index can be reconciled by id alone:
+  - ids listed remotely (via /range) but no longer produced locally are stale
+    and get deleted;
+  - chunks missing remotely are uploaded even if the manifest thinks they
+    are current (e.g. the index was reset);
+  - chunks present remotely with identical metadata are adopted into the
+    manifest without re-uploading, since their id already encodes the text.
+    The metadata carries the manifest key (model, projection fingerprint,
+    dimension) under MODEL_FIELD, so vectors embedded by another model or
+    projection never match and are re-uploaded instead.
+
+Only ids under the caller's prefixes are considered, so vectors written by
+other tools into the same index are never touched.
+
+Pass --sync on the command line or set VECTOR_SYNC=1 to enable it.
+"""
+
+import os
+
+MODEL_FIELD = 'model'
+
+
+def sync_requested(flag=False):
+    """True when the caller passed --sync (flag) or VECTOR_SYNC is set."""
+    return flag or os.getenv('VECTOR_SYNC', '') in ('1', 'true', 'yes')
+
+
+def vector_metadata(metadata, manifest):
+    """Metadata to upsert with a vector: the chunk's fields plus the embedding space it lives in."""
+    return {**metadata, MODEL_FIELD: manifest.key}
+
+
+def plan_sync(client, chunks, manifest, prefixes, remote_metadata=lambda ch: ch['metadata']):
+    """Return {'pending', 'stale', 'adopted', 'remote'} for this chunk list."""
+    remote = {}
+    for prefix in prefixes:
+        for vec in client.iter_vectors(prefix=prefix, include_metadata=True):
+            remote[vec['id']] = vec.get('metadata')
+
+    local_ids = {ch['id'] for ch in chunks}
+    stale = sorted(set(remote) - local_ids)
+    pending, adopted = [], []
+    for ch in chunks:
+        if not manifest.enabled or ch['id'] not in remote:
+            pending.append(ch)
+        elif manifest.is_current(ch):
+            continue
+        elif remote[ch['id']] == vector_metadata(remote_metadata(ch), manifest):
+            adopted.append(ch)
+        else:
+            pending.append(ch)
+    manifest.mark(adopted)
+    return {'pending': pending, 'stale': stale, 'adopted': adopted, 'remote': len(remote)}
+
+
+def delete_stale(client, manifest, stale, docstore=None):
+    """Delete stale ids from the index, the manifest and the doc store; returns the deleted count."""
+    if not stale:
+        return 0
+    deleted = client.delete(stale)
+    manifest.forget(stale)
+    manifest.save()
+    if docstore is not None:
+        docstore.delete(stale)
+    print(f"🗑️ Deleted {deleted} stale vectors no longer produced from the source data")
+    return deleted
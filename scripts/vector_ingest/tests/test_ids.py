@@ -0,0 +1,47 @@
+import copy
+
+from vector_ingest.ids import assign_stable_ids, stable_id
+from vector_ingest.profile import profile_chunks
+
+
+def legacy_chunks(achievements):
+    """Counter-suffixed chunks the way the init scripts build them."""
+    chunks = [{'id': 'personal-0', 'content': 'Name: Ada', 'metadata': {'source': 'Personal Information'}}]
+    for text in achievements:
+        chunks.append({'id': f'exp-star-{len(chunks)}', 'content': text, 'metadata': {'source': 'Acme - Achievement'}})
+    chunks.append({'id': f'project-{len(chunks)}', 'content': 'Project: Twin', 'metadata': {'source': 'Project - Twin'}})
+    return assign_stable_ids(chunks)
+
+
+def test_inserting_an_item_keeps_every_other_id():
+    before = legacy_chunks(['cut costs', 'shipped v2'])
+    after = legacy_chunks(['cut costs', 'hired a team', 'shipped v2'])
+
+    before_ids = {ch['content']: ch['id'] for ch in before}
+    after_ids = {ch['content']: ch['id'] for ch in after}
+    assert all(after_ids[text] == cid for text, cid in before_ids.items())
+    assert len(set(after_ids.values())) == len(after)
+
+
+def test_ids_change_with_content_and_drop_the_counter():
+    [chunk] = assign_stable_ids([{'id': 'exp-star-7', 'content': 'a', 'metadata': {'source': 'Acme'}}])
+    assert chunk['id'] == stable_id('exp-star', 'Acme', 'a')
+    assert stable_id('exp-star', 'Acme', 'b') != chunk['id']
+
+
+def test_duplicates_get_numbered_suffixes():
+    chunks = assign_stable_ids([{'id': f'skill-{i}', 'content': 'Python', 'source': 'Skills'} for i in range(3)])
+    base = stable_id('skill', 'Skills', 'Python')
+    assert [ch['id'] for ch in chunks] == [base, f'{base}-2', f'{base}-3']
+
+
+def test_profile_achievement_insert_keeps_later_ids():
+    star = lambda s: {'situation': s, 'task': 't', 'action': 'a', 'result': 'r'}
+    profile = {'personal': {'name': 'Ada', 'title': 'Engineer'},
+               'experience': [{'company': 'Acme', 'title': 'Lead', 'achievements_star': [star('one'), star('two')]}]}
+    before = {ch['content']: ch['id'] for ch in profile_chunks(profile)}
+
+    grown = copy.deepcopy(profile)
+    grown['experience'][0]['achievements_star'].insert(0, star('zero'))
+    after = {ch['content']: ch['id'] for ch in profile_chunks(grown)}
+    assert all(after[text] == cid for text, cid in before.items())
@@ -0,0 +1,79 @@
+from vector_ingest.journal import IngestJournal, resume_filter
+from vector_ingest.manifest import content_hash
+
+
+def chunks(n):
+    return [{'id': f'c{i}', 'content': f'text {i}', 'metadata': {'type': 'test'}} for i in range(n)]
+
+
+def ack(journal, batch, chunk_list):
+    by_id = {ch['id']: ch for ch in chunk_list}
+    journal.record({'batch': batch, 'ids': [ch['id'] for ch in chunk_list], 'status': 200}, by_id)
+
+
+def interrupted_run(path, acked):
+    journal = IngestJournal(path, 'model@384')
+    journal.start(10)
+    ack(journal, 0, acked)
+    journal._fh.close()  # killed before finish()
+    return journal.run_id
+
+
+def test_resume_skips_chunks_the_interrupted_run_acknowledged(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    all_chunks = chunks(5)
+    run_id = interrupted_run(path, all_chunks[:3])
+
+    todo, done, resumes = resume_filter(IngestJournal(path, 'model@384'), all_chunks, resume=True)
+    assert [ch['id'] for ch in done] == ['c0', 'c1', 'c2']
+    assert [ch['id'] for ch in todo] == ['c3', 'c4']
+    assert resumes == run_id
+
+
+def test_without_resume_everything_is_uploaded(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    all_chunks = chunks(3)
+    interrupted_run(path, all_chunks[:2])
+
+    todo, done, resumes = resume_filter(IngestJournal(path, 'model@384'), all_chunks, resume=False)
+    assert todo == all_chunks and done == [] and resumes is None
+
+
+def test_changed_content_is_uploaded_again(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    all_chunks = chunks(2)
+    interrupted_run(path, all_chunks)
+    all_chunks[1]['content'] = 'edited'
+
+    todo, done, _ = resume_filter(IngestJournal(path, 'model@384'), all_chunks, resume=True)
+    assert [ch['id'] for ch in todo] == ['c1']
+    assert [ch['id'] for ch in done] == ['c0']
+
+
+def test_resumed_chain_and_torn_line(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    all_chunks = chunks(4)
+    first = interrupted_run(path, all_chunks[:1])
+
+    second = IngestJournal(path, 'model@384')
+    second.start(3, resumes=first)
+    ack(second, 0, all_chunks[1:2])
+    second._fh.write('{"type": "batch", "run": "')  # torn by a crash mid-write
+    second._fh.close()
+
+    chain, acked = IngestJournal(path, 'model@384').interrupted()
+    assert chain == [second.run_id, first]
+    assert acked == {ch['id']: content_hash(ch) for ch in all_chunks[:2]}
+
+
+def test_other_model_key_and_finished_runs_are_ignored(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    all_chunks = chunks(2)
+    interrupted_run(path, all_chunks)
+    assert IngestJournal(path, 'other@1024').interrupted() == ([], {})
+
+    journal = IngestJournal(path, 'model@384')
+    journal.start(2)
+    ack(journal, 0, all_chunks)
+    journal.finish(2, 0)
+    assert journal.interrupted() == ([], {})
@@ -0,0 +1,28 @@
+import io
+import json
+
+import pytest
+
+from vector_ingest.sources import _iter_json_array
+
+DOC = '[1.5e3, -2.25 ,{"a": [1, 2], "b": "x,]"}, "y\\"]" ,true,null,123456789, 7, [] ]'
+
+
+@pytest.mark.parametrize('read_size', [1, 2, 3, 4, 5, 7, 16, 1 << 16])
+def test_elements_survive_any_read_boundary(read_size):
+    assert list(_iter_json_array(io.StringIO(DOC), read_size)) == json.loads(DOC)
+
+
+@pytest.mark.parametrize('read_size', [1, 3])
+def test_number_cut_at_a_read_boundary_is_not_truncated(read_size):
+    assert list(_iter_json_array(io.StringIO('[1.5e3]'), read_size)) == [1500.0]
+
+
+def test_empty_array():
+    assert list(_iter_json_array(io.StringIO(' [ ] '), 1)) == []
+
+
+@pytest.mark.parametrize('text', ['{"a": 1}', '[1, 2'])
+def test_rejects_non_arrays_and_truncated_input(text):
+    with pytest.raises(ValueError):
+        list(_iter_json_array(io.StringIO(text), 2))
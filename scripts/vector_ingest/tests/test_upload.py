@@ -0,0 +1,61 @@
+import json
+
+from vector_ingest.upload import UpsertEngine, acknowledged_ids, make_item, summarize
+
+
+class FakeResponse:
+    def __init__(self, status_code, text=''):
+        self.status_code = status_code
+        self.text = text
+        self.headers = {}
+
+
+class RejectingEngine(UpsertEngine):
+    """Answers /upsert locally: 400 for any batch holding a poisoned id, else 200."""
+
+    def __init__(self, poisoned, **kwargs):
+        super().__init__('http://index.invalid', 'token', max_retries=0, gzip=False, **kwargs)
+        self.poisoned = set(poisoned)
+        self.posted = []
+
+    def post(self, body):
+        ids = [item['id'] for item in json.loads(body)]
+        self.posted.append(ids)
+        bad = self.poisoned.intersection(ids)
+        return FakeResponse(400, f'bad vector {sorted(bad)}') if bad else FakeResponse(200, '"Success"')
+
+
+def items(n):
+    return [make_item(f'c{i}', [0.1, 0.2, 0.3], {'type': 'test'}) for i in range(n)]
+
+
+def test_bisect_isolates_the_poisoned_vector(tmp_path):
+    engine = RejectingEngine({'c5'}, quarantine_path=tmp_path / 'quarantine.jsonl')
+    results = engine.upload(items(8), batch_size=8)
+
+    assert len(results) == 1 and not results[0]['ok']
+    assert [p['id'] for p in results[0]['poisoned']] == ['c5']
+    assert sorted(acknowledged_ids(results[0])) == sorted(f'c{i}' for i in range(8) if i != 5)
+    # 8 -> 4 + 4 -> 2 + 2 -> 1 + 1: one request per level after the rejected batch
+    assert len(engine.posted) == 1 + 2 + 2 + 2
+    quarantined = [json.loads(line) for line in (tmp_path / 'quarantine.jsonl').read_text().splitlines()]
+    assert [q['id'] for q in quarantined] == ['c5']
+
+
+def test_clean_batches_are_not_bisected(tmp_path):
+    engine = RejectingEngine({'c1'}, quarantine_path=tmp_path / 'quarantine.jsonl')
+    results = engine.upload(items(6), batch_size=3)
+
+    assert [r['ok'] for r in results] == [False, True]
+    summary = summarize(results)
+    assert summary['success'] == 5
+    assert [e['chunk_id'] for e in summary['errors']] == ['c1']
+    assert engine.posted.count(['c3', 'c4', 'c5']) == 1
+
+
+def test_single_item_batch_is_quarantined_without_retries(tmp_path):
+    engine = RejectingEngine({'c0'}, quarantine_path=tmp_path / 'quarantine.jsonl')
+    results = engine.upload(items(1), batch_size=1)
+
+    assert results[0]['poisoned'][0]['id'] == 'c0'
+    assert engine.posted == [['c0']]
@@ -0,0 +1,49 @@
+"""
+Dependency-free tokenizer for mixed English / Chinese profile text.
+
+Latin text is lower-cased and split into word tokens that keep the symbols
+recruiters search for ($600K, 22%, c++, node.js). Runs of CJK characters
+have no spaces, so they become character unigrams plus overlapping bigrams
+(中山恒润 -> 中, 山, 恒, 润, 中山, 山恒, 恒润), which matches multi-character
+terms without a segmentation dictionary.
+"""
+
+import re
+
+_TOKEN = re.compile(r'[㐀-䶿一-鿿豈-﫿]+|[a-z0-9$][a-z0-9$%+#.,\'-]*', re.IGNORECASE)
+_CJK = re.compile(r'[㐀-䶿一-鿿豈-﫿]')
+_TRAILING = '.,\'-'
+
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it of on or that the this to was were with '
+    'you your i my me we our'.split()
+)
+
+
+def words(text):
+    """Ordered word tokens; each CJK run contributes its characters in order."""
+    out = []
+    for match in _TOKEN.finditer(text or ''):
+        token = match.group(0)
+        if _CJK.match(token):
+            out.extend(token)
+        else:
+            token = token.lower().rstrip(_TRAILING).replace(',', '')
+            if token:
+                out.append(token)
+    return out
+
+
+def terms(text, stopwords=STOPWORDS):
+    """Index terms: Latin words minus stopwords, CJK unigrams and bigrams."""
+    out = []
+    for match in _TOKEN.finditer(text or ''):
+        token = match.group(0)
+        if _CJK.match(token):
+            out.extend(token)
+            out.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            token = token.lower().rstrip(_TRAILING).replace(',', '')
+            if token and token not in stopwords:
+                out.append(token)
+    return out
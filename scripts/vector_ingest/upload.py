@@ -0,0 +1,253 @@
+"""
+Concurrent upload engine for Upstash Vector /upsert.
+
+Vectors are split into batches and posted by a fixed number of asyncio
+workers, so at most `concurrency` requests are in flight at once. The
+blocking HTTP calls run on a thread pool where each thread keeps its own
+requests.Session, which gives every worker a keep-alive connection.
+Results are reported back in batch order regardless of completion order.
+
+Every request first takes a token from a shared AdaptiveRateLimiter, and
+batches that come back 429/5xx (or fail in transport) are retried after the
+limiter has backed off, honouring Retry-After.
+
+A batch rejected for its content (a non-throttling 4xx) is bisected: each
+half is re-posted and failing halves are split again, so a single poisoned
+vector is found in about log2(batch size) requests. Poisoned ids are
+appended to .vector-cache/quarantine.jsonl together with the server error.
+
+Bodies are built by vector_ingest.wire straight from the float vectors with
+rounded components, and gzip-compressed when UPSTASH_GZIP=1.
+
+Environment:
+  UPSTASH_UPLOAD_BATCH        vectors per request (default 32)
+  UPSTASH_UPLOAD_CONCURRENCY  requests in flight (default 4)
+  UPSTASH_UPLOAD_RETRIES      retries per throttled batch (default 4)
+
+Usage:
+  engine = UpsertEngine(UPSTASH_URL, UPSTASH_TOKEN)
+  results = engine.upload(items, on_result=print_progress(len(items)))
+  summary = summarize(results)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .manifest import CACHE_DIR
+from .ratelimit import AdaptiveRateLimiter, is_throttled, parse_retry_after
+from .wire import DEFAULT_PRECISION, GZIP_ENABLED, compress, encode_batch
+
+DEFAULT_BATCH_SIZE = int(os.getenv('UPSTASH_UPLOAD_BATCH', '32'))
+DEFAULT_CONCURRENCY = int(os.getenv('UPSTASH_UPLOAD_CONCURRENCY', '4'))
+DEFAULT_RETRIES = int(os.getenv('UPSTASH_UPLOAD_RETRIES', '4'))
+QUARANTINE_PATH = CACHE_DIR / 'quarantine.jsonl'
+
+
+def make_item(chunk_id, vector, metadata):
+    """One upsert entry in the Upstash REST object form (vector may stay a NumPy row)."""
+    return {'id': chunk_id, 'vector': vector, 'metadata': metadata}
+
+
+class UpsertEngine:
+    """Posts upsert batches concurrently over keep-alive sessions."""
+
+    def __init__(self, url, token, concurrency=DEFAULT_CONCURRENCY, timeout=30,
+                 limiter=None, max_retries=DEFAULT_RETRIES, quarantine_path=QUARANTINE_PATH,
+                 precision=DEFAULT_PRECISION, gzip=GZIP_ENABLED, namespace=''):
+        self.upsert_url = url.rstrip('/') + '/upsert' + (f'/{namespace}' if namespace else '')
+        self.headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self.quarantine_path = quarantine_path
+        self.precision = precision
+        self.gzip = gzip
+        self.bytes_json = 0
+        self.bytes_sent = 0
+        self._local = threading.local()
+        self._pool = None
+
+    def _executor(self):
+        # Reused across upload() calls so worker threads keep their sessions alive
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='upsert')
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    def encode_batch(self, batch):
+        body = encode_batch(batch, self.precision)
+        self.bytes_json += len(body)
+        if self.gzip:
+            body = compress(body)
+        self.bytes_sent += len(body)
+        return body
+
+    def post(self, body):
+        """Blocking POST of one serialized batch (runs on a worker thread)."""
+        headers = {'Content-Encoding': 'gzip'} if self.gzip else None
+        return self._session().post(self.upsert_url, data=body, headers=headers, timeout=self.timeout)
+
+    def describe_payload(self):
+        sent = f"{self.bytes_sent / 1024:.0f} KB sent"
+        if self.gzip:
+            sent += f" ({self.bytes_json / 1024:.0f} KB JSON before gzip)"
+        return sent
+
+    async def send_batch(self, loop, pool, index, batch):
+        started = time.perf_counter()
+        result = {'batch': index, 'ids': [item['id'] for item in batch], 'ok': False, 'status': None, 'error': ''}
+        body = self.encode_batch(batch)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            try:
+                r = await loop.run_in_executor(pool, self.post, body)
+            except Exception as e:
+                self.limiter.record(None)
+                result['status'], result['error'] = None, str(e)[:300]
+            else:
+                self.limiter.record(r.status_code, parse_retry_after(r.headers.get('Retry-After')))
+                result['status'] = r.status_code
+                if r.status_code in (200, 201):
+                    result['ok'], result['error'], result['response'] = True, '', r.text[:200]
+                    break
+                result['error'] = r.text[:300]
+            if not is_throttled(result['status']):
+                break
+        result['attempts'] = attempt + 1
+        result['rate'] = self.limiter.current_rate
+        result['seconds'] = time.perf_counter() - started
+        return result
+
+    async def bisect(self, loop, pool, batch, recovered, poisoned):
+        """Split a rejected batch until the offending items are isolated."""
+        mid = len(batch) // 2
+        halves = [half for half in (batch[:mid], batch[mid:]) if half]
+        results = await asyncio.gather(*(self.send_batch(loop, pool, -1, half) for half in halves))
+        for half, res in zip(halves, results):
+            if res['ok']:
+                recovered.extend(res['ids'])
+            elif is_throttled(res['status']):
+                continue  # still throttled after retries; leave as a plain failure
+            elif len(half) == 1:
+                poisoned.append({'id': half[0]['id'], 'status': res['status'], 'error': res['error']})
+            else:
+                await self.bisect(loop, pool, half, recovered, poisoned)
+
+    async def isolate(self, loop, pool, result, batch):
+        recovered, poisoned = [], []
+        if len(batch) == 1:
+            poisoned.append({'id': batch[0]['id'], 'status': result['status'], 'error': result['error']})
+        else:
+            await self.bisect(loop, pool, batch, recovered, poisoned)
+        result['recovered'] = recovered
+        result['poisoned'] = poisoned
+        print(f"   🔎 Batch {result['batch'] + 1}: recovered {len(recovered)}, quarantined {len(poisoned)} "
+              f"({', '.join(p['id'] for p in poisoned[:5])})")
+
+    async def run(self, items, batch_size=DEFAULT_BATCH_SIZE, on_result=None):
+        """Upload items and return one result dict per batch, in batch order."""
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        results = [None] * len(batches)
+        next_batch = 0
+        next_report = 0
+        loop = asyncio.get_running_loop()
+
+        def report():
+            nonlocal next_report
+            while next_report < len(results) and results[next_report] is not None:
+                if on_result is not None:
+                    on_result(results[next_report])
+                next_report += 1
+
+        async def worker():
+            nonlocal next_batch
+            while next_batch < len(batches):
+                index = next_batch
+                next_batch += 1
+                results[index] = await self.send_batch(loop, pool, index, batches[index])
+                report()
+
+        pool = self._executor()
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(batches)))))
+        rejected = [r for r in results if not r['ok'] and not is_throttled(r['status'])]
+        await asyncio.gather(*(self.isolate(loop, pool, r, batches[r['batch']]) for r in rejected))
+
+        self.write_quarantine([p for r in rejected for p in r['poisoned']])
+        return results
+
+    def write_quarantine(self, poisoned):
+        """Append isolated bad ids and the server's error to the quarantine file."""
+        if not poisoned or self.quarantine_path is None:
+            return
+        os.makedirs(os.path.dirname(self.quarantine_path), exist_ok=True)
+        stamp = datetime.now(timezone.utc).isoformat()
+        with open(self.quarantine_path, 'a', encoding='utf-8') as f:
+            for entry in poisoned:
+                f.write(json.dumps({'time': stamp, 'url': self.upsert_url, **entry}, ensure_ascii=False) + '\n')
+        print(f"   🚫 {len(poisoned)} poisoned vectors written to {self.quarantine_path}")
+
+    def upload(self, items, batch_size=DEFAULT_BATCH_SIZE, on_result=None):
+        """Synchronous entry point for the init scripts."""
+        if not items:
+            return []
+        return asyncio.run(self.run(items, batch_size=batch_size, on_result=on_result))
+
+
+def print_progress(total):
+    """on_result callback printing a running count in batch order."""
+    state = {'done': 0, 'started': time.perf_counter()}
+
+    def on_result(result):
+        n = len(result['ids'])
+        if result['ok']:
+            state['done'] += n
+            rate = state['done'] / max(time.perf_counter() - state['started'], 1e-6)
+            print(f"   ✅ Batch {result['batch'] + 1}: {n} vectors ({state['done']}/{total}, {rate:.0f} vec/s, limit {result['rate']:.1f} req/s)")
+        else:
+            print(f"   ❌ Batch {result['batch'] + 1} failed: {result['status']} {result['error'][:200]}")
+
+    return on_result
+
+
+def acknowledged_ids(result):
+    """Ids from a batch result that the server accepted, including bisection recoveries."""
+    return result['ids'] if result['ok'] else result.get('recovered', [])
+
+
+def summarize(results):
+    """Collapse batch results into the success/error dict the scripts print."""
+    success = sum(len(acknowledged_ids(r)) for r in results)
+    errors = []
+    for r in results:
+        if r['ok']:
+            continue
+        recovered = set(r.get('recovered', []))
+        poisoned = {p['id']: p for p in r.get('poisoned', [])}
+        for chunk_id in r['ids']:
+            if chunk_id not in recovered:
+                cause = poisoned.get(chunk_id, r)
+                errors.append({'chunk_id': chunk_id, 'status': cause['status'], 'error': cause['error'][:100]})
+    return {'success': success, 'error': len(errors), 'total': success + len(errors), 'errors': errors}
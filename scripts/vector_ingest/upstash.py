@@ -0,0 +1,125 @@
+"""
+Minimal Upstash Vector REST client for index housekeeping.
+
+Covers the calls the ingestion scripts need besides bulk /upsert (which
+goes through UpsertEngine): /info, paginated /range listings, batched
+/delete, /fetch, /query and namespace housekeeping, optionally scoped to
+one namespace. Responses are unwrapped from Upstash's {"result": ...}
+envelope, and throttled calls are retried through the shared
+AdaptiveRateLimiter.
+"""
+
+import copy
+import time
+
+import requests
+
+from .ratelimit import AdaptiveRateLimiter, is_throttled, parse_retry_after
+
+RANGE_PAGE = 1000
+DELETE_BATCH = 1000
+
+
+class UpstashError(RuntimeError):
+    def __init__(self, status, message):
+        super().__init__(f'{status}: {message}')
+        self.status = status
+
+
+class UpstashClient:
+    def __init__(self, url, token, timeout=30, limiter=None, max_retries=4, namespace=''):
+        self.url = url.rstrip('/')
+        self.namespace = namespace
+        self.timeout = timeout
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def call(self, method, path, body=None):
+        """Issue one REST call and return its unwrapped `result`."""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire_blocking()
+            status, retry_after = None, None
+            try:
+                resp = self.session.request(method, f'{self.url}/{path.lstrip("/")}', json=body,
+                                            timeout=self.timeout)
+                status, retry_after = resp.status_code, parse_retry_after(resp.headers.get('Retry-After'))
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                error = resp.text[:300]
+                if 200 <= status < 300:
+                    self.limiter.record(status)
+                    payload = resp.json()
+                    return payload.get('result', payload) if isinstance(payload, dict) else payload
+            self.limiter.record(status, retry_after)
+            if not is_throttled(status) or attempt == self.max_retries:
+                raise UpstashError(status, error)
+            time.sleep(min(2 ** attempt, 10) if retry_after is None else 0)
+        raise UpstashError(None, 'retries exhausted')
+
+    def _scoped(self, path):
+        return f'{path}/{self.namespace}' if self.namespace else path
+
+    def scoped(self, namespace):
+        """A client for another namespace sharing this one's session and rate limiter."""
+        other = copy.copy(self)
+        other.namespace = namespace
+        return other
+
+    def info(self):
+        return self.call('GET', 'info')
+
+    def dimension(self, default=None):
+        """Index vector dimension from /info, or `default` when it is not reported."""
+        dim = self.info().get('dimension')
+        return int(dim) if dim else default
+
+    def iter_vectors(self, prefix=None, include_metadata=False, page_size=RANGE_PAGE,
+                     include_vectors=False, include_data=False):
+        """Yield {id, metadata?, vector?, data?} for every vector (optionally only ids with `prefix`)."""
+        cursor = '0'
+        while True:
+            body = {'cursor': cursor, 'limit': page_size, 'includeMetadata': include_metadata,
+                    'includeVectors': include_vectors, 'includeData': include_data}
+            if prefix:
+                body['prefix'] = prefix
+            page = self.call('POST', self._scoped('range'), body)
+            yield from page.get('vectors', [])
+            cursor = page.get('nextCursor')
+            if not cursor:
+                return
+
+    def list_ids(self, prefix=None):
+        return [v['id'] for v in self.iter_vectors(prefix=prefix)]
+
+    def delete(self, ids, batch_size=DELETE_BATCH):
+        """Delete ids in batches; returns how many the index reported as deleted."""
+        ids = list(ids)
+        deleted = 0
+        for start in range(0, len(ids), batch_size):
+            result = self.call('DELETE', self._scoped('delete'), ids[start:start + batch_size])
+            deleted += int(result.get('deleted', 0)) if isinstance(result, dict) else 0
+        return deleted
+
+    def upsert(self, items):
+        """Small direct upsert of [{id, vector, metadata}] (bulk uploads use UpsertEngine)."""
+        return self.call('POST', self._scoped('upsert'), items)
+
+    def fetch(self, ids, include_metadata=False):
+        """Rows for ids in order, None where an id is missing."""
+        return self.call('POST', self._scoped('fetch'), {'ids': list(ids), 'includeMetadata': include_metadata})
+
+    def query(self, vector, top_k=10, include_metadata=False):
+        body = {'vector': [float(x) for x in vector], 'topK': top_k, 'includeMetadata': include_metadata}
+        return self.call('POST', self._scoped('query'), body)
+
+    def namespace_counts(self):
+        """{namespace: (vectorCount, pendingVectorCount)} from /info."""
+        spaces = self.info().get('namespaces') or {}
+        return {name: (int(v.get('vectorCount', 0)), int(v.get('pendingVectorCount', 0)))
+                for name, v in spaces.items()}
+
+    def delete_namespace(self, namespace):
+        return self.call('DELETE', f'delete-namespace/{namespace}')
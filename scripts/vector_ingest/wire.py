@@ -0,0 +1,45 @@
+"""
+Compact JSON wire format for /upsert request bodies.
+
+json.dumps(vec.tolist()) on float32/float64 data writes up to 17 significant
+digits per component. Unit-normalised embeddings only need about six
+decimal places for cosine similarity to be unaffected, so the serializer
+rounds the whole batch matrix in one NumPy call and emits it with compact
+separators. Bodies can optionally be gzip-compressed as well.
+
+Environment:
+  UPSTASH_VECTOR_PRECISION  decimal places per component (default 6)
+  UPSTASH_GZIP              set to 1 to send Content-Encoding: gzip bodies
+"""
+
+import gzip
+import json
+import os
+
+import numpy as np
+
+DEFAULT_PRECISION = int(os.getenv('UPSTASH_VECTOR_PRECISION', '6'))
+GZIP_ENABLED = os.getenv('UPSTASH_GZIP', '') in ('1', 'true', 'yes')
+GZIP_LEVEL = 5
+
+
+def encode_batch(batch, precision=DEFAULT_PRECISION):
+    """Serialize upsert items to UTF-8 JSON bytes with rounded vectors."""
+    if not batch:
+        return b'[]'
+    matrix = np.asarray([item['vector'] for item in batch], dtype=np.float64)
+    if precision is not None:
+        matrix = np.round(matrix, precision)
+    payload = [
+        {'id': item['id'], 'vector': row, 'metadata': item.get('metadata', {})}
+        for item, row in zip(batch, matrix.tolist())
+    ]
+    for entry, item in zip(payload, batch):
+        # Raw text kept for hosted-embedding indexes (restored from snapshots)
+        if item.get('data') is not None:
+            entry['data'] = item['data']
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def compress(body, level=GZIP_LEVEL):
+    return gzip.compress(body, compresslevel=level)
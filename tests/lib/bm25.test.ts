@@ -0,0 +1,64 @@
+/**
+ * BM25 Index Tests
+ * Tests the bundled lexical index used for hybrid retrieval
+ */
+
+import { describe, it, expect } from 'vitest';
+import { createBm25Search, reciprocalRankFusion, searchBm25, tokenize } from '../../lib/bm25';
+
+describe('BM25 Index', () => {
+  describe('tokenize', () => {
+    it('should keep money and percentage terms and drop stopwords', () => {
+      const terms = tokenize('Saved $600K and cut churn by 22%', new Set(['and', 'by']));
+
+      expect(terms).toEqual(['saved', '$600k', 'cut', 'churn', '22%']);
+    });
+
+    it('should split Chinese text into unigrams and bigrams', () => {
+      expect(tokenize('中山恒润', new Set())).toEqual(['中', '山', '恒', '润', '中山', '山恒', '恒润']);
+    });
+  });
+
+  describe('search', () => {
+    const search = createBm25Search({
+      version: 1,
+      k1: 1.2,
+      b: 0.75,
+      avgdl: 2,
+      stopwords: [],
+      docs: [
+        { id: 'a', content: 'python sql', type: 'skill', source: 'A', category: '' },
+        { id: 'b', content: 'tax 中山', type: 'experience', source: 'B', category: '' },
+      ],
+      postings: { python: [[0, 1.5]], sql: [[0, 1.0]], 中山: [[1, 2.0]], tax: [[1, 0.5]] },
+    });
+
+    it('should rank documents by summed posting weights', () => {
+      const hits = search('python 中山 tax');
+
+      expect(hits.map((h) => h.doc.id)).toEqual(['b', 'a']);
+      expect(hits[0].score).toBeCloseTo(2.5);
+    });
+
+    it('should return nothing for unknown terms', () => {
+      expect(search('kubernetes')).toEqual([]);
+    });
+
+    it('should find profile chunks in the bundled index', () => {
+      const hits = searchBm25('Python', 3);
+
+      expect(hits.length).toBeGreaterThan(0);
+      expect(hits[0].doc.content.toLowerCase()).toContain('python');
+    });
+  });
+
+  describe('reciprocalRankFusion', () => {
+    it('should favour ids ranked well in both lists', () => {
+      const fused = reciprocalRankFusion([['x', 'y', 'z'], ['y', 'x']]);
+      const order = Array.from(fused.entries()).sort((a, b) => b[1] - a[1]).map(([id]) => id);
+
+      expect(order.slice(0, 2).sort()).toEqual(['x', 'y']);
+      expect(order[2]).toBe('z');
+    });
+  });
+});
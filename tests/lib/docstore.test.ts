@@ -0,0 +1,27 @@
+/**
+ * Chunk Document Store Tests
+ * Tests hydration of vector hits from the bundled chunk documents
+ */
+
+import { describe, it, expect } from 'vitest';
+import bm25Data from '../../lib/generated/bm25-index.json';
+import { getChunkDocs } from '../../lib/docstore';
+
+describe('Chunk Document Store', () => {
+  // chunk-docs.json leaves out documents the BM25 index already carries
+  const ids = (bm25Data as { docs: { id: string }[] }).docs.map((doc) => doc.id);
+
+  it('should return content for known ids and skip unknown ones', async () => {
+    const docs = await getChunkDocs([ids[0], 'missing-id']);
+
+    expect(docs.size).toBe(1);
+    expect(docs.get(ids[0])?.content.length).toBeGreaterThan(0);
+    expect(docs.has('missing-id')).toBe(false);
+  });
+
+  it('should not look anything up for an empty id list', async () => {
+    const docs = await getChunkDocs([]);
+
+    expect(docs.size).toBe(0);
+  });
+});
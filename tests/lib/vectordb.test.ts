@@ -3,8 +3,9 @@
  * Tests vector search functionality and data quality
  */
 
-import { describe, it, expect } from 'vitest';
-import { generateChunks, searchRelevantContext } from '../../lib/vectordb';
+import { describe, it, expect, afterEach } from 'vitest';
+import type { Index } from '@upstash/vector';
+import { generateChunks, resolveNamespace, searchRelevantContext } from '../../lib/vectordb';
 
 describe('Vector Database', () => {
   describe('generateChunks', () => {
@@ -54,6 +55,38 @@ describe('Vector Database', () => {
     });
   });
 
+  // Runs before the search tests so the alias cache starts empty
+  describe('resolveNamespace', () => {
+    const pinned = process.env.VECTOR_NAMESPACE;
+
+    afterEach(() => {
+      if (pinned === undefined) delete process.env.VECTOR_NAMESPACE;
+      else process.env.VECTOR_NAMESPACE = pinned;
+    });
+
+    it('should use VECTOR_NAMESPACE without reading the alias', async () => {
+      process.env.VECTOR_NAMESPACE = 'gen-pinned';
+      const index = { fetch: async () => { throw new Error('alias should not be read'); } } as unknown as Index;
+
+      expect(await resolveNamespace(index)).toBe('gen-pinned');
+    });
+
+    it('should follow the alias record and keep it cached', async () => {
+      delete process.env.VECTOR_NAMESPACE;
+      let reads = 0;
+      const index = {
+        fetch: async () => {
+          reads++;
+          return [{ id: 'live', metadata: { namespace: 'gen-20261018-101500', previous: '' } }];
+        },
+      } as unknown as Index;
+
+      expect(await resolveNamespace(index)).toBe('gen-20261018-101500');
+      expect(await resolveNamespace(index)).toBe('gen-20261018-101500');
+      expect(reads).toBe(1);
+    });
+  });
+
   describe('searchRelevantContext', () => {
     it('should return array of results for valid query', async () => {
       const query = 'Python programming experience';